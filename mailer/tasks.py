@@ -0,0 +1,46 @@
+from smtplib import SMTPException
+from botocore.exceptions import BotoCoreError, ClientError
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from celery.utils.time import get_exponential_backoff_interval
+from django.core.mail import EmailMessage, get_connection
+
+logger = get_task_logger(__name__)
+
+# Errors of the email backends after which sending is retried
+RETRIED_ERRORS = (BotoCoreError, ClientError, SMTPException, OSError)
+
+# Retries of a batch before its remaining emails are given up, and their backoff in seconds
+EMAIL_MAX_RETRIES = 8
+EMAIL_RETRY_BACKOFF = 30
+EMAIL_RETRY_BACKOFF_MAX = 3600
+
+
+@shared_task(bind=True, max_retries=EMAIL_MAX_RETRIES)
+def send_emails(self, messages):
+    """
+    Celery task sending a batch of emails over a single connection of the email backend.
+
+    Emails are sent in order. When the backend fails, the emails not sent yet are retried with
+    an exponential, jittered backoff, so that emails of the batch already delivered are not sent twice.
+
+    Args:
+        messages (list): The emails, as dicts with the 'subject', 'body' and 'to' keys.
+
+    Returns:
+        int: The number of emails sent by this attempt.
+    """
+    connection = get_connection()
+    sent = 0
+    try:
+        with connection:
+            for message in messages:
+                connection.send_messages([EmailMessage(message['subject'], message['body'], to=message['to'],
+                                                       connection=connection)])
+                sent += 1
+    except RETRIED_ERRORS as error:
+        logger.warning("Sent %s of %s emails, retrying the others: %s", sent, len(messages), error)
+        countdown = get_exponential_backoff_interval(EMAIL_RETRY_BACKOFF, self.request.retries,
+                                                     EMAIL_RETRY_BACKOFF_MAX, full_jitter=True)
+        raise self.retry(args=(messages[sent:],), exc=error, countdown=countdown)
+    return sent
@@ -0,0 +1,57 @@
+from smtplib import SMTPServerDisconnected
+from unittest.mock import patch
+from celery.exceptions import Retry
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import SimpleTestCase
+from mailer.tasks import send_emails
+from mailer.views import send_verification_email
+from user_api.models import AppUser
+
+
+class SendEmailsTaskTest(SimpleTestCase):
+    """Test suite for the send_emails task."""
+
+    messages = [{'subject': f'Subject {i}', 'body': 'Body', 'to': [f'user{i}@example.com']} for i in range(3)]
+
+    def test_batch_is_sent_over_one_connection(self):
+        """Ensure that the emails of a batch are sent over a single connection, from the default sender."""
+        with patch.object(EmailBackend, 'open') as open_connection:
+            self.assertEqual(send_emails.run(self.messages), 3)
+        open_connection.assert_called_once()
+        self.assertEqual([email.to for email in mail.outbox], [message['to'] for message in self.messages])
+        self.assertEqual(mail.outbox[0].from_email, 'moviemate.md@gmail.com')
+
+    def test_failure_retries_unsent_emails(self):
+        """Ensure that a failure of the backend retries the emails not sent yet, and only them."""
+        send_messages = EmailBackend.send_messages
+        calls = []
+
+        def fail_on_second_email(backend, messages):
+            calls.append(messages)
+            if len(calls) == 2:
+                raise SMTPServerDisconnected
+            return send_messages(backend, messages)
+
+        with patch.object(EmailBackend, 'send_messages', fail_on_second_email), \
+                patch.object(send_emails, 'retry', side_effect=Retry) as retry:
+            with self.assertRaises(Retry):
+                send_emails.run(self.messages)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(retry.call_args.kwargs['args'], (self.messages[1:],))
+        self.assertLessEqual(retry.call_args.kwargs['countdown'], 3600)
+
+
+class SendVerificationEmailTest(SimpleTestCase):
+    """Test suite for the queueing of verification emails."""
+
+    def test_email_is_queued_on_commit(self):
+        """Ensure that the verification email is queued once the transaction is committed."""
+        user = AppUser(email='test@example.com', username='test')
+        with patch('mailer.views.send_emails.delay') as delay, \
+                patch('mailer.views.transaction.on_commit', side_effect=lambda callback: callback()) as on_commit:
+            send_verification_email(user, 'https://example.com/verify/token')
+        on_commit.assert_called_once()
+        (messages,), _ = delay.call_args
+        self.assertEqual(messages[0]['to'], ['test@example.com'])
+        self.assertIn('https://example.com/verify/token', messages[0]['body'])
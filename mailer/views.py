@@ -1,14 +1,42 @@
-from django.core.mail import send_mail
+import logging
+from django.db import transaction
+from kombu.exceptions import OperationalError
+from .tasks import send_emails
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_emails(messages):
+    """
+    Send emails to the mail queue, logging instead of raising when the broker cannot be reached.
+    Args:
+        messages (list): The emails, as dicts with the 'subject', 'body' and 'to' keys.
+    """
+    try:
+        send_emails.delay(messages)
+    except OperationalError:
+        recipients = [address for message in messages for address in message['to']]
+        logger.exception("Could not queue the emails to %s", ', '.join(recipients))
+
+
+def queue_emails(messages):
+    """
+    Queue emails to be sent in the background once the current transaction is committed.
+    The data is committed by then, so a broker outage is logged and does not fail the request.
+    Args:
+        messages (list): The emails, as dicts with the 'subject', 'body' and 'to' keys.
+    """
+    transaction.on_commit(lambda: enqueue_emails(messages))
 
 
 def send_verification_email(user, verification_url):
     """
-    Send an email to the user containing the verification link.
+    Queue an email to the user containing the verification link.
+    The email is sent by a Celery task once the user and the verification token are committed,
+    so that neither the request nor the registration depends on the email backend.
     Args:
         user (AppUser): User instance to whom the email should be sent.
         verification_url (str): Verification link for the user.
-    Returns:
-        int: Number of successfully sent emails.
     """
     email_subject = "Registration Confirmation"
     email_body = f"""
@@ -22,4 +50,4 @@ def send_verification_email(user, verification_url):
     Best regards,
     MovieMate
     """
-    send_mail(email_subject, email_body, 'moviemate.md@gmail.com', [user.email])
+    queue_emails([{'subject': email_subject, 'body': email_body, 'to': [user.email]}])
@@ -1,4 +1,6 @@
 from django.contrib import admin
-from .models import SearchHistory
+from .models import SearchHistory, SearchRollup, UserSearchRollup
 
 admin.site.register(SearchHistory)
+admin.site.register(SearchRollup)
+admin.site.register(UserSearchRollup)
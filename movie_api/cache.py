@@ -0,0 +1,113 @@
+import hashlib
+import time
+from django.core.cache import cache
+
+LISTING_VERSION_KEY = 'show-listing:version'
+LISTING_CACHE_TIMEOUT = 6 * 60 * 60
+LISTING_LOCK_TIMEOUT = 30
+LISTING_LOCK_WAIT = 10
+LISTING_LOCK_POLL_INTERVAL = 0.05
+
+
+def get_listing_version():
+    """
+    Get the current version of the show data, initializing it on first use.
+
+    The version is the time of the last change of the show data, in nanoseconds since the epoch.
+
+    Returns:
+        int: The current data version.
+    """
+    version = cache.get(LISTING_VERSION_KEY)
+    if version is None:
+        cache.add(LISTING_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(LISTING_VERSION_KEY)
+    return version
+
+
+def bump_listing_version():
+    """
+    Move the show data to a new version, so that no listing cached for an older version is served again.
+    """
+    cache.set(LISTING_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def normalize_city(city):
+    """
+    Normalize the city filter of a listing, so that equivalent searches share a cache entry.
+
+    Args:
+        city (str): The city filter as given by the client.
+
+    Returns:
+        str: The stripped, lowercase city, or None if not given.
+    """
+    return city.strip().lower() if city is not None else None
+
+
+def listing_cache_key(version, params):
+    """
+    Build the cache key of a listing.
+
+    Args:
+        version (int): The data version the listing is computed from.
+        params (dict): The normalized query parameters of the listing.
+
+    Returns:
+        str: The cache key.
+    """
+    digest = hashlib.sha256(repr(sorted(params.items())).encode('utf-8')).hexdigest()
+    return f'show-listing:{version}:{digest}'
+
+
+def listing_validators(version, params, media_type):
+    """
+    Build the HTTP validators of a listing, which change whenever the listing or its representation may change.
+
+    Args:
+        version (int): The data version the listing is computed from.
+        params (dict): The normalized query parameters of the listing.
+        media_type (str): The media type the listing is rendered to, e.g. JSON or the browsable API.
+
+    Returns:
+        tuple: The strong ETag and the Last-Modified timestamp, in seconds since the epoch.
+    """
+    digest = hashlib.sha256(f'{listing_cache_key(version, params)}:{media_type}'.encode('utf-8')).hexdigest()
+    return f'"{digest}"', version // 1_000_000_000
+
+
+def get_or_compute(key, compute):
+    """
+    Get a cached value or compute and cache it, making sure concurrent misses compute it only once.
+
+    The first caller to miss takes a short-lived lock and computes the value. The other callers poll
+    the cache until the value appears, and only compute it themselves if the lock holder did not
+    finish within LISTING_LOCK_WAIT seconds.
+
+    Args:
+        key (str): The cache key.
+        compute (callable): Callable computing the value on a cache miss.
+
+    Returns:
+        The cached or computed value.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, LISTING_LOCK_TIMEOUT):
+        try:
+            value = compute()
+            cache.set(key, value, LISTING_CACHE_TIMEOUT)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    deadline = time.monotonic() + LISTING_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LISTING_LOCK_POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+    return compute()
@@ -0,0 +1,55 @@
+# Generated by Django 4.2 on 2026-10-18 08:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('movie_api', '0003_alter_searchhistory_showing_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('city', models.CharField(max_length=100)),
+                ('showing_date', models.DateField()),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserSearchRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='searchhistory',
+            index=models.Index(fields=['created_date'], name='search_created_date_idx'),
+        ),
+        migrations.AddField(
+            model_name='usersearchrollup',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='searchrollup',
+            index=models.Index(fields=['day'], name='search_rollup_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='searchrollup',
+            constraint=models.UniqueConstraint(fields=('city', 'showing_date', 'day'), name='search_rollup_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='usersearchrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'day'), name='user_search_rollup_unique'),
+        ),
+    ]
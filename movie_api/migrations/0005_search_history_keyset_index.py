@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-18 08:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie_api', '0004_search_rollups'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='searchhistory',
+            name='search_created_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='searchhistory',
+            index=models.Index(fields=['created_date', 'id'], name='search_created_date_id_idx'),
+        ),
+    ]
@@ -12,8 +12,58 @@ class SearchHistory(models.Model):
     showing_date = models.DateField()
     created_date = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            # Serves the keyset pagination, the day windows of the rollups and the pruning of old rows
+            models.Index(fields=['created_date', 'id'], name='search_created_date_id_idx'),
+        ]
+
     def __str__(self):
         """
         Returns a string representation of the search history object.
         """
         return self.city
+
+
+class SearchRollup(models.Model):
+    """
+    Model representing the number of searches for a city and showing date made on a given day.
+    """
+    city = models.CharField(max_length=100)
+    showing_date = models.DateField()
+    day = models.DateField()
+    count = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['city', 'showing_date', 'day'], name='search_rollup_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='search_rollup_day_idx'),
+        ]
+
+    def __str__(self):
+        """
+        Returns a string representation of the search rollup object.
+        """
+        return f'{self.city} {self.showing_date} on {self.day}: {self.count}'
+
+
+class UserSearchRollup(models.Model):
+    """
+    Model representing the number of searches made by a user on a given day.
+    """
+    user = models.ForeignKey(AppUser, on_delete=models.CASCADE)
+    day = models.DateField()
+    count = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'day'], name='user_search_rollup_unique'),
+        ]
+
+    def __str__(self):
+        """
+        Returns a string representation of the user search rollup object.
+        """
+        return f'{self.user} on {self.day}: {self.count}'
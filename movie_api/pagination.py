@@ -0,0 +1,141 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):  # pylint: disable=abstract-method
+    """
+    Cursor pagination seeking past the last item of the previous page on a unique ordering.
+
+    Unlike offset pagination, each page is read from an index on the `ordering` fields, whatever its position,
+    and pages stay stable while rows are added. The body of the response is the list of items of the page,
+    the link to the next page is sent in a 'Link' header, as rel="next". The page size can be chosen with the
+    'page_size' query parameter, up to the API_MAX_PAGE_SIZE setting.
+
+    Items can be model instances or values() rows, as long as they carry the `ordering` fields.
+    """
+    ordering = ()
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self):
+        """
+        Initialize the pagination of a single request.
+        """
+        self.request = None
+        self.next_cursor = None
+
+    def get_page_size(self, request):
+        """
+        Get the page size asked for by the client, bounded by the API_MAX_PAGE_SIZE setting.
+        """
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            page_size = settings.API_PAGE_SIZE
+        return max(1, min(page_size, settings.API_MAX_PAGE_SIZE))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Get the items of the page following the cursor given in the request, the first page without a cursor.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor is not None:
+            try:
+                queryset = queryset.filter(self.seek(self.decode_cursor(cursor)))
+            except (ValueError, TypeError, ValidationError, BinasciiError) as error:
+                raise NotFound(self.invalid_cursor_message) from error
+
+        page = list(queryset[:page_size + 1])
+        self.next_cursor = self.encode_cursor(page[page_size - 1]) if len(page) > page_size else None
+        return page[:page_size]
+
+    def get_next_link(self, cursor=None):
+        """
+        Get the URL of the next page, or None on the last page.
+
+        Args:
+            cursor (str): The cursor of the next page, the one of the current page by default.
+        """
+        cursor = cursor or self.next_cursor
+        if cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        """
+        Build the response of a page, linking to the next page in the 'Link' header.
+        """
+        response = Response(data)
+        next_link = self.get_next_link()
+        if next_link is not None:
+            response['Link'] = f'<{next_link}>; rel="next"'
+        return response
+
+    def seek(self, position):
+        """
+        Build the condition selecting the items after the given position in the ordering.
+
+        Args:
+            position (list): The values of the ordering fields of the last item of the previous page.
+
+        Returns:
+            Q: The condition (a > x) OR (a = x AND b > y) OR ..., with < for descending fields.
+        """
+        if len(position) != len(self.ordering):
+            raise ValueError('The cursor does not match the ordering')
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def encode_cursor(self, item):
+        """
+        Encode the position of an item in the ordering into an opaque cursor.
+        """
+        position = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            value = item[name] if isinstance(item, dict) else getattr(item, name)
+            position.append(value if isinstance(value, int) else value.isoformat())
+        return urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """
+        Decode the position encoded in a cursor.
+        """
+        position = json.loads(urlsafe_b64decode(cursor.encode('ascii')))
+        if not isinstance(position, list):
+            raise ValueError('The cursor is not a position')
+        return position
+
+
+class ShowPagination(KeysetPagination):  # pylint: disable=abstract-method
+    """
+    Keyset pagination of shows in chronological order, served by the (date, time, id) index.
+    """
+    ordering = ('date', 'time', 'id')
+
+
+class SearchHistoryPagination(KeysetPagination):  # pylint: disable=abstract-method
+    """
+    Keyset pagination of the search history, newest first, served by the (created_date, id) index.
+    """
+    ordering = ('-created_date', '-id')
@@ -0,0 +1,141 @@
+import atexit
+import logging
+import threading
+from collections import deque
+from django.db import DatabaseError, close_old_connections
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from .models import SearchHistory
+
+logger = logging.getLogger(__name__)
+
+# Searches kept in memory at most, further searches are dropped until the buffer is flushed
+SEARCH_HISTORY_BUFFER_SIZE = 10000
+# Searches written per INSERT statement, a full batch wakes the flusher up
+SEARCH_HISTORY_BATCH_SIZE = 200
+# Seconds between two flushes of a partial batch
+SEARCH_HISTORY_FLUSH_INTERVAL = 5
+
+
+def build_search_event(user, city, showing_date):
+    """
+    Build the search history entry of a show search, if the search is complete and valid.
+
+    Args:
+        user (AppUser): The authenticated user, or None.
+        city (str): The city searched for, as given by the client.
+        showing_date (str): The date searched for, as given by the client.
+
+    Returns:
+        SearchHistory: The unsaved search history entry, or None if the city or the date is missing or invalid.
+    """
+    if not city or len(city) > SearchHistory.city.field.max_length:
+        return None
+    try:
+        showing_date = parse_date(showing_date or '')
+    except ValueError:
+        return None
+    if showing_date is None:
+        return None
+    return SearchHistory(user=user, city=city, showing_date=showing_date, created_date=timezone.now())
+
+
+class SearchHistoryBuffer:
+    """
+    Bounded in-process buffer of search history entries, written with bulk_create off the request path.
+
+    Entries are added without touching the database. A background thread writes them in batches of
+    `batch_size`, as soon as a batch is full or every `flush_interval` seconds. When the buffer is full,
+    for instance while the database is unavailable, new entries are dropped and counted instead of
+    slowing the requests down. A batch which cannot be written is dropped and counted too.
+    """
+    def __init__(self, max_size=SEARCH_HISTORY_BUFFER_SIZE, batch_size=SEARCH_HISTORY_BATCH_SIZE,
+                 flush_interval=SEARCH_HISTORY_FLUSH_INTERVAL):
+        """
+        Initialize an empty buffer, without a flusher thread.
+        """
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._entries = deque()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._counters = {'written': 0, 'dropped_full': 0, 'dropped_failed': 0}
+
+    def start(self):
+        """
+        Start the background thread flushing the buffer, and flush the buffer at exit.
+
+        Only the processes serving requests start it, elsewhere entries stay buffered until flushed explicitly.
+        """
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self._thread is None:
+                atexit.register(self.flush)
+            self._thread = threading.Thread(target=self._run, name='search-history-flusher', daemon=True)
+            self._thread.start()
+
+    def add(self, entry):
+        """
+        Buffer an unsaved search history entry, or drop it if the buffer is full.
+
+        Args:
+            entry (SearchHistory): The entry to write.
+
+        Returns:
+            bool: Whether the entry was buffered.
+        """
+        with self._condition:
+            if len(self._entries) >= self.max_size:
+                self._counters['dropped_full'] += 1
+                return False
+            self._entries.append(entry)
+            if len(self._entries) >= self.batch_size:
+                self._condition.notify()
+        return True
+
+    def flush(self):
+        """
+        Write all buffered entries, one batch per INSERT statement.
+
+        Returns:
+            int: The number of entries written.
+        """
+        written = 0
+        while True:
+            with self._condition:
+                batch = [self._entries.popleft() for _ in range(min(self.batch_size, len(self._entries)))]
+            if not batch:
+                return written
+            try:
+                SearchHistory.objects.bulk_create(batch)
+            except DatabaseError:
+                logger.exception("Dropped %s search history entries which could not be written", len(batch))
+                with self._condition:
+                    self._counters['dropped_failed'] += len(batch)
+                return written
+            written += len(batch)
+            with self._condition:
+                self._counters['written'] += len(batch)
+
+    def stats(self):
+        """
+        Get the counters of the buffer.
+        """
+        with self._condition:
+            return {'buffered': len(self._entries), **self._counters}
+
+    def _run(self):
+        """
+        Flush the buffer whenever a batch is full or the flush interval elapsed.
+        """
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: len(self._entries) >= self.batch_size, self.flush_interval)
+            # The thread outlives requests, so it cleans its unusable or expired connections up itself
+            close_old_connections()
+            self.flush()
+
+
+search_history_buffer = SearchHistoryBuffer()
@@ -1,7 +1,9 @@
+from operator import itemgetter
 from rest_framework import serializers
+from django.db import models
 from django.utils import timezone
 from scraper.models import Cinema, Movie, Show
-from .models import SearchHistory
+from .models import SearchHistory, SearchRollup, UserSearchRollup
 
 
 class SearchHistorySerializer(serializers.ModelSerializer):
@@ -23,6 +25,24 @@ class SearchHistorySerializer(serializers.ModelSerializer):
         return data
 
 
+class SearchRollupSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the SearchRollup model.
+    """
+    class Meta:
+        model = SearchRollup
+        fields = ['city', 'showing_date', 'day', 'count']
+
+
+class UserSearchRollupSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the UserSearchRollup model.
+    """
+    class Meta:
+        model = UserSearchRollup
+        fields = ['day', 'count']
+
+
 class CinemaSerializer(serializers.ModelSerializer):
     """
     Serializer for the Cinema model.
@@ -51,3 +71,121 @@ class ShowSerializer(serializers.ModelSerializer):
     class Meta:
         model = Show
         fields = ['cinema', 'movie', 'date', 'time', 'booking_link']
+
+
+class CompactMovieSerializer(MovieSerializer):
+    """
+    Serializer for the Movie model without its description.
+    """
+    class Meta(MovieSerializer.Meta):
+        fields = ['title', 'category', 'image_url', 'movie_url']
+
+
+class CompactShowSerializer(ShowSerializer):
+    """
+    Serializer for the Show model without the description of its movie.
+    """
+    movie = CompactMovieSerializer(read_only=True)
+
+
+class GroupedShowListSerializer(serializers.ListSerializer):  # pylint: disable=abstract-method
+    """
+    Serializer for a list of shows grouped by movie, then by cinema, listing each movie and cinema once.
+
+    The movie, cinema and show time fields are rendered by the fields of the child show serializer.
+    Movies and cinemas keep the order of their first show.
+    """
+    show_time_fields = ['date', 'time', 'booking_link']
+
+    def to_representation(self, data):
+        """
+        Group the shows into a list of movies, each with its cinemas and their show times.
+        """
+        fields = self.child.fields
+        movies = {}
+        for show in data.all() if isinstance(data, models.manager.BaseManager) else data:
+            movie = movies.get(show.movie_id)
+            if movie is None:
+                movie = movies[show.movie_id] = {'movie': fields['movie'].to_representation(show.movie), 'cinemas': {}}
+            cinema = movie['cinemas'].get(show.cinema_id)
+            if cinema is None:
+                cinema = movie['cinemas'][show.cinema_id] = {
+                    'cinema': fields['cinema'].to_representation(show.cinema), 'shows': []
+                }
+            cinema['shows'].append({
+                name: fields[name].to_representation(getattr(show, name)) for name in self.show_time_fields
+            })
+        return [{'movie': movie['movie'], 'cinemas': list(movie['cinemas'].values())} for movie in movies.values()]
+
+
+class ShowListingSerializer:
+    """
+    Read-only fast path of a show serializer for the show listings.
+
+    Instead of going through the field machinery of the DRF serializer for every show, the fields of the
+    given serializer are compiled once into values() lookups and accessors, and the listing is built straight
+    from values() rows, which also carry the ids of the show, its movie and its cinema. The output is the same
+    as the one of the given serializer, in the flat layout, and of GroupedShowListSerializer, in the grouped layout.
+    """
+    def __init__(self, serializer):
+        """
+        Compile the fields of the given show serializer.
+
+        Args:
+            serializer (ShowSerializer): The serializer whose output is reproduced.
+        """
+        self.lookups = ['id', 'movie_id', 'cinema_id']
+        self.accessors = self._compile(serializer, '')
+
+    def values(self, queryset):
+        """
+        Get the values() rows of the shows of the queryset, holding the columns read by the listing.
+        """
+        return queryset.values(*self.lookups)
+
+    def to_flat(self, rows):
+        """
+        Build the flat listing of the given values() rows.
+        """
+        accessors = self.accessors.items()
+        return [{name: access(row) for name, access in accessors} for row in rows]
+
+    def to_grouped(self, rows):
+        """
+        Build the listing of the given values() rows grouped by movie, then by cinema.
+        """
+        access_movie, access_cinema = self.accessors['movie'], self.accessors['cinema']
+        show_time_accessors = [
+            (name, self.accessors[name]) for name in GroupedShowListSerializer.show_time_fields
+        ]
+        movies = {}
+        for row in rows:
+            movie = movies.get(row['movie_id'])
+            if movie is None:
+                movie = movies[row['movie_id']] = {'movie': access_movie(row), 'cinemas': {}}
+            cinema = movie['cinemas'].get(row['cinema_id'])
+            if cinema is None:
+                cinema = movie['cinemas'][row['cinema_id']] = {'cinema': access_cinema(row), 'shows': []}
+            cinema['shows'].append({name: access(row) for name, access in show_time_accessors})
+        return [{'movie': movie['movie'], 'cinemas': list(movie['cinemas'].values())} for movie in movies.values()]
+
+    def _compile(self, serializer, prefix):
+        """
+        Compile the fields of a serializer into accessors of values() rows, registering their lookups.
+
+        Nested serializers are compiled recursively, with their lookups prefixed by their source.
+        Date and time fields are rendered in ISO 8601 format, as DRF does by default.
+        """
+        accessors = {}
+        for name, field in serializer.fields.items():
+            if isinstance(field, serializers.BaseSerializer):
+                nested = self._compile(field, f'{prefix}{field.source}__')
+                accessors[name] = lambda row, nested=nested.items(): {key: access(row) for key, access in nested}
+                continue
+            lookup = f'{prefix}{field.source}'
+            self.lookups.append(lookup)
+            if isinstance(field, (serializers.DateField, serializers.TimeField)):
+                accessors[name] = lambda row, lookup=lookup: None if row[lookup] is None else row[lookup].isoformat()
+            else:
+                accessors[name] = itemgetter(lookup)
+        return accessors
@@ -0,0 +1,156 @@
+import gzip
+import logging
+import os
+import shutil
+from datetime import date
+from pathlib import Path
+from uuid import uuid4
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from scraper.models import Show
+from .cache import get_listing_version
+from .pagination import ShowPagination
+from .renderers import ORJSONRenderer
+from .serializers import ShowSerializer, ShowListingSerializer
+
+logger = logging.getLogger(__name__)
+
+# Name of the symlink pointing to the directory of the current snapshot version
+CURRENT_SNAPSHOT = 'current'
+
+# Query parameters of the listings which are materialized as snapshots
+SNAPSHOT_PARAMS = {'cinema__city', 'date'}
+
+
+def get_snapshot_root():
+    """
+    Get the directory holding the versioned listing snapshots.
+    """
+    return Path(settings.LISTING_SNAPSHOT_ROOT)
+
+
+def is_safe_path_segment(name):
+    """
+    Check whether a city name can be used as a directory name of the snapshots.
+    """
+    return bool(name) and not name.startswith('.') and '/' not in name and '\\' not in name
+
+
+def is_iso_date(value):
+    """
+    Check whether a value is a date in the YYYY-MM-DD format used by the snapshot file names.
+    """
+    try:
+        return date.fromisoformat(value).isoformat() == value
+    except ValueError:
+        return False
+
+
+def write_listing_snapshots():
+    """
+    Materialize the default listing of every (city, date) pair with upcoming shows as gzipped JSON snapshots.
+
+    The snapshots of the current listing version are written to <root>/<version>/<city>/<date>.json.gz,
+    the same layout nginx serves with gzip_static, then the <root>/current symlink is swapped to them.
+    Each listing holds the shows of the cities starting with the city, like the cinema__city filter of
+    ShowList. Listings longer than a page are paginated by ShowList and are not materialized.
+    Snapshots of versions older than the previous one are removed.
+
+    Returns:
+        int: The number of snapshots written, 0 if they already existed for the current version.
+    """
+    version = str(get_listing_version())
+    root = get_snapshot_root()
+    target = root / version
+    if target.exists():
+        return 0
+
+    listing_serializer = ShowListingSerializer(ShowSerializer())
+    queryset = Show.objects.filter(date__gte=timezone.now().date()).order_by(*ShowPagination.ordering)
+    shows_by_date = {}
+    for show in listing_serializer.to_flat(listing_serializer.values(queryset)):
+        shows_by_date.setdefault(show['date'], []).append(show)
+    cities = {show['cinema']['city'] for shows in shows_by_date.values() for show in shows}
+    cities = sorted(city for city in cities if is_safe_path_segment(city))
+
+    renderer = ORJSONRenderer()
+    staging = root / f'.{version}-{uuid4().hex}'
+    count = 0
+    for city in cities:
+        (staging / city).mkdir(parents=True)
+        for showing_date, shows in shows_by_date.items():
+            listing = [show for show in shows if show['cinema']['city'].startswith(city)]
+            if 0 < len(listing) <= settings.API_PAGE_SIZE:
+                content = gzip.compress(renderer.render(listing), mtime=0)
+                (staging / city / f'{showing_date}.json.gz').write_bytes(content)
+                count += 1
+
+    staging.mkdir(parents=True, exist_ok=True)
+    try:
+        staging.rename(target)
+    except OSError:
+        # Written concurrently by another task for the same version
+        shutil.rmtree(staging, ignore_errors=True)
+        return 0
+
+    link = root / f'.{CURRENT_SNAPSHOT}-{uuid4().hex}'
+    link.symlink_to(version)
+    os.replace(link, root / CURRENT_SNAPSHOT)
+    prune_listing_snapshots(root, keep=2)
+    logger.info("Wrote %s listing snapshots of version %s", count, version)
+    return count
+
+
+def prune_listing_snapshots(root, keep):
+    """
+    Remove all but the newest snapshot versions, leaving time to readers of the previous one.
+
+    Args:
+        root (Path): The directory holding the versioned listing snapshots.
+        keep (int): The number of versions to keep.
+    """
+    versions = sorted((path for path in root.iterdir() if path.name.isdigit() and path.is_dir()),
+                      key=lambda path: int(path.name))
+    for path in versions[:-keep]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def read_listing_snapshot(version, params):
+    """
+    Read the gzipped snapshot of a listing, if it is a default city/date listing of the current version.
+
+    Args:
+        version (int): The current data version.
+        params (dict): The normalized query parameters of the listing.
+
+    Returns:
+        bytes: The gzipped JSON listing, or None if there is no snapshot to serve.
+    """
+    if set(params) != SNAPSHOT_PARAMS:
+        return None
+    city, showing_date = params['cinema__city'], params['date']
+    if not is_safe_path_segment(city) or not is_iso_date(showing_date):
+        return None
+
+    root = get_snapshot_root()
+    try:
+        if os.readlink(root / CURRENT_SNAPSHOT) != str(version):
+            return None
+        return (root / str(version) / city / f'{showing_date}.json.gz').read_bytes()
+    except OSError:
+        return None
+
+
+def snapshot_response(request, snapshot):
+    """
+    Build the response serving a gzipped snapshot, decompressing it for clients not accepting gzip.
+    """
+    if 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+        response = HttpResponse(snapshot, content_type=ORJSONRenderer.media_type)
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(gzip.decompress(snapshot), content_type=ORJSONRenderer.media_type)
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
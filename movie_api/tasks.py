@@ -0,0 +1,75 @@
+from datetime import datetime, time, timedelta
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .models import SearchHistory, SearchRollup, UserSearchRollup
+
+logger = get_task_logger(__name__)
+
+# Days of raw search history kept once rolled up
+SEARCH_HISTORY_RETENTION_DAYS = 30
+
+# Number of rollups written per INSERT statement
+ROLLUP_BATCH_SIZE = 500
+
+
+def start_of_day(day):
+    """
+    Get the aware datetime of the start of a day in the current time zone.
+
+    Args:
+        day (date): The day.
+
+    Returns:
+        datetime: Midnight of the day.
+    """
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+@shared_task
+def roll_up_search_history():
+    """
+    Celery task rolling the raw search history up into daily counts, then pruning old raw rows.
+
+    Searches of each complete day not rolled up yet are counted per (city, showing_date, day) and per
+    (user, day) with GROUP BY queries. The latest rolled up day is counted again, which makes the task
+    idempotent and lets it catch up after missed runs. Raw rows older than the retention window are
+    deleted afterwards, all of them being part of the rollups by then.
+
+    Returns:
+        dict: The number of city rollups, user rollups and pruned raw rows.
+    """
+    today = timezone.localdate()
+    searches = SearchHistory.objects.filter(created_date__lt=start_of_day(today))
+    latest_day = SearchRollup.objects.aggregate(latest_day=Max('day'))['latest_day']
+    if latest_day is not None:
+        searches = searches.filter(created_date__gte=start_of_day(latest_day))
+    searches = searches.annotate(day=TruncDate('created_date')).order_by()
+
+    city_rollups = [
+        SearchRollup(**row)
+        for row in searches.values('city', 'showing_date', 'day').annotate(count=Count('id'))
+    ]
+    user_rollups = [
+        UserSearchRollup(user_id=row['user'], day=row['day'], count=row['count'])
+        for row in searches.filter(user__isnull=False).values('user', 'day').annotate(count=Count('id'))
+    ]
+
+    with transaction.atomic():
+        SearchRollup.objects.bulk_create(
+            city_rollups, batch_size=ROLLUP_BATCH_SIZE, update_conflicts=True,
+            unique_fields=['city', 'showing_date', 'day'], update_fields=['count'],
+        )
+        UserSearchRollup.objects.bulk_create(
+            user_rollups, batch_size=ROLLUP_BATCH_SIZE, update_conflicts=True,
+            unique_fields=['user', 'day'], update_fields=['count'],
+        )
+        retention_start = start_of_day(today - timedelta(days=SEARCH_HISTORY_RETENTION_DAYS))
+        pruned, _ = SearchHistory.objects.filter(created_date__lt=retention_start).delete()
+
+    totals = {'city_rollups': len(city_rollups), 'user_rollups': len(user_rollups), 'pruned': pruned}
+    logger.info("Search history rolled up: %s", totals)
+    return totals
@@ -0,0 +1,66 @@
+from unittest.mock import patch, MagicMock
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from movie_api.cache import get_listing_version, bump_listing_version, listing_cache_key, normalize_city, \
+    get_or_compute
+
+
+class ListingVersionTest(SimpleTestCase):
+    """Test suite for the data version of the show listings."""
+
+    def setUp(self):
+        """Start every test with an empty cache."""
+        cache.clear()
+
+    def test_version_is_stable_until_bumped(self):
+        """Ensure that the version only changes when it is bumped."""
+        version = get_listing_version()
+        self.assertEqual(get_listing_version(), version)
+
+        bump_listing_version()
+        self.assertGreater(get_listing_version(), version)
+
+    def test_cache_key_depends_on_version_and_params(self):
+        """Ensure that the cache key changes with the version and the parameters, but not their order."""
+        key = listing_cache_key(1, {'cinema__city': 'krakow', 'date': '2035-06-01'})
+        self.assertEqual(key, listing_cache_key(1, {'date': '2035-06-01', 'cinema__city': 'krakow'}))
+        self.assertNotEqual(key, listing_cache_key(2, {'cinema__city': 'krakow', 'date': '2035-06-01'}))
+        self.assertNotEqual(key, listing_cache_key(1, {'cinema__city': 'kielce', 'date': '2035-06-01'}))
+
+    def test_normalize_city(self):
+        """Ensure that the city filter is stripped and lowercased."""
+        self.assertEqual(normalize_city(' Krakow '), 'krakow')
+        self.assertIsNone(normalize_city(None))
+
+
+class GetOrComputeTest(SimpleTestCase):
+    """Test suite for the stampede protected cache lookup."""
+
+    def setUp(self):
+        """Start every test with an empty cache."""
+        cache.clear()
+
+    def test_value_is_computed_once(self):
+        """Ensure that a cached value is not computed again."""
+        compute = MagicMock(return_value=[])
+        self.assertEqual(get_or_compute('key', compute), [])
+        self.assertEqual(get_or_compute('key', compute), [])
+        compute.assert_called_once()
+
+    def test_concurrent_miss_waits_for_lock_holder(self):
+        """Ensure that a miss while another process computes the value waits for its result."""
+        cache.add('key:lock', 1)
+        compute = MagicMock()
+
+        with patch('movie_api.cache.time.sleep', side_effect=lambda _: cache.set('key', ['computed'])):
+            self.assertEqual(get_or_compute('key', compute), ['computed'])
+        compute.assert_not_called()
+
+    def test_concurrent_miss_computes_after_waiting_too_long(self):
+        """Ensure that a miss computes the value itself when the lock holder does not finish in time."""
+        cache.add('key:lock', 1)
+        compute = MagicMock(return_value=['fallback'])
+
+        with patch('movie_api.cache.LISTING_LOCK_WAIT', 0):
+            self.assertEqual(get_or_compute('key', compute), ['fallback'])
+        compute.assert_called_once()
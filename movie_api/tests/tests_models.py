@@ -1,5 +1,5 @@
 from django.test import TestCase
-from movie_api.models import SearchHistory
+from movie_api.models import SearchHistory, SearchRollup
 from user_api.models import AppUser
 
 
@@ -22,3 +22,15 @@ class ShowModelTest(TestCase):
         self.assertEqual(search_history.city, 'kielce')
         self.assertEqual(search_history.showing_date, '2023-06-01')
         self.assertEqual(search_history.created_date, '2023-06-04 16:54:38.070959+00')
+
+
+class SearchRollupModelTest(TestCase):
+    """
+    Test class for the SearchRollup model.
+    """
+    def test_rollup_str(self):
+        """
+        Test case for the string representation of a SearchRollup object.
+        """
+        rollup = SearchRollup.objects.create(city='kielce', showing_date='2023-06-01', day='2023-05-30', count=3)
+        self.assertEqual(str(rollup), 'kielce 2023-06-01 on 2023-05-30: 3')
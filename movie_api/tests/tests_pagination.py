@@ -0,0 +1,110 @@
+import re
+from datetime import timedelta
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from movie_api.models import SearchHistory
+from movie_api.views import MovieList, ShowList
+from scraper.models import Cinema, Movie, Show
+from user_api.models import AppUser
+
+
+class KeysetPaginationTestMixin:
+    """Helpers following the 'Link' headers of the paginated listings."""
+
+    factory = APIRequestFactory()
+    user = None
+
+    def get(self, view, uri):
+        """Return the rendered response of the view to the given URI."""
+        request = self.factory.get(uri)
+        force_authenticate(request, user=self.user)
+        response = view(request)
+        response.render()
+        return response
+
+    @staticmethod
+    def next_link(response):
+        """Return the URI of the next page, or None on the last page."""
+        match = re.match(r'<http://testserver(?P<uri>[^>]+)>; rel="next"', response.get('Link', ''))
+        return match and match.group('uri')
+
+    def get_all_pages(self, view, uri):
+        """Return the pages of the listing, following the links to the next pages."""
+        pages = []
+        while uri is not None:
+            response = self.get(view, uri)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data)
+            uri = self.next_link(response)
+        return pages
+
+
+class ShowPaginationTest(KeysetPaginationTestMixin, TestCase):
+    """Test suite for the keyset pagination of the ShowList view."""
+
+    def setUp(self):
+        """Create shows of a city, several of them at the same date and time."""
+        cache.clear()
+        cinema = Cinema.objects.create(name='multikino', city='krakow')
+        movie = Movie.objects.create(title='Test movie')
+        self.links = []
+        for i in range(7):
+            Show.objects.create(cinema=cinema, movie=movie, date='2035-06-01', time=f'1{i // 3}:00:00',
+                                booking_link=f'https://example.com/{i}')
+            self.links.append(f'https://example.com/{i}')
+
+    def test_pages_cover_the_listing_in_order(self):
+        """Ensure that the pages list every show once, by date, time and id."""
+        pages = self.get_all_pages(ShowList.as_view(), '/show-list/?cinema__city=krakow&page_size=2')
+        self.assertEqual([len(page) for page in pages], [2, 2, 2, 1])
+        self.assertEqual([show['booking_link'] for page in pages for show in page], self.links)
+
+    def test_cached_pages_link_to_the_next_page(self):
+        """Ensure that pages served from the cache still link to the next page."""
+        uri = '/show-list/?cinema__city=krakow&page_size=2'
+        pages = self.get_all_pages(ShowList.as_view(), uri)
+        with self.assertNumQueries(0):
+            cached_pages = self.get_all_pages(ShowList.as_view(), uri)
+        self.assertEqual(cached_pages, pages)
+
+    def test_page_takes_one_query(self):
+        """Ensure that a page past the first one is read with a single query."""
+        second_page = self.next_link(self.get(ShowList.as_view(), '/show-list/?cinema__city=krakow&page_size=2'))
+        with self.assertNumQueries(1):
+            self.get(ShowList.as_view(), second_page)
+
+    @override_settings(API_PAGE_SIZE=4, API_MAX_PAGE_SIZE=5)
+    def test_page_size_is_bounded(self):
+        """Ensure that the default page size applies and that larger pages are bounded by the maximum."""
+        self.assertEqual(len(self.get(ShowList.as_view(), '/show-list/?cinema__city=krakow').data), 4)
+        self.assertEqual(len(self.get(ShowList.as_view(), '/show-list/?cinema__city=krakow&page_size=100').data), 5)
+
+    def test_invalid_cursor(self):
+        """Ensure that an invalid cursor is answered with 404."""
+        for cursor in ('not-a-cursor', 'WyJ4Il0=', 'WyIyMDM1LTA2LTAxIiwgIngiLCAxXQ=='):
+            with self.subTest(cursor=cursor):
+                response = self.get(ShowList.as_view(), f'/show-list/?cinema__city=krakow&cursor={cursor}')
+                self.assertEqual(response.status_code, 404)
+
+
+class SearchHistoryPaginationTest(KeysetPaginationTestMixin, TestCase):
+    """Test suite for the keyset pagination of the MovieList view."""
+
+    def setUp(self):
+        """Create test user and search history, part of it created at the same time."""
+        self.user = AppUser.objects.create_user(email='jacob@example.com', username='jacob', password='top_secret')
+        now = timezone.now()
+        self.searches = [
+            SearchHistory.objects.create(city='krakow', showing_date='2035-06-01',
+                                         created_date=now - timedelta(minutes=i // 2))
+            for i in range(5)
+        ]
+
+    def test_pages_list_newest_first(self):
+        """Ensure that the pages list every search once, newest first."""
+        pages = self.get_all_pages(MovieList.as_view(), '/movie-list/?page_size=2')
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        expected = sorted(self.searches, key=lambda search: (search.created_date, search.id), reverse=True)
+        self.assertEqual([search['id'] for page in pages for search in page], [search.id for search in expected])
@@ -0,0 +1,32 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+from movie_api.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTest(SimpleTestCase):
+    """Test suite for the ORJSONRenderer."""
+
+    def assert_same_bytes(self, data, accepted_media_type=None):
+        """Ensure that the data renders to the same bytes as with the DRF JSONRenderer."""
+        self.assertEqual(ORJSONRenderer().render(data, accepted_media_type),
+                         JSONRenderer().render(data, accepted_media_type))
+
+    def test_renders_like_drf(self):
+        """Ensure that unicode, escaped characters, nulls and numbers are rendered as by DRF."""
+        self.assert_same_bytes([{'title': 'Zażółć "gęślą" \\ jaźń\u2028\u2029\n', 'number': None, 'rating': 7.5,
+                                 'count': 3, 'active': True, 'tags': []}])
+
+    def test_falls_back_to_drf_encoder(self):
+        """Ensure that types orjson does not handle like DRF are encoded by the DRF encoder."""
+        self.assert_same_bytes({'price': Decimal('12.50'), 'created': datetime(2035, 6, 1, 12, tzinfo=timezone.utc),
+                                1: 'non string key'})
+
+    def test_indented_output(self):
+        """Ensure that output indented through the media type is rendered as by DRF."""
+        self.assert_same_bytes({'title': 'Movie', 'shows': [1, 2]}, 'application/json; indent=4')
+
+    def test_no_data(self):
+        """Ensure that no data renders to an empty body."""
+        self.assertEqual(ORJSONRenderer().render(None), b'')
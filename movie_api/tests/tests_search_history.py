@@ -0,0 +1,98 @@
+import threading
+from datetime import date
+from unittest.mock import patch
+from django.db import DatabaseError
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIRequestFactory
+from movie_api.models import SearchHistory
+from movie_api.search_history import SearchHistoryBuffer, build_search_event
+from movie_api.views import ShowList
+
+
+class BuildSearchEventTest(SimpleTestCase):
+    """Test suite for building search history entries from show searches."""
+
+    def test_complete_search(self):
+        """Ensure that a search with a city and a date is logged with the parsed date."""
+        entry = build_search_event(None, 'krakow', '2035-06-01')
+        self.assertEqual(entry.city, 'krakow')
+        self.assertEqual(entry.showing_date, date(2035, 6, 1))
+        self.assertIsNotNone(entry.created_date)
+
+    def test_incomplete_or_invalid_search(self):
+        """Ensure that searches which cannot be stored are not logged."""
+        self.assertIsNone(build_search_event(None, 'krakow', None))
+        self.assertIsNone(build_search_event(None, None, '2035-06-01'))
+        self.assertIsNone(build_search_event(None, 'krakow', 'tomorrow'))
+        self.assertIsNone(build_search_event(None, 'krakow', '2035-02-30'))
+        self.assertIsNone(build_search_event(None, 'k' * 101, '2035-06-01'))
+
+
+class SearchHistoryBufferTest(TestCase):
+    """Test suite for the SearchHistoryBuffer."""
+
+    def setUp(self):
+        """Create a small buffer."""
+        self.buffer = SearchHistoryBuffer(max_size=5, batch_size=2, flush_interval=60)
+
+    def add_entries(self, count):
+        """Add the given number of search history entries to the buffer."""
+        return [self.buffer.add(build_search_event(None, f'city-{i}', '2035-06-01')) for i in range(count)]
+
+    def test_flush_writes_in_batches(self):
+        """Ensure that buffered entries are written with one INSERT per batch."""
+        self.add_entries(5)
+        with self.assertNumQueries(3):
+            self.assertEqual(self.buffer.flush(), 5)
+        self.assertEqual(SearchHistory.objects.count(), 5)
+        self.assertEqual(self.buffer.stats(), {'buffered': 0, 'written': 5, 'dropped_full': 0, 'dropped_failed': 0})
+
+    def test_full_buffer_drops_entries(self):
+        """Ensure that entries added to a full buffer are dropped and counted."""
+        self.assertEqual(self.add_entries(7), [True] * 5 + [False] * 2)
+        self.assertEqual(self.buffer.stats()['dropped_full'], 2)
+        self.assertEqual(self.buffer.stats()['buffered'], 5)
+
+    def test_failed_batch_is_dropped(self):
+        """Ensure that a batch which cannot be written is dropped and counted, leaving the rest buffered."""
+        self.add_entries(3)
+        with patch.object(SearchHistory.objects, 'bulk_create', side_effect=DatabaseError):
+            self.assertEqual(self.buffer.flush(), 0)
+        self.assertEqual(self.buffer.stats()['dropped_failed'], 2)
+        self.assertEqual(self.buffer.flush(), 1)
+
+    def test_full_batch_wakes_flusher_up(self):
+        """Ensure that the background thread flushes as soon as a batch is full."""
+        written = threading.Event()
+        with patch.object(SearchHistory.objects, 'bulk_create', side_effect=lambda batch: written.set()), \
+                patch('movie_api.search_history.close_old_connections'):
+            self.buffer.start()
+            self.add_entries(2)
+            self.assertTrue(written.wait(5))
+
+
+class ShowListSearchHistoryTest(TestCase):
+    """Test suite for the search history logging of the ShowList view."""
+
+    def setUp(self):
+        """Setup API request factory and an empty search history buffer."""
+        self.factory = APIRequestFactory()
+        self.buffer = SearchHistoryBuffer()
+        buffer_patch = patch('movie_api.views.search_history_buffer', self.buffer)
+        buffer_patch.start()
+        self.addCleanup(buffer_patch.stop)
+
+    def test_search_is_logged_in_background(self):
+        """Ensure that a search is buffered instead of being written by the request."""
+        with self.assertNumQueries(1):  # shows only
+            ShowList.as_view()(self.factory.get('/show-list/?cinema__city=krakow&date=2035-06-01'))
+        self.assertFalse(SearchHistory.objects.exists())
+
+        self.buffer.flush()
+        self.assertEqual(SearchHistory.objects.get().city, 'krakow')
+
+    def test_incomplete_search_is_not_logged(self):
+        """Ensure that a search without a city succeeds and is not logged."""
+        response = ShowList.as_view()(self.factory.get('/show-list/?date=2035-06-01'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.buffer.stats()['buffered'], 0)
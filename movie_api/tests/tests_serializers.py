@@ -1,9 +1,12 @@
 from datetime import datetime, timedelta
 from django.test import TestCase
 from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
 from scraper.models import Cinema, Movie, Show
 from movie_api.models import SearchHistory
-from movie_api.serializers import SearchHistorySerializer, CinemaSerializer, MovieSerializer, ShowSerializer
+from movie_api.renderers import ORJSONRenderer
+from movie_api.serializers import SearchHistorySerializer, CinemaSerializer, MovieSerializer, ShowSerializer, \
+    GroupedShowListSerializer, CompactShowSerializer, ShowListingSerializer
 
 
 class MovieSerializerTest(TestCase):
@@ -53,6 +56,82 @@ class ShowSerializerTest(TestCase):
         self.assertCountEqual(data.keys(), ['cinema', 'movie', 'date', 'time', 'booking_link'])
 
 
+class GroupedShowListSerializerTest(TestCase):
+    """Test suite for the GroupedShowListSerializer."""
+
+    def setUp(self):
+        """Create two shows of a movie in one cinema and GroupedShowListSerializer instance."""
+        self.cinema = Cinema.objects.create(name='Test cinema', city='Test city')
+        self.movie = Movie.objects.create(title='Test movie', category='Drama', description='Test description',
+                                          image_url='https://example.com/image.jpg')
+        for i in range(2):
+            Show.objects.create(cinema=self.cinema, movie=self.movie, date='2023-06-03', time=f'1{i}:00:00',
+                                booking_link=f'https://example.com/booking_link/{i}')
+        self.serializer = GroupedShowListSerializer(Show.objects.order_by('time'), child=ShowSerializer())
+
+    def test_lists_movie_and_cinema_once(self):
+        """Ensure that the movie and the cinema are listed once, with both show times."""
+        data = self.serializer.data
+        self.assertEqual(len(data), 1)
+        self.assertEqual(data[0]['movie'], MovieSerializer(self.movie).data)
+        self.assertEqual(len(data[0]['cinemas']), 1)
+        self.assertEqual(data[0]['cinemas'][0]['cinema'], CinemaSerializer(self.cinema).data)
+        self.assertEqual(data[0]['cinemas'][0]['shows'], [
+            {'date': '2023-06-03', 'time': '10:00:00', 'booking_link': 'https://example.com/booking_link/0'},
+            {'date': '2023-06-03', 'time': '11:00:00', 'booking_link': 'https://example.com/booking_link/1'},
+        ])
+
+
+class ShowListingSerializerParityTest(TestCase):
+    """Test suite proving that the ShowListingSerializer renders the same bytes as the DRF serializers."""
+
+    def setUp(self):
+        """Create shows of movies and cinemas with missing, non-ASCII and separator characters in their fields."""
+        cinemas = [
+            Cinema.objects.create(name='Multikino', city='Kraków', address='ul. Dobrego Pasterza 128', number=3),
+            Cinema.objects.create(name='Helios', city='Łódź', address=None, number=None),
+        ]
+        movies = [
+            Movie.objects.create(title='Zażółć gęślą jaźń', category='Dramat', description='Line\u2028break\u2029',
+                                 image_url='https://example.com/image.jpg', movie_url='https://example.com/movie'),
+            Movie.objects.create(title='"Quoted" \\ movie', category=None, description=None, image_url=None,
+                                 movie_url=None),
+        ]
+        for i in range(8):
+            Show.objects.create(cinema=cinemas[i % 2], movie=movies[i // 4], date=f'2035-06-0{i % 3 + 1}',
+                                time=f'1{i}:30:00.{i * 125000:06d}' if i % 2 else f'1{i}:00:00',
+                                booking_link=f'https://example.com/booking/{i}')
+        self.queryset = Show.objects.order_by('date', 'time')
+
+    def assert_same_bytes(self, expected_data, data):
+        """Ensure that both data render to the same bytes, with the DRF renderer and the orjson renderer."""
+        expected = JSONRenderer().render(expected_data)
+        self.assertEqual(JSONRenderer().render(data), expected)
+        self.assertEqual(ORJSONRenderer().render(data), expected)
+
+    def test_flat_listing(self):
+        """Ensure that the flat listing matches ShowSerializer and CompactShowSerializer."""
+        for serializer_class in (ShowSerializer, CompactShowSerializer):
+            with self.subTest(serializer_class=serializer_class.__name__):
+                listing = ShowListingSerializer(serializer_class())
+                self.assert_same_bytes(serializer_class(self.queryset, many=True).data,
+                                       listing.to_flat(listing.values(self.queryset)))
+
+    def test_grouped_listing(self):
+        """Ensure that the grouped listing matches GroupedShowListSerializer."""
+        for serializer_class in (ShowSerializer, CompactShowSerializer):
+            with self.subTest(serializer_class=serializer_class.__name__):
+                listing = ShowListingSerializer(serializer_class())
+                self.assert_same_bytes(GroupedShowListSerializer(self.queryset, child=serializer_class()).data,
+                                       listing.to_grouped(listing.values(self.queryset)))
+
+    def test_takes_one_query(self):
+        """Ensure that the listing is built from a single query."""
+        listing = ShowListingSerializer(ShowSerializer())
+        with self.assertNumQueries(1):
+            listing.to_flat(listing.values(self.queryset))
+
+
 class SearchHistorySerializerTest(TestCase):
     """Test suite for the SearchHistorySerializer."""
 
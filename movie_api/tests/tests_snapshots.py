@@ -0,0 +1,97 @@
+import gzip
+import os
+import shutil
+import tempfile
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory
+from movie_api.cache import bump_listing_version, get_listing_version
+from movie_api.snapshots import write_listing_snapshots, read_listing_snapshot
+from movie_api.views import ShowList
+from scraper.models import Cinema, Movie, Show
+
+
+class ListingSnapshotTest(TestCase):
+    """Test suite for the precomputed city/date listing snapshots."""
+
+    def setUp(self):
+        """Create shows in two cities, one being a prefix of the other, in a temporary snapshot root."""
+        cache.clear()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        settings_override = override_settings(LISTING_SNAPSHOT_ROOT=self.root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.factory = APIRequestFactory()
+        movie = Movie.objects.create(title='Test movie', description='Opis filmu')
+        cinemas = [Cinema.objects.create(name='helios', city=city) for city in ('lodz', 'lodz-manufaktura')]
+        for i, cinema in enumerate(cinemas):
+            Show.objects.create(cinema=cinema, movie=movie, date='2035-06-01', time=f'1{i}:00:00',
+                                booking_link=f'https://example.com/{i}')
+        Show.objects.create(cinema=cinemas[0], movie=movie, date='2020-06-01', time='12:00:00',
+                            booking_link='https://example.com/past')
+
+    def get(self, query, **headers):
+        """Return the rendered ShowList response for the given query string and request headers."""
+        response = ShowList.as_view()(self.factory.get('/show-list/' + query, **headers))
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+    def test_snapshots_match_listings(self):
+        """Ensure that a snapshot is written for every upcoming city/date pair, with the listing as content."""
+        self.assertEqual(write_listing_snapshots(), 2)
+
+        version = get_listing_version()
+        self.assertEqual(os.readlink(os.path.join(self.root, 'current')), str(version))
+        for city in ('lodz', 'lodz-manufaktura'):
+            snapshot = read_listing_snapshot(version, {'cinema__city': city, 'date': '2035-06-01'})
+            cache.clear()
+            listing = self.get(f'?cinema__city={city}&date=2035-06-01&layout=flat').content
+            self.assertEqual(gzip.decompress(snapshot), listing)
+        self.assertIsNone(read_listing_snapshot(version, {'cinema__city': 'lodz', 'date': '2020-06-01'}))
+
+    def test_listings_longer_than_a_page_are_not_written(self):
+        """Ensure that listings paginated by ShowList are not materialized."""
+        with override_settings(API_PAGE_SIZE=1):
+            self.assertEqual(write_listing_snapshots(), 1)
+        version = get_listing_version()
+        self.assertIsNone(read_listing_snapshot(version, {'cinema__city': 'lodz', 'date': '2035-06-01'}))
+        self.assertIsNotNone(read_listing_snapshot(version, {'cinema__city': 'lodz-manufaktura', 'date': '2035-06-01'}))
+
+    def test_snapshots_are_written_once_per_version(self):
+        """Ensure that snapshots are not rewritten for the same version and only two versions are kept."""
+        write_listing_snapshots()
+        self.assertEqual(write_listing_snapshots(), 0)
+
+        for _ in range(3):
+            bump_listing_version()
+            write_listing_snapshots()
+        versions = [name for name in os.listdir(self.root) if name.isdigit()]
+        self.assertEqual(len(versions), 2)
+        self.assertIn(str(get_listing_version()), versions)
+
+    def test_listing_is_served_from_snapshot(self):
+        """Ensure that a city/date listing is served gzipped from its snapshot, without querying shows."""
+        write_listing_snapshots()
+
+        with self.assertNumQueries(0):
+            response = self.get('?cinema__city=lodz&date=2035-06-01', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+        plain = self.get('?cinema__city=lodz&date=2035-06-01')
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertEqual(plain.content, gzip.decompress(response.content))
+
+    def test_stale_or_filtered_listing_is_not_served_from_snapshot(self):
+        """Ensure that listings with extra parameters or of a newer version are not served from a snapshot."""
+        write_listing_snapshots()
+        filtered = self.get('?cinema__city=lodz&date=2035-06-01&include_description=false',
+                            HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(filtered.has_header('Content-Encoding'))
+
+        bump_listing_version()
+        stale = self.get('?cinema__city=lodz&date=2035-06-01', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(stale.has_header('Content-Encoding'))
@@ -0,0 +1,65 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from movie_api.models import SearchHistory, SearchRollup, UserSearchRollup
+from movie_api.tasks import roll_up_search_history, SEARCH_HISTORY_RETENTION_DAYS
+from user_api.models import AppUser
+
+
+class RollUpSearchHistoryTest(TestCase):
+    """Test suite for the roll_up_search_history task."""
+
+    def setUp(self):
+        """Create a user and the reference days."""
+        self.user = AppUser.objects.create_user(email='jacob@example.com', username='jacob', password='top_secret')
+        self.today = timezone.localdate()
+        self.now = timezone.now()
+
+    def search(self, days_ago, city='krakow', showing_date='2035-06-01', user=None):
+        """Create a raw search made the given number of days ago."""
+        return SearchHistory.objects.create(user=user, city=city, showing_date=showing_date,
+                                            created_date=self.now - timedelta(days=days_ago))
+
+    def test_complete_days_are_rolled_up(self):
+        """Ensure that the searches of complete days are counted per city/showing date and per user."""
+        for _ in range(3):
+            self.search(1, user=self.user)
+        self.search(1, city='kielce')
+        self.search(2, user=self.user)
+        self.search(0)
+
+        totals = roll_up_search_history()
+
+        yesterday = self.today - timedelta(days=1)
+        self.assertEqual(totals['city_rollups'], 3)
+        self.assertEqual(SearchRollup.objects.get(city='krakow', day=yesterday).count, 3)
+        self.assertEqual(SearchRollup.objects.get(city='kielce', day=yesterday).count, 1)
+        self.assertFalse(SearchRollup.objects.filter(day=self.today).exists())
+        self.assertEqual(
+            list(UserSearchRollup.objects.order_by('day').values_list('day', 'count')),
+            [(self.today - timedelta(days=2), 1), (yesterday, 3)],
+        )
+
+    def test_roll_up_is_idempotent_and_catches_up(self):
+        """Ensure that running the task again counts the latest day again without double counting."""
+        self.search(2)
+        roll_up_search_history()
+        self.search(2)
+        self.search(1)
+
+        roll_up_search_history()
+
+        self.assertEqual(SearchRollup.objects.get(day=self.today - timedelta(days=2)).count, 2)
+        self.assertEqual(SearchRollup.objects.get(day=self.today - timedelta(days=1)).count, 1)
+
+    def test_raw_rows_past_retention_are_pruned(self):
+        """Ensure that raw searches past the retention window are deleted once rolled up."""
+        old = self.search(SEARCH_HISTORY_RETENTION_DAYS + 1)
+        recent = self.search(1)
+
+        self.assertEqual(roll_up_search_history()['pruned'], 1)
+
+        self.assertFalse(SearchHistory.objects.filter(id=old.id).exists())
+        self.assertTrue(SearchHistory.objects.filter(id=recent.id).exists())
+        self.assertTrue(SearchRollup.objects.filter(day=self.today - timedelta(days=SEARCH_HISTORY_RETENTION_DAYS + 1))
+                        .exists())
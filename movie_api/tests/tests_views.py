@@ -1,9 +1,18 @@
 import json
+from operator import itemgetter
+from unittest import skipUnless
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIRequestFactory
 from rest_framework.test import force_authenticate
 from mixer.backend.django import mixer
-from movie_api.views import MovieList, MovieDetail, MovieCreate, MovieDelete, ShowList, ApiOverview
+from movie_api.views import MovieList, MovieDetail, MovieCreate, MovieDelete, ShowList, ApiOverview, \
+    SearchRollupList, UserSearchRollupList
+from movie_api.models import SearchRollup, UserSearchRollup
+from movie_api.cache import bump_listing_version
+from scraper.models import Cinema, Movie, Show
 from user_api.models import AppUser
 
 
@@ -66,6 +75,42 @@ class MovieDeleteViewTest(TestCase):
                          f'Expected Response Code 204, received {response.status_code} instead.')
 
 
+class SearchRollupListViewTest(TestCase):
+    """Test suite for the search analytics views."""
+
+    def setUp(self):
+        """Create test users, their daily searches and the rollups of two cities."""
+        self.factory = APIRequestFactory()
+        self.user = AppUser.objects.create_user(email='jacob@example.com', username='jacob', password='top_secret')
+        other_user = AppUser.objects.create_user(email='anna@example.com', username='anna', password='top_secret')
+        for day in ('2035-06-01', '2035-06-02', '2035-06-03'):
+            SearchRollup.objects.create(city='krakow', showing_date='2035-06-05', day=day, count=4)
+            SearchRollup.objects.create(city='kielce', showing_date='2035-06-05', day=day, count=1)
+            UserSearchRollup.objects.create(user=self.user, day=day, count=2)
+            UserSearchRollup.objects.create(user=other_user, day=day, count=7)
+
+    def get(self, view, query=''):
+        """Return the response of the view to an authenticated request with the given query string."""
+        request = self.factory.get('/analytics/' + query)
+        force_authenticate(request, user=self.user)
+        return view(request)
+
+    def test_search_rollups(self):
+        """Ensure that the rollups can be filtered by city and day range."""
+        response = self.get(SearchRollupList.as_view(), '?city=krakow&since=2035-06-02&until=2035-06-03')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(row['day'], row['count']) for row in response.data], [('2035-06-02', 4), ('2035-06-03', 4)])
+
+    def test_invalid_day_is_rejected(self):
+        """Ensure that an invalid day filter is answered with 400."""
+        self.assertEqual(self.get(SearchRollupList.as_view(), '?since=yesterday').status_code, 400)
+
+    def test_user_search_rollups(self):
+        """Ensure that users only get their own daily summaries."""
+        response = self.get(UserSearchRollupList.as_view(), '?until=2035-06-02')
+        self.assertEqual(response.data, [{'day': '2035-06-01', 'count': 2}, {'day': '2035-06-02', 'count': 2}])
+
+
 class ShowListViewTest(TestCase):
     """Test suite for the ShowList view."""
 
@@ -85,6 +130,233 @@ class ShowListViewTest(TestCase):
                          f'Expected Response Code 200, received {response.status_code} instead.')
 
 
+class ShowListQueryPlanTest(TestCase):
+    """Test suite checking that the ShowList queries are served by indexes."""
+
+    def setUp(self):
+        """Create shows in a few cities and setup API request factory."""
+        self.factory = APIRequestFactory()
+        movie = Movie.objects.create(title='Test movie')
+        for city in ['krakow', 'kielce', 'warszawa-wola-park']:
+            cinema = Cinema.objects.create(name='multikino', city=city)
+            for day in range(1, 4):
+                Show.objects.create(cinema=cinema, movie=movie, date=f'2035-06-0{day}', time='12:00:00',
+                                    booking_link=f'https://example.com/{city}/{day}')
+
+    def explain(self, queryset):
+        """Return the query plan, making sequential scans unattractive so that the tiny test tables use indexes."""
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+        return queryset.explain()
+
+    def get_queryset(self, query):
+        """Return the ShowList queryset for the given query string."""
+        view = ShowList()
+        view.request = ShowList().initialize_request(self.factory.get('/show-list/' + query))
+        return view.get_queryset()
+
+    def test_date_listing_uses_show_index(self):
+        """Ensure that filtering and ordering shows of a date uses one of the (date, ...) indexes."""
+        plan = self.explain(self.get_queryset('?date=2035-06-02'))
+        self.assertRegex(plan, 'show_date_(cinema|time_id)_idx')
+
+    @skipUnless(connection.vendor == 'postgresql', 'Pattern ops indexes are PostgreSQL specific.')
+    def test_city_prefix_uses_pattern_index(self):
+        """Ensure that the city prefix lookup uses the varchar_pattern_ops index."""
+        plan = self.explain(Cinema.objects.filter(city__startswith='warszawa'))
+        self.assertIn('cinema_city_prefix_idx', plan)
+
+
+class QueryBudgetTestCase(TestCase):
+    """Base test case enforcing the number of queries of an endpoint, whatever the size of the result."""
+
+    def setUp(self):
+        """Create test user, 50 shows of 5 movies in 5 cinemas and some search history."""
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.user = AppUser.objects.create_user(email='jacob@example.com', username='jacob', password='top_secret')
+        cinemas = [Cinema.objects.create(name='multikino', city=f'krakow-{i}') for i in range(5)]
+        movies = [Movie.objects.create(title=f'Movie {i}', description='Long description') for i in range(5)]
+        for i in range(50):
+            Show.objects.create(cinema=cinemas[i % 5], movie=movies[i // 10], date='2035-06-01', time='12:00:00',
+                                booking_link=f'https://example.com/{i}')
+        self.search_history = [mixer.blend('movie_api.SearchHistory', user=self.user) for _ in range(20)]
+
+    def assert_budget(self, view, uri, budget, **kwargs):
+        """Render the response of the view and check the number of queries it took."""
+        request = self.factory.get(uri)
+        force_authenticate(request, user=self.user)
+        with self.assertNumQueries(budget):
+            response = view(request, **kwargs)
+            response.render()
+        self.assertEqual(response.status_code, 200)
+        return response
+
+
+class ShowListQueryBudgetTest(QueryBudgetTestCase):
+    """Test suite enforcing the number of queries of the show listings."""
+
+    SHOW_LIST_BUDGET = 1  # shows with their cinemas and movies, the search history is written in the background
+    SHOW_LIST_UNFILTERED_BUDGET = 1  # shows with their cinemas and movies
+
+    def test_show_list(self):
+        """Ensure that a city/date listing takes a constant number of queries."""
+        response = self.assert_budget(ShowList.as_view(), '/show-list/?cinema__city=krakow&date=2035-06-01',
+                                      self.SHOW_LIST_BUDGET)
+        self.assertEqual(len(response.data), 50)
+
+    def test_show_list_without_filters(self):
+        """Ensure that an unfiltered listing takes a constant number of queries."""
+        self.assert_budget(ShowList.as_view(), '/show-list/', self.SHOW_LIST_UNFILTERED_BUDGET)
+
+    def test_show_list_without_description(self):
+        """Ensure that movie descriptions are neither loaded nor returned when the client opts out."""
+        request = self.factory.get('/show-list/?cinema__city=krakow&date=2035-06-01&include_description=false')
+        with self.assertNumQueries(1) as context:
+            response = ShowList.as_view()(request)
+            response.render()
+        self.assertNotIn('description', response.data[0]['movie'])
+        self.assertNotIn('description', context.captured_queries[0]['sql'])
+
+    def test_grouped_show_list(self):
+        """Ensure that a grouped listing takes the same number of queries and lists each movie and cinema once."""
+        response = self.assert_budget(ShowList.as_view(), '/show-list/?cinema__city=krakow&date=2035-06-01'
+                                      '&layout=grouped', self.SHOW_LIST_BUDGET)
+        self.assertEqual([group['movie']['title'] for group in response.data], [f'Movie {i}' for i in range(5)])
+        for group in response.data:
+            self.assertEqual(len(group['cinemas']), 5)
+            self.assertEqual({len(cinema['shows']) for cinema in group['cinemas']}, {2})
+
+    def test_grouped_show_list_has_the_same_shows(self):
+        """Ensure that the grouped listing contains exactly the shows of the default listing."""
+        query = '/show-list/?cinema__city=krakow&date=2035-06-01'
+        flat = ShowList.as_view()(self.factory.get(query)).data
+        grouped = ShowList.as_view()(self.factory.get(query + '&layout=grouped')).data
+
+        regrouped = [
+            {'cinema': cinema['cinema'], 'movie': group['movie'], **show}
+            for group in grouped for cinema in group['cinemas'] for show in cinema['shows']
+        ]
+        by_link = itemgetter('booking_link')
+        self.assertEqual(sorted(regrouped, key=by_link), sorted(flat, key=by_link))
+
+
+class SearchHistoryQueryBudgetTest(QueryBudgetTestCase):
+    """Test suite enforcing the number of queries of the search history endpoints."""
+
+    MOVIE_LIST_BUDGET = 1
+    MOVIE_DETAIL_BUDGET = 1
+
+    def test_movie_list(self):
+        """Ensure that the search history listing takes a constant number of queries."""
+        self.assert_budget(MovieList.as_view(), '/movie-list/', self.MOVIE_LIST_BUDGET)
+
+    def test_movie_detail(self):
+        """Ensure that a search history entry takes a constant number of queries."""
+        self.assert_budget(MovieDetail.as_view(), f'/movie-detail/{self.search_history[0].id}/',
+                           self.MOVIE_DETAIL_BUDGET, pk=self.search_history[0].id)
+
+
+class ShowListCacheTest(TestCase):
+    """Test suite for the cached show listings."""
+
+    def setUp(self):
+        """Create a show and setup API request factory."""
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.cinema = Cinema.objects.create(name='multikino', city='krakow')
+        self.movie = Movie.objects.create(title='Test movie')
+        Show.objects.create(cinema=self.cinema, movie=self.movie, date='2035-06-01', time='12:00:00',
+                            booking_link='https://example.com/1')
+
+    def get(self, query):
+        """Return the rendered ShowList response for the given query string."""
+        response = ShowList.as_view()(self.factory.get('/show-list/' + query))
+        response.render()
+        return response
+
+    def test_repeated_listing_is_served_from_cache(self):
+        """Ensure that a repeated search does not query shows again, even with a differently written city."""
+        self.get('?cinema__city=krakow&date=2035-06-01')
+        with self.assertNumQueries(0):
+            response = self.get('?cinema__city=%20Krakow&date=2035-06-01')
+        self.assertEqual(len(response.data), 1)
+
+    def test_bumped_version_is_not_served_stale(self):
+        """Ensure that shows stored after a version bump are listed."""
+        self.get('?cinema__city=krakow&date=2035-06-01')
+        Show.objects.create(cinema=self.cinema, movie=self.movie, date='2035-06-01', time='18:00:00',
+                            booking_link='https://example.com/2')
+        bump_listing_version()
+
+        response = self.get('?cinema__city=krakow&date=2035-06-01')
+        self.assertEqual(len(response.data), 2)
+
+
+class ShowListConditionalGetTest(TestCase):
+    """Test suite for the conditional requests of the show listings."""
+
+    def setUp(self):
+        """Create a show and setup API request factory."""
+        cache.clear()
+        self.factory = APIRequestFactory()
+        cinema = Cinema.objects.create(name='multikino', city='krakow')
+        movie = Movie.objects.create(title='Test movie')
+        Show.objects.create(cinema=cinema, movie=movie, date='2035-06-01', time='12:00:00',
+                            booking_link='https://example.com/1')
+
+    def get(self, query='?cinema__city=krakow&date=2035-06-01', **headers):
+        """Return the rendered ShowList response for the given query string and request headers."""
+        response = ShowList.as_view()(self.factory.get('/show-list/' + query, **headers))
+        response.render()
+        return response
+
+    def test_response_has_validators(self):
+        """Ensure that the listing carries an ETag and a Last-Modified header."""
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', response)
+
+    def test_matching_etag_is_not_modified_without_show_query(self):
+        """Ensure that a matching If-None-Match is answered with 304 without querying shows."""
+        etag = self.get()['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse([query for query in queries if 'scraper_show' in query['sql']])
+
+    def test_matching_last_modified_is_not_modified(self):
+        """Ensure that an If-Modified-Since not older than the data is answered with 304."""
+        last_modified = self.get()['Last-Modified']
+        self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+    def test_etag_depends_on_params_and_data_version(self):
+        """Ensure that the ETag changes with the filters and with new data."""
+        etag = self.get()['ETag']
+        self.assertNotEqual(self.get('?cinema__city=kielce&date=2035-06-01')['ETag'], etag)
+        self.assertEqual(self.get('?cinema__city=%20Krakow&date=2035-06-01')['ETag'], etag)
+
+        bump_listing_version()
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_depends_on_media_type(self):
+        """Ensure that the ETag of the JSON listing does not validate the browsable API page, nor the reverse."""
+        etag = self.get()['ETag']
+        response = self.get(HTTP_ACCEPT='text/html', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('Accept', response['Vary'])
+
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+        self.assertEqual(self.get(HTTP_ACCEPT='text/html', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+
 class ApiOverviewTest(TestCase):
     """Test suite for the ApiOverview view."""
 
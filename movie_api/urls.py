@@ -1,5 +1,6 @@
 from django.urls import path
-from .views import ShowList, ApiOverview, MovieList, MovieDetail, MovieCreate, MovieUpdate, MovieDelete
+from .views import ShowList, ApiOverview, MovieList, MovieDetail, MovieCreate, MovieUpdate, MovieDelete, \
+    SearchRollupList, UserSearchRollupList
 
 
 urlpatterns = [
@@ -10,4 +11,6 @@ urlpatterns = [
     path('movie-update/<str:pk>/', MovieUpdate.as_view(), name='movie-update'),
     path('movie-delete/<str:pk>/', MovieDelete.as_view(), name='movie-delete'),
     path('cinemas_in_city/', ShowList.as_view(), name='cinema_in_city_list'),
+    path('analytics/searches/', SearchRollupList.as_view(), name='search-rollup-list'),
+    path('analytics/my-searches/', UserSearchRollupList.as_view(), name='user-search-rollup-list'),
 ]
@@ -1,12 +1,29 @@
 from rest_framework import generics
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
+from rest_framework.renderers import BrowsableAPIRenderer
 from django_filters.rest_framework import DjangoFilterBackend
-from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.dateparse import parse_date
+from django.utils.http import http_date
 from scraper.models import Show
-from .models import SearchHistory
-from .serializers import ShowSerializer, SearchHistorySerializer
+from .cache import get_listing_version, get_or_compute, listing_cache_key, listing_validators, normalize_city
+from .models import SearchHistory, SearchRollup, UserSearchRollup
+from .pagination import ShowPagination, SearchHistoryPagination
+from .renderers import ORJSONRenderer
+from .serializers import ShowSerializer, CompactShowSerializer, ShowListingSerializer, SearchHistorySerializer, \
+    SearchRollupSerializer, UserSearchRollupSerializer
+from .search_history import build_search_event, search_history_buffer
+from .snapshots import read_listing_snapshot, snapshot_response
+
+# Columns read by ShowSerializer, the listing query does not load anything else
+SHOW_LISTING_FIELDS = [
+    'date', 'time', 'booking_link',
+    'cinema__name', 'cinema__city', 'cinema__address', 'cinema__number',
+    'movie__title', 'movie__category', 'movie__description', 'movie__image_url', 'movie__movie_url',
+]
 
 
 class ApiOverview(APIView):
@@ -24,6 +41,8 @@ class ApiOverview(APIView):
             'Update': '/movie-update/<str:pk>',
             'Delete': '/movie-delete/<str:pk>',
             'Search': '/cinema_in_city>',
+            'Search Analytics': '/analytics/searches/',
+            'My Search Analytics': '/analytics/my-searches/',
         }
 
         return Response(api_urls)
@@ -31,10 +50,11 @@ class ApiOverview(APIView):
 
 class MovieList(generics.ListAPIView):
     """
-    Returns a list of movie searches.
+    Returns a list of movie searches, newest first, paginated with a cursor.
     """
     queryset = SearchHistory.objects.all()
     serializer_class = SearchHistorySerializer
+    pagination_class = SearchHistoryPagination
 
 
 class MovieDetail(generics.RetrieveAPIView):
@@ -69,13 +89,102 @@ class MovieDelete(generics.DestroyAPIView):
     serializer_class = SearchHistorySerializer
 
 
+def filter_days(queryset, request):
+    """
+    Filter rollups by the 'since' and 'until' days given in the query parameters.
+
+    Args:
+        queryset (QuerySet): The rollups.
+        request (Request): The request carrying the query parameters.
+
+    Returns:
+        QuerySet: The rollups of the requested days.
+
+    Raises:
+        ValidationError: If a day is not a valid YYYY-MM-DD date.
+    """
+    for param, lookup in (('since', 'day__gte'), ('until', 'day__lte')):
+        value = request.query_params.get(param)
+        if value is None:
+            continue
+        try:
+            day = parse_date(value)
+        except ValueError:
+            day = None
+        if day is None:
+            raise ValidationError({param: 'Enter a valid date in the YYYY-MM-DD format.'})
+        queryset = queryset.filter(**{lookup: day})
+    return queryset
+
+
+class SearchRollupList(generics.ListAPIView):
+    """
+    API endpoint for listing the daily number of searches per city and showing date.
+
+    The rollups can be filtered by 'city' and by the 'since' and 'until' days, both inclusive.
+    """
+    serializer_class = SearchRollupSerializer
+
+    def get_queryset(self):
+        """
+        Get a queryset of SearchRollup objects filtered by the provided query parameters.
+        """
+        queryset = SearchRollup.objects.order_by('day', 'city', 'showing_date')
+        city = self.request.query_params.get('city')
+        if city is not None:
+            queryset = queryset.filter(city=city)
+        return filter_days(queryset, self.request)
+
+
+class UserSearchRollupList(generics.ListAPIView):
+    """
+    API endpoint for listing the daily number of searches of the authenticated user.
+
+    The rollups can be filtered by the 'since' and 'until' days, both inclusive.
+    """
+    serializer_class = UserSearchRollupSerializer
+
+    def get_queryset(self):
+        """
+        Get a queryset of the UserSearchRollup objects of the authenticated user.
+        """
+        return filter_days(UserSearchRollup.objects.filter(user=self.request.user).order_by('day'), self.request)
+
+
 class ShowList(generics.ListAPIView):
     """
     API endpoint for listing shows based on filters.
+
+    Movie descriptions are left out of the query and the response when 'include_description=false' is given.
+    With 'layout=grouped' the shows are grouped by movie, then cinema, so that each is listed only once.
+    Listings are cached per normalized query and data version, the version being bumped whenever the scrape
+    tasks change the show data. City/date listings without other parameters are served from the snapshots
+    written at the end of each scrape run, when they are of the current version.
+    Shows are paginated with a cursor, the link to the next page being sent in the 'Link' header.
     """
     permission_classes = [AllowAny]  # Authorization off
     serializer_class = ShowSerializer
     filter_backends = [DjangoFilterBackend]
+    pagination_class = ShowPagination
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
+
+    def include_description(self):
+        """
+        Check whether the client asked for movie descriptions, which is the default.
+        """
+        return self.request.query_params.get('include_description', 'true').lower() != 'false'
+
+    def is_grouped(self):
+        """
+        Check whether the client asked for the listing grouped by movie and cinema.
+        """
+        return self.request.query_params.get('layout', 'flat').lower() == 'grouped'
+
+    def get_serializer_class(self):
+        """
+        Use the serializer without movie descriptions when the client does not need them.
+        """
+        return ShowSerializer if self.include_description() else CompactShowSerializer
 
     def get_queryset(self):
         """
@@ -83,13 +192,19 @@ class ShowList(generics.ListAPIView):
 
         The queryset can be filtered by 'cinema__city' and 'date'. If 'cinema__city' is provided in the query
         parameters, the queryset will be filtered to include only shows in cinemas in cities that start with
-        the provided string. If 'date' is provided, the queryset will be filtered to include only shows on that date.
+        the provided string, stripped and lowercased. If 'date' is provided, the queryset will be filtered to
+        include only shows on that date.
+        Shows are ordered by date, time and id, which is served by the (date, time, id) index. Cinemas and movies
+        are fetched in the same query, projected to the columns the serializer reads.
 
         Returns:
         QuerySet: The queryset of Show objects, filtered according to the provided query parameters.
         """
-        queryset = Show.objects.all()
-        city = self.request.query_params.get('cinema__city', None)
+        fields = SHOW_LISTING_FIELDS if self.include_description() else [
+            field for field in SHOW_LISTING_FIELDS if field != 'movie__description'
+        ]
+        queryset = Show.objects.select_related('cinema', 'movie').only(*fields).order_by(*ShowPagination.ordering)
+        city = normalize_city(self.request.query_params.get('cinema__city', None))
         date = self.request.query_params.get('date', None)
         if city is not None:
             queryset = queryset.filter(cinema__city__startswith=city)
@@ -97,12 +212,38 @@ class ShowList(generics.ListAPIView):
             queryset = queryset.filter(date=date)
         return queryset
 
+    def get_listing_params(self):
+        """
+        Get the query parameters of the listing, normalized the same way as they are applied to the queryset.
+        """
+        params = self.request.query_params.dict()
+        if 'cinema__city' in params:
+            params['cinema__city'] = normalize_city(params['cinema__city'])
+        return params
+
+    def get_listing(self):
+        """
+        Serialize the requested page of the filtered shows into plain, cacheable data, building it straight
+        from values() rows, along with the cursor of the next page.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = ShowListingSerializer(self.get_serializer())
+        rows = self.paginate_queryset(serializer.values(queryset))
+        results = serializer.to_grouped(rows) if self.is_grouped() else serializer.to_flat(rows)
+        return {'results': results, 'next': self.paginator.next_cursor}
+
     def list(self, request, *args, **kwargs):
         """
-        Overridden list method to implement search history logging.
+        Overridden list method to implement caching, conditional requests and search history logging.
+
+        The response carries an ETag and a Last-Modified header derived from the data version, the
+        query parameters and the media type of the response, which varies with the Accept header.
+        Requests whose If-None-Match or If-Modified-Since still match are answered with 304 Not Modified
+        without querying any show.
 
-        This method logs the search history of a user if they are authenticated.
-        The user's city and the date of the show they're searching for are logged if provided in the request.
+        This method also logs the search history of a user if they are authenticated.
+        The user's city and the date of the show they're searching for are logged if both are provided in the
+        request. The entry is buffered and written in batches in the background, off the request path.
 
         Parameters:
         request (Request): The request that triggered this method. 'cinema__city' and 'date' can be optionally provided
@@ -111,24 +252,39 @@ class ShowList(generics.ListAPIView):
         kwargs (dict): Arbitrary keyword arguments.
 
         Returns:
-        Response: The HTTP response containing the serialized show data.
+        Response: The HTTP response containing the serialized show data, or 304 Not Modified.
         """
-        response = super().list(request, *args, **kwargs)
-
-        # Get user if logged in
-        user = request.user if request.user.is_authenticated else None
-
-        # Get city and showing date from request if available
-        city = request.query_params.get('cinema__city')
-        showing_date = request.query_params.get('date')
+        version = get_listing_version()
+        params = self.get_listing_params()
+        etag, last_modified = listing_validators(version, params, request.accepted_renderer.media_type)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            response = Response(status=not_modified.status_code)
+        else:
+            # Snapshots hold the compact JSON rendering, other representations are rendered as usual
+            snapshot = None
+            if request.accepted_media_type == ORJSONRenderer.media_type:
+                snapshot = read_listing_snapshot(version, params)
+            if snapshot is not None:
+                response = snapshot_response(request, snapshot)
+            else:
+                listing = get_or_compute(listing_cache_key(version, params), self.get_listing)
+                response = Response(listing['results'])
+                if listing['next'] is not None:
+                    # A cached listing is not paginated again, the paginator only gets the request here
+                    self.paginator.request = request
+                    response['Link'] = f'<{self.paginator.get_next_link(listing["next"])}>; rel="next"'
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ['Accept'])
 
-        # Only save search history if city or date were part of the request
-        if city or showing_date:
-            SearchHistory.objects.create(
-                user=user,
-                city=city,
-                showing_date=showing_date,
-                created_date=timezone.now()
-            )
+        # Log the search if it has both a city and a date, the entry is written in the background
+        entry = build_search_event(
+            request.user if request.user.is_authenticated else None,
+            request.query_params.get('cinema__city'),
+            request.query_params.get('date'),
+        )
+        if entry is not None:
+            search_history_buffer.add(entry)
 
         return response
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'moviemate.settings')
 
 application = get_asgi_application()
+
+# Search history is written in the background of the processes serving requests
+from movie_api.search_history import search_history_buffer  # pylint: disable=wrong-import-position
+
+search_history_buffer.start()
@@ -109,18 +109,42 @@ if DATABASE_CONFIG:
     database_config = json.loads(DATABASE_CONFIG)
     DATABASES.update(database_config)
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Redis is used when REDIS_URL is set, a per-process local memory cache otherwise (development and tests)
+
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # User model
 AUTH_USER_MODEL = 'user_api.AppUser'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'user_api.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ]
 }
 
+# Default and maximum number of items per page of the paginated listings
+API_PAGE_SIZE = config('API_PAGE_SIZE', default=500, cast=int)
+API_MAX_PAGE_SIZE = config('API_MAX_PAGE_SIZE', default=1000, cast=int)
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -158,6 +182,9 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 
+# Precomputed show listings, written by the scrape tasks and served by ShowList and nginx
+LISTING_SNAPSHOT_ROOT = config('LISTING_SNAPSHOT_ROOT', default=os.path.join(BASE_DIR, 'snapshots'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -172,6 +199,11 @@ CELERY_RESULT_BACKEND = 'django-db'
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 
+# Emails are sent by their own worker, so that they do not wait behind the long scraping tasks
+CELERY_TASK_ROUTES = {
+    'mailer.tasks.*': {'queue': 'mail'},
+}
+
 
 # Load cities from JSON
 with open('cities.json', 'r', encoding='utf-8') as f:
@@ -194,15 +226,36 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'scraper.tasks.delete_past_shows',
         'schedule': crontab(hour=1, minute=10),
     },
+    'roll_up_search_history': {
+        'task': 'movie_api.tasks.roll_up_search_history',
+        'schedule': crontab(hour=0, minute=30),
+    },
 }
 
 # Celery worker settings
 CELERY_TASK_SOFT_TIME_LIMIT = 8000
 CELERY_TASK_TIME_LIMIT = 9000
 
+# Block images, fonts, media and third-party scripts in the scraping browser
+SCRAPER_BLOCK_RESOURCES = config('SCRAPER_BLOCK_RESOURCES', default=True, cast=bool)
+
+# Resource kinds (image, font, media, third_party) still loaded by the scraping browser, per chain
+SCRAPER_ALLOWED_RESOURCES = {
+    'multikino': config('SCRAPER_ALLOWED_RESOURCES_MULTIKINO', default='', cast=Csv()),
+    'helios': config('SCRAPER_ALLOWED_RESOURCES_HELIOS', default='', cast=Csv()),
+}
+
+# BeautifulSoup tree builder of the scrapers, html.parser is used when it is not installed
+SCRAPER_HTML_PARSER = config('SCRAPER_HTML_PARSER', default='lxml')
+
+# Archive of the raw HTML of the scraped pages, which can be parsed again offline
+SCRAPER_ARCHIVE_ROOT = config('SCRAPER_ARCHIVE_ROOT', default=os.path.join(BASE_DIR, 'archive'))
+SCRAPER_ARCHIVE_RETENTION_DAYS = config('SCRAPER_ARCHIVE_RETENTION_DAYS', default=14, cast=int)
+
 
-# EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
-EMAIL_BACKEND = 'django_ses.SESBackend'
+# Set EMAIL_BACKEND=django.core.mail.backends.console.EmailBackend to print emails instead of sending them
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django_ses.SESBackend')
+DEFAULT_FROM_EMAIL = 'moviemate.md@gmail.com'
 AWS_ACCESS_KEY_ID = config('AWS_ACCESS_KEY_ID')
 AWS_SECRET_ACCESS_KEY = config('AWS_SECRET_ACCESS_KEY')
 AWS_SES_REGION_NAME = config('AWS_SES_REGION_NAME')
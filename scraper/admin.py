@@ -1,6 +1,52 @@
 from django.contrib import admin
-from .models import Cinema, Movie, Show
+from .models import Cinema, Movie, Show, ScrapeRun, ScrapeUnit
 
 admin.site.register(Cinema)
 admin.site.register(Movie)
 admin.site.register(Show)
+
+
+class ScrapeUnitInline(admin.TabularInline):
+    """
+    Read-only units of a scrape run, slowest first.
+    """
+    model = ScrapeUnit
+    ordering = ('-duration',)
+    fields = ('city', 'cinema_number', 'date', 'duration', 'fetch_time', 'parse_time', 'write_time',
+              'pages', 'transferred_bytes', 'blocked_requests', 'films', 'shows', 'created_shows', 'unchanged',
+              'error')
+    readonly_fields = fields
+    can_delete = False
+    extra = 0
+
+    def has_add_permission(self, request, obj=None):
+        """
+        Units are only recorded by the scrape tasks.
+        """
+        return False
+
+
+@admin.register(ScrapeRun)
+class ScrapeRunAdmin(admin.ModelAdmin):
+    """
+    Admin of the scrape run ledger.
+    """
+    list_display = ('run_id', 'cinema', 'started_at', 'finished_at', 'units', 'failed_units', 'unchanged_units',
+                    'films', 'shows', 'created_shows')
+    list_filter = ('cinema',)
+    date_hierarchy = 'started_at'
+    ordering = ('-started_at',)
+    inlines = (ScrapeUnitInline,)
+
+
+@admin.register(ScrapeUnit)
+class ScrapeUnitAdmin(admin.ModelAdmin):
+    """
+    Admin of the scrape units of all runs, to compare units across runs.
+    """
+    list_display = ('run', 'city', 'cinema_number', 'date', 'duration', 'fetch_time', 'parse_time', 'write_time',
+                    'pages', 'transferred_bytes', 'blocked_requests', 'films', 'shows', 'created_shows', 'unchanged',
+                    'error')
+    list_filter = ('run__cinema', 'unchanged', 'error', 'city')
+    list_select_related = ('run',)
+    ordering = ('-duration',)
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import timedelta
+from pathlib import Path
+from uuid import uuid4
+import zstandard
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Compression level of the archived pages, HTML compresses about tenfold at this level
+ZSTD_LEVEL = 10
+
+
+def get_archive_root():
+    """
+    Get the directory holding the page archive.
+    """
+    return Path(settings.SCRAPER_ARCHIVE_ROOT)
+
+
+def get_object_path(root, digest):
+    """
+    Get the path of an archived page from the SHA-256 of its content.
+    """
+    return root / 'objects' / digest[:2] / f'{digest}.html.zst'
+
+
+def archive_pages(cinema_name, unit, pages):
+    """
+    Archive the raw HTML of the pages fetched for a scrape unit.
+
+    Pages are stored zstd-compressed under the SHA-256 of their content, so that a page fetched again
+    unchanged is stored once. Each fetch is listed in the manifest of the day, <root>/manifests/<day>.jsonl,
+    with the unit it was fetched for.
+
+    Args:
+        cinema_name (str): Name of the cinema chain.
+        unit (dict): The scrape unit, as returned by get_units.
+        pages (list): The fetched pages, as dicts with the 'url', 'source' and 'html' keys.
+
+    Returns:
+        int: The number of pages archived.
+    """
+    root = get_archive_root()
+    now = timezone.now()
+    entries = []
+    for page in pages:
+        html = page['html'].encode('utf-8') if isinstance(page['html'], str) else page['html']
+        digest = hashlib.sha256(html).hexdigest()
+        path = get_object_path(root, digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            staging = path.with_name(f'.{digest}-{uuid4().hex}')
+            staging.write_bytes(zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(html))
+            os.replace(staging, path)
+        entries.append({**unit, 'cinema': cinema_name, 'url': page['url'], 'source': page['source'],
+                        'fetched_at': now.isoformat(), 'sha256': digest, 'size': len(html)})
+
+    if entries:
+        manifest = root / 'manifests' / f'{timezone.localdate(now).isoformat()}.jsonl'
+        manifest.parent.mkdir(parents=True, exist_ok=True)
+        # A single append of whole lines, so that concurrent workers do not interleave entries
+        with open(manifest, 'a', encoding='utf-8') as file:
+            file.write(''.join(json.dumps(entry) + '\n' for entry in entries))
+    return len(entries)
+
+
+def read_archived_page(digest):
+    """
+    Read the raw HTML of an archived page.
+
+    Args:
+        digest (str): The SHA-256 of the page, as listed in the manifests.
+
+    Returns:
+        bytes: The HTML of the page.
+    """
+    return zstandard.ZstdDecompressor().decompress(get_object_path(get_archive_root(), digest).read_bytes())
+
+
+def list_archived_pages(day=None):
+    """
+    List the pages fetched on a day.
+
+    Args:
+        day (str): The day in the format '%Y-%m-%d', the latest archived day by default.
+
+    Returns:
+        list: The manifest entries of the pages, in the order they were fetched.
+    """
+    manifests = get_archive_root() / 'manifests'
+    if day is None:
+        days = sorted(path.stem for path in manifests.glob('*.jsonl'))
+        if not days:
+            return []
+        day = days[-1]
+    try:
+        with open(manifests / f'{day}.jsonl', encoding='utf-8') as file:
+            return [json.loads(line) for line in file if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def prune_archive(retention_days=None):
+    """
+    Remove the manifests older than the retention window, then the pages no manifest refers to anymore.
+
+    Args:
+        retention_days (int): Days the pages are kept, the SCRAPER_ARCHIVE_RETENTION_DAYS setting by default.
+
+    Returns:
+        int: The number of pages removed.
+    """
+    if retention_days is None:
+        retention_days = settings.SCRAPER_ARCHIVE_RETENTION_DAYS
+    root = get_archive_root()
+    manifests = root / 'manifests'
+    if not manifests.is_dir():
+        return 0
+
+    oldest = (timezone.localdate() - timedelta(days=retention_days)).isoformat()
+    referenced = set()
+    for manifest in manifests.glob('*.jsonl'):
+        if manifest.stem < oldest:
+            manifest.unlink()
+            continue
+        with open(manifest, encoding='utf-8') as file:
+            referenced.update(json.loads(line)['sha256'] for line in file if line.strip())
+
+    removed = 0
+    for path in (root / 'objects').glob('*/*.html.zst'):
+        if path.name.split('.')[0] not in referenced:
+            path.unlink()
+            removed += 1
+    for directory in (root / 'objects').iterdir():
+        try:
+            directory.rmdir()
+        except OSError:
+            # Not empty
+            pass
+    logger.info("Removed %s archived pages", removed)
+    return removed
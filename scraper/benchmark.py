@@ -0,0 +1,199 @@
+import gzip
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+import bs4
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+from django.utils import timezone
+from .archive import read_archived_page
+from .scraper import MultikinoScraper, HeliosScraper
+
+# Representative repertoire pages of each chain, gzipped, from a few films to far more than a real page lists.
+# Where each page comes from, an archived page or synthetic markup, is recorded in sources.json.
+FIXTURE_DIR = Path(__file__).resolve().parent / 'fixtures' / 'benchmark'
+FIXTURE_SIZES = ('small', 'typical', 'huge')
+FIXTURE_SOURCES = 'sources.json'
+
+# Elements which the scrapers never read, removed from the archived pages exported as fixtures
+TRIMMED_TAGS = ('script', 'style', 'noscript', 'svg', 'iframe', 'template')
+
+# BeautifulSoup tree builders compared by the benchmark
+PARSER_BACKENDS = ('html.parser', 'lxml')
+
+BENCHMARK_SCRAPERS = {
+    'multikino': MultikinoScraper,
+    'helios': HeliosScraper,
+}
+
+
+def load_fixture(chain, size):
+    """
+    Load the HTML of a benchmark fixture.
+
+    Args:
+        chain (str): Name of the cinema chain.
+        size (str): One of FIXTURE_SIZES.
+
+    Returns:
+        bytes: The HTML of the page.
+    """
+    return gzip.decompress((FIXTURE_DIR / f'{chain}_{size}.html.gz').read_bytes())
+
+
+def load_fixture_sources(fixture_dir=None):
+    """
+    Load where each benchmark fixture comes from, keyed by '<chain>_<size>'.
+    """
+    path = (fixture_dir or FIXTURE_DIR) / FIXTURE_SOURCES
+    return json.loads(path.read_text(encoding='utf-8')) if path.exists() else {}
+
+
+def trim_page(html):
+    """
+    Remove the scripts, styles, comments and other elements the scrapers never read from a page.
+
+    Args:
+        html (bytes): The HTML of the page.
+
+    Returns:
+        bytes: The trimmed HTML.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup.find_all(TRIMMED_TAGS):
+        tag.decompose()
+    for comment in soup.find_all(string=lambda text: isinstance(text, bs4.Comment)):
+        comment.extract()
+    return str(soup).encode('utf-8')
+
+
+def export_fixture(entry, size, fixture_dir=None):
+    """
+    Replace a benchmark fixture with a trimmed copy of an archived page, recording where it comes from.
+
+    Args:
+        entry (dict): The manifest entry of the archived page.
+        size (str): One of FIXTURE_SIZES.
+        fixture_dir (Path): The directory of the fixtures, FIXTURE_DIR by default.
+
+    Returns:
+        dict: The recorded source of the fixture.
+
+    Raises:
+        ValueError: If the page has no films, or trimming changes the films parsed from it.
+    """
+    scraper = BENCHMARK_SCRAPERS[entry['cinema']]()
+    html = read_archived_page(entry['sha256'])
+    trimmed = trim_page(html)
+    movie_info_list = scraper.parse_movie_info(html)
+    if not movie_info_list:
+        raise ValueError('The archived page has no films')
+    if scraper.parse_movie_info(trimmed) != movie_info_list:
+        raise ValueError('Trimming the archived page changes the films parsed from it')
+
+    fixture_dir = fixture_dir or FIXTURE_DIR
+    name = f'{entry["cinema"]}_{size}'
+    (fixture_dir / f'{name}.html.gz').write_bytes(gzip.compress(trimmed, mtime=0))
+    source = {
+        'source': 'archive',
+        'url': entry['url'],
+        'fetched_with': entry['source'],
+        'fetched_at': entry['fetched_at'],
+        'city': entry['city'],
+        'cinema_number': entry.get('cinema_number'),
+        'date': entry['date'],
+        'sha256': entry['sha256'],
+        'bytes': len(html),
+        'trimmed_bytes': len(trimmed),
+        'films': len(movie_info_list),
+        'shows': sum(len(movie_info['show_info']) for movie_info in movie_info_list),
+    }
+    sources = load_fixture_sources(fixture_dir)
+    sources[name] = source
+    (fixture_dir / FIXTURE_SOURCES).write_text(json.dumps(sources, indent=2) + '\n', encoding='utf-8')
+    return source
+
+
+def benchmark_page(scraper, html, parser, repeat):
+    """
+    Measure the extraction of the films of a page, from the raw HTML to the movie information dictionaries.
+
+    Only the film list of the page is parsed, as the scrapers do. The time is the median of `repeat` runs.
+    The peak memory is measured in a separate run, as tracing allocations slows the parsing down.
+
+    Args:
+        scraper (BaseMovieScraper): The scraper of the chain of the page.
+        html (bytes): The HTML of the page.
+        parser (str): The BeautifulSoup tree builder.
+        repeat (int): The number of timed runs.
+
+    Returns:
+        dict: The films and shows of the page, the seconds per page, films and shows per second and peak memory.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        movie_info_list = scraper.extract_movie_info(BeautifulSoup(html, parser, parse_only=scraper.PARSE_ONLY))
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        scraper.extract_movie_info(BeautifulSoup(html, parser, parse_only=scraper.PARSE_ONLY))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    seconds = statistics.median(timings)
+    films = len(movie_info_list)
+    shows = sum(len(movie_info['show_info']) for movie_info in movie_info_list)
+    return {
+        'films': films,
+        'shows': shows,
+        'seconds': round(seconds, 6),
+        'films_per_second': round(films / seconds, 1),
+        'shows_per_second': round(shows / seconds, 1),
+        'peak_memory_kb': peak // 1024,
+    }
+
+
+def run_benchmark(chains=None, sizes=None, parsers=None, repeat=5):
+    """
+    Benchmark the extraction of the fixtures of the chains with each parser backend, without a browser.
+
+    Parser backends which are not installed are listed as skipped. Each result tells whether its page
+    is an archived page or synthetic markup, as only the former is representative of the real pages.
+
+    Args:
+        chains (list): Names of the cinema chains, all of BENCHMARK_SCRAPERS by default.
+        sizes (list): Sizes of the fixtures, all of FIXTURE_SIZES by default.
+        parsers (list): Parser backends, all of PARSER_BACKENDS by default.
+        repeat (int): The number of timed runs of each page.
+
+    Returns:
+        dict: The results of each (chain, size, parser), with the versions they were measured with.
+    """
+    parsers = parsers or PARSER_BACKENDS
+    available = [parser for parser in parsers if builder_registry.lookup(parser) is not None]
+    sources = load_fixture_sources()
+    results = []
+    for chain in chains or BENCHMARK_SCRAPERS:
+        scraper = BENCHMARK_SCRAPERS[chain]()
+        for size in sizes or FIXTURE_SIZES:
+            html = load_fixture(chain, size)
+            for parser in available:
+                result = benchmark_page(scraper, html, parser, repeat)
+                results.append({
+                    'chain': chain, 'size': size, 'parser': parser, 'bytes': len(html),
+                    'source': sources.get(f'{chain}_{size}', {}).get('source', 'unknown'), **result,
+                })
+    return {
+        'created_at': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'beautifulsoup4': bs4.__version__,
+        'repeat': repeat,
+        'skipped_parsers': [parser for parser in parsers if parser not in available],
+        'results': results,
+    }
@@ -0,0 +1,58 @@
+import hashlib
+import json
+
+from .models import PageFingerprint
+
+
+def page_key(cinema_name, city_name, cinema_number, date):
+    """
+    Build the key of a repertoire page.
+
+    Args:
+        cinema_name (str): Name of the cinema chain.
+        city_name (str): Name of the city.
+        cinema_number (int): Number of the cinema, None for chains with one page per city.
+        date (str): The date of the shows in the format '%Y-%m-%d'.
+
+    Returns:
+        str: The key of the page.
+    """
+    number = '' if cinema_number is None else int(cinema_number)
+    return f'{cinema_name}:{city_name}:{number}:{date}'
+
+
+def page_fingerprint(movie_info_list):
+    """
+    Hash the films and shows of a scraped page, independently of their order on the page.
+
+    Only the fields which are stored are hashed, so that markup changes which do not change
+    the repertoire keep the fingerprint.
+
+    Args:
+        movie_info_list (list): Information about the movies and their shows, as returned by the scraper.
+
+    Returns:
+        str: The hex SHA-256 of the normalized page.
+    """
+    films = sorted(
+        (
+            {**movie_info, 'show_info': sorted(movie_info['show_info'], key=lambda show: show['booking_link'])}
+            for movie_info in movie_info_list
+        ),
+        key=lambda movie_info: (movie_info['title'], movie_info['movie_url'] or ''),
+    )
+    return hashlib.sha256(json.dumps(films, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def is_unchanged(key, fingerprint):
+    """
+    Check whether a page has the fingerprint it had when it was last stored.
+    """
+    return PageFingerprint.objects.filter(key=key, fingerprint=fingerprint).exists()
+
+
+def save_fingerprint(key, date, fingerprint):
+    """
+    Save the fingerprint of a page once its films and shows are stored.
+    """
+    PageFingerprint.objects.update_or_create(key=key, defaults={'date': date, 'fingerprint': fingerprint})
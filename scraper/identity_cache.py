@@ -0,0 +1,122 @@
+from django.utils import timezone
+
+from .models import Cinema, Movie
+
+
+class IdentityCache:
+    """
+    Run-scoped identity map of the Cinema and Movie rows used while ingesting scraped pages.
+
+    Cinemas are keyed by (name, city, number) and movies by (title, movie_url). The cache is bound
+    to a single scrape run at a time and pre-warmed with the rows of each chain on first use.
+    """
+    def __init__(self):
+        """
+        Initialize an empty IdentityCache which is not bound to any run.
+        """
+        self.run_id = None
+        self._reset()
+
+    def start_run(self, run_id, cinema_name):
+        """
+        Bind the cache to a scrape run and pre-warm it with the rows of the given chain.
+
+        Entries of a previous run are dropped. Each chain is warmed with one query per model,
+        only once per run.
+
+        Args:
+            run_id (str): Identifier of the scrape run.
+            cinema_name (str): Name of the cinema chain.
+        """
+        if run_id != self.run_id:
+            self._reset()
+            self.run_id = run_id
+
+        if cinema_name in self.warmed_chains:
+            return
+        self.warmed_chains.add(cinema_name)
+
+        for cinema in Cinema.objects.filter(name=cinema_name):
+            self.cinemas[self.cinema_key(cinema.name, cinema.city, cinema.number)] = cinema
+        movies = Movie.objects.filter(show__cinema__name=cinema_name, show__date__gte=timezone.now().date())
+        for movie in movies.distinct():
+            self.movies.setdefault((movie.title, movie.movie_url), movie)
+
+    @staticmethod
+    def cinema_key(name, city, number):
+        """
+        Build the key of a cinema. Cinema numbers are normalized, as they come as strings from cities.json.
+        """
+        return name, city, None if number is None else int(number)
+
+    def get_cinema(self, key):
+        """
+        Get a cached cinema.
+
+        Args:
+            key (tuple): The (name, city, number) of the cinema.
+
+        Returns:
+            Cinema: The cached cinema, or None on a cache miss.
+        """
+        cinema = self.cinemas.get(key)
+        self._count(cinema is not None)
+        return cinema
+
+    def get_movies(self, keys):
+        """
+        Get the cached movies among the given keys.
+
+        Args:
+            keys (iterable): The (title, movie_url) of the movies.
+
+        Returns:
+            dict: The cached movies keyed by their (title, movie_url).
+        """
+        movies = {}
+        for key in keys:
+            movie = self.movies.get(key)
+            self._count(movie is not None)
+            if movie is not None:
+                movies[key] = movie
+        return movies
+
+    def add(self, cinema_key, cinema, movies):
+        """
+        Cache rows which are known to be committed.
+
+        Args:
+            cinema_key (tuple): The (name, city, number) of the cinema.
+            cinema (Cinema): The cinema.
+            movies (dict): Movies keyed by their (title, movie_url).
+        """
+        self.cinemas[cinema_key] = cinema
+        self.movies.update(movies)
+
+    def stats(self):
+        """
+        Get the hit and miss counters of the current run.
+        """
+        return {'cache_hits': self.hits, 'cache_misses': self.misses}
+
+    def _reset(self):
+        """
+        Drop all cached rows and counters.
+        """
+        self.cinemas = {}
+        self.movies = {}
+        self.warmed_chains = set()
+        self.hits = 0
+        self.misses = 0
+
+    def _count(self, hit):
+        """
+        Count a cache hit or miss.
+        """
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+
+identity_cache = IdentityCache()
@@ -0,0 +1,166 @@
+import logging
+from bisect import bisect_left
+from datetime import timedelta
+from django.core.cache import cache
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds of the buckets of the latency histograms, the last one also counts slower pages
+LATENCY_BUCKETS = (1, 2, 3, 4, 5, 6, 8, 10, 12, 15, 20, 25, 30, 40, 50, 60, 90, 120, 180, 240, 300)
+
+# Days of page loads the histograms are computed from
+LATENCY_WINDOW_DAYS = 7
+
+# Counters of the failed page loads, kept apart from the histogram
+FAILURE_COUNTERS = ('timeouts', 'scroll_timeouts')
+
+# The wait time is learned once the window holds this many page loads, the maximum is used until then
+LATENCY_MIN_SAMPLES = 50
+LATENCY_PERCENTILE = 0.99
+LATENCY_TIMEOUT_FACTOR = 2
+MIN_WAIT_TIME = 10
+
+
+def latency_key(chain, day, bucket):
+    """
+    Build the cache key of a counter of the page loads of a chain on a day.
+
+    Args:
+        chain (str): Name of the cinema chain.
+        day (date): The day of the page loads.
+        bucket (str or int): Index of the histogram bucket, or the name of another counter, e.g. 'timeouts'.
+
+    Returns:
+        str: The cache key.
+    """
+    return f'scrape-latency:{chain}:{day:%Y-%m-%d}:{bucket}'
+
+
+def increment_counter(key):
+    """
+    Atomically increment a counter of the latency stats, which expires once it leaves the window.
+
+    The counters are only shared by the workers through a shared cache, i.e. with REDIS_URL set. With the
+    in-memory cache each process learns from its own page loads only. A counter which cannot be written
+    is logged and skipped, as the page it was counted for loaded fine.
+    """
+    timeout = (LATENCY_WINDOW_DAYS + 1) * 24 * 60 * 60
+    try:
+        cache.add(key, 0, timeout=timeout)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Evicted since it was added
+            cache.set(key, 1, timeout=timeout)
+    except Exception:  # pylint: disable=broad-exception-caught
+        logger.exception("Could not increment the latency counter %s", key)
+
+
+def record_latency(chain, seconds):
+    """
+    Record the time a page of a chain took to show its film list, or to show it has none.
+
+    Args:
+        chain (str): Name of the cinema chain.
+        seconds (float): Seconds from the start of the page load.
+    """
+    bucket = min(bisect_left(LATENCY_BUCKETS, seconds), len(LATENCY_BUCKETS) - 1)
+    increment_counter(latency_key(chain, timezone.localdate(), bucket))
+
+
+def record_timeout(chain):
+    """
+    Record a page of a chain which did not load in time.
+
+    Timeouts are counted apart from the histogram, as a dead page would otherwise stretch the wait time
+    of all the pages of the chain.
+    """
+    increment_counter(latency_key(chain, timezone.localdate(), 'timeouts'))
+
+
+def record_scroll_timeout(chain):
+    """
+    Record a page of a chain whose film list was present in time, but did not stop growing while scrolled.
+    """
+    increment_counter(latency_key(chain, timezone.localdate(), 'scroll_timeouts'))
+
+
+def get_latency_stats(chain):
+    """
+    Get the latency histogram and the failure counters of the page loads of a chain over the window.
+
+    Args:
+        chain (str): Name of the cinema chain.
+
+    Returns:
+        dict: The 'histogram', a list of page load counts per bucket of LATENCY_BUCKETS, and the counters
+            of FAILURE_COUNTERS.
+    """
+    today = timezone.localdate()
+    days = [today - timedelta(days=offset) for offset in range(LATENCY_WINDOW_DAYS)]
+    buckets = [*range(len(LATENCY_BUCKETS)), *FAILURE_COUNTERS]
+    counters = cache.get_many([latency_key(chain, day, bucket) for day in days for bucket in buckets])
+    return {
+        'histogram': [
+            sum(counters.get(latency_key(chain, day, bucket), 0) for day in days)
+            for bucket in range(len(LATENCY_BUCKETS))
+        ],
+        **{
+            counter: sum(counters.get(latency_key(chain, day, counter), 0) for day in days)
+            for counter in FAILURE_COUNTERS
+        },
+    }
+
+
+def latency_percentile(histogram, percentile):
+    """
+    Get the upper bound of the bucket holding a percentile of a latency histogram.
+
+    Args:
+        histogram (list): The page load counts per bucket of LATENCY_BUCKETS.
+        percentile (float): The percentile, between 0 and 1.
+
+    Returns:
+        int: The percentile in seconds, rounded up to a bucket bound, or None if there are too few samples.
+    """
+    total = sum(histogram)
+    if total < LATENCY_MIN_SAMPLES:
+        return None
+    cumulative = 0
+    for bound, count in zip(LATENCY_BUCKETS, histogram):
+        cumulative += count
+        if cumulative >= percentile * total:
+            return bound
+    return LATENCY_BUCKETS[-1]
+
+
+def get_wait_time(chain, max_wait_time, stats=None):
+    """
+    Get the time to wait for a page of a chain, learned from the latency of its recent page loads.
+
+    A page which did not load in time took at least the wait time, so each timeout is counted in the top
+    bucket of the histogram. Once the pages of a chain get slower than the wait, their timeouts raise the
+    p99 and the wait widens, instead of every page timing out until the fast loads leave the window.
+
+    Args:
+        chain (str): Name of the cinema chain.
+        max_wait_time (int): The longest wait, used until enough page loads are recorded.
+        stats (dict): The latency stats of the chain, as returned by get_latency_stats, read from the cache
+            by default.
+
+    Returns:
+        float: The p99 of the page loads times LATENCY_TIMEOUT_FACTOR, between MIN_WAIT_TIME and max_wait_time,
+            or max_wait_time if the stats cannot be read.
+    """
+    if stats is None:
+        try:
+            stats = get_latency_stats(chain)
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception("Could not read the latency histogram of %s", chain)
+            return max_wait_time
+    histogram = [*stats['histogram'][:-1], stats['histogram'][-1] + stats['timeouts']]
+    percentile = latency_percentile(histogram, LATENCY_PERCENTILE)
+    if percentile is None:
+        return max_wait_time
+    return min(max_wait_time, max(MIN_WAIT_TIME, percentile * LATENCY_TIMEOUT_FACTOR))
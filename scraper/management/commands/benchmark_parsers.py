@@ -0,0 +1,55 @@
+import json
+from pathlib import Path
+from django.core.management.base import BaseCommand
+from scraper.benchmark import BENCHMARK_SCRAPERS, FIXTURE_SIZES, PARSER_BACKENDS, run_benchmark
+
+
+class Command(BaseCommand):
+    """
+    Custom management command to benchmark the extraction of repertoire pages with each parser backend.
+    """
+
+    help = 'Benchmark the parsing of the checked-in repertoire pages and append the results to a JSON file'
+
+    def add_arguments(self, parser):
+        """
+        Add command line arguments.
+        """
+        parser.add_argument('-c', '--chain', action='append', choices=BENCHMARK_SCRAPERS,
+                            help='Cinema chain to benchmark, may be repeated, all chains by default')
+        parser.add_argument('-s', '--size', action='append', choices=FIXTURE_SIZES,
+                            help='Page size to benchmark, may be repeated, all sizes by default')
+        parser.add_argument('-p', '--parser', action='append', choices=PARSER_BACKENDS,
+                            help='Parser backend to benchmark, may be repeated, all backends by default')
+        parser.add_argument('-r', '--repeat', type=int, default=5, help='Number of timed runs of each page')
+        parser.add_argument('-o', '--output', type=str, default='parser_benchmark.json',
+                            help='JSON file the results are appended to')
+
+    def handle(self, *args, **kwargs):
+        """
+        Handle the command execution.
+        """
+        benchmark = run_benchmark(kwargs['chain'], kwargs['size'], kwargs['parser'], max(1, kwargs['repeat']))
+
+        self.stdout.write(f'{"chain":<10} {"size":<8} {"parser":<12} {"kB":>6} {"ms":>9} {"films/s":>10} '
+                          f'{"shows/s":>10} {"peak kB":>8}')
+        for result in benchmark['results']:
+            self.stdout.write(
+                f'{result["chain"]:<10} {result["size"]:<8} {result["parser"]:<12} {result["bytes"] // 1024:>6} '
+                f'{result["seconds"] * 1000:>9.2f} {result["films_per_second"]:>10.1f} '
+                f'{result["shows_per_second"]:>10.1f} {result["peak_memory_kb"]:>8}'
+            )
+        for parser in benchmark['skipped_parsers']:
+            self.stdout.write(self.style.WARNING(f'Skipped {parser}, which is not installed'))
+        synthetic = sorted({f'{result["chain"]}_{result["size"]}' for result in benchmark['results']
+                            if result['source'] != 'archive'})
+        if synthetic:
+            self.stdout.write(self.style.WARNING(
+                f'{", ".join(synthetic)} are not archived pages, their results may not match the real pages'
+            ))
+
+        output = Path(kwargs['output'])
+        runs = json.loads(output.read_text(encoding='utf-8')) if output.exists() else []
+        runs.append(benchmark)
+        output.write_text(json.dumps(runs, indent=2), encoding='utf-8')
+        self.stdout.write(self.style.SUCCESS(f'Appended the results to {output}'))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from scraper.archive import list_archived_pages
+from scraper.benchmark import BENCHMARK_SCRAPERS, FIXTURE_SIZES, export_fixture
+
+
+class Command(BaseCommand):
+    """
+    Custom management command to replace a benchmark fixture with a trimmed page from the archive.
+    """
+
+    help = 'Replace a benchmark fixture with a trimmed archived page and record where it comes from'
+
+    def add_arguments(self, parser):
+        """
+        Add command line arguments.
+        """
+        parser.add_argument('sha256', type=str, help='SHA-256 of the archived page, or a prefix of it')
+        parser.add_argument('-s', '--size', required=True, choices=FIXTURE_SIZES,
+                            help='Size of the fixture to replace')
+        parser.add_argument('-d', '--day', type=str, help='Day the page was fetched on, the latest day by default')
+
+    def handle(self, *args, **kwargs):
+        """
+        Handle the command execution.
+        """
+        entries = [
+            entry for entry in list_archived_pages(kwargs['day'])
+            if entry['sha256'].startswith(kwargs['sha256']) and entry['cinema'] in BENCHMARK_SCRAPERS
+        ]
+        if len({entry['sha256'] for entry in entries}) != 1:
+            raise CommandError(f'Expected one archived page matching {kwargs["sha256"]}, found {len(entries)}')
+
+        try:
+            source = export_fixture(entries[-1], kwargs['size'])
+        except ValueError as error:
+            raise CommandError(str(error)) from error
+        self.stdout.write(self.style.SUCCESS(
+            f'Exported {source["url"]} as {entries[-1]["cinema"]}_{kwargs["size"]}: {source["films"]} films, '
+            f'{source["shows"]} shows, {source["bytes"] // 1024} kB trimmed to {source["trimmed_bytes"] // 1024} kB'
+        ))
@@ -0,0 +1,69 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from movie_api.cache import bump_listing_version
+from movie_api.snapshots import write_listing_snapshots
+from scraper.archive import list_archived_pages, read_archived_page
+from scraper.tasks import SCRAPE_STORES
+
+
+class Command(BaseCommand):
+    """
+    Custom management command to parse the archived pages again, without a browser.
+    """
+
+    help = 'Parse the pages archived on a day again, and optionally store their shows'
+
+    def add_arguments(self, parser):
+        """
+        Add command line arguments.
+        """
+        parser.add_argument('-d', '--day', type=str, help='Day the pages were fetched on, the latest day by default')
+        parser.add_argument('-c', '--cinema', type=str, help='Only parse the pages of this cinema chain')
+        parser.add_argument(
+            '--store',
+            action='store_true',
+            help='Store the shows parsed from the latest page of each cinema and date'
+        )
+
+    def handle(self, *args, **kwargs):
+        """
+        Handle the command execution.
+        """
+        entries = list_archived_pages(kwargs['day'])
+        if kwargs['cinema']:
+            entries = [entry for entry in entries if entry['cinema'] == kwargs['cinema'].lower()]
+        if not entries:
+            raise CommandError('No archived pages found')
+
+        start = time.perf_counter()
+        stores = {}
+        latest_pages = {}
+        films = shows = 0
+        for entry in entries:
+            if entry['cinema'] not in stores:
+                stores[entry['cinema']] = SCRAPE_STORES[entry['cinema']]()
+            store = stores[entry['cinema']]
+            movie_info_list = store.scraper.parse_movie_info(read_archived_page(entry['sha256']))
+            page_shows = sum(len(movie_info['show_info']) for movie_info in movie_info_list)
+            films += len(movie_info_list)
+            shows += page_shows
+            self.stdout.write(
+                f'{entry["cinema"]:<10} {entry["city"]:<24} {entry.get("cinema_number") or "":>6} {entry["date"]} '
+                f'{entry["source"]:<7} {len(movie_info_list):>5} films {page_shows:>5} shows'
+            )
+            if movie_info_list:
+                key = (entry['cinema'], entry['city'], entry.get('cinema_number'), entry['date'])
+                latest_pages[key] = (store, entry, movie_info_list)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Parsed {len(entries)} pages in {time.perf_counter() - start:.2f}s: {films} films, {shows} shows'
+        ))
+
+        if kwargs['store']:
+            stored = sum(
+                store.store_movie_info(movie_info_list, entry['date'], entry['city'], entry.get('cinema_number'))
+                for store, entry, movie_info_list in latest_pages.values()
+            )
+            bump_listing_version()
+            write_listing_snapshots()
+            self.stdout.write(self.style.SUCCESS(f'Stored {stored} shows of {len(latest_pages)} pages'))
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from scraper.latency import LATENCY_WINDOW_DAYS, get_latency_stats, get_wait_time, latency_percentile
+from scraper.scraper import HeliosScraper, MultikinoScraper, WAIT_TIME_HELIOS, WAIT_TIME_MULTIKINO
+
+# Longest wait for the pages of each chain
+MAX_WAIT_TIMES = {
+    MultikinoScraper.CHAIN: WAIT_TIME_MULTIKINO,
+    HeliosScraper.CHAIN: WAIT_TIME_HELIOS,
+}
+
+
+class Command(BaseCommand):
+    """
+    Custom management command to print the page load latency of each cinema chain and its learned wait time.
+    """
+
+    help = f'Print the page load latency percentiles of each chain over the last {LATENCY_WINDOW_DAYS} days'
+
+    def handle(self, *args, **kwargs):
+        """
+        Handle the command execution.
+        """
+        self.stdout.write(f'{"chain":<10} {"pages":>6} {"timeouts":>8} {"scrolls":>7} '
+                          f'{"p50":>5} {"p90":>5} {"p99":>5} {"wait":>6}')
+        for chain, max_wait_time in MAX_WAIT_TIMES.items():
+            stats = get_latency_stats(chain)
+            histogram = stats['histogram']
+            percentiles = [latency_percentile(histogram, percentile) for percentile in (0.5, 0.9, 0.99)]
+            self.stdout.write(
+                f'{chain:<10} {sum(histogram):>6} {stats["timeouts"]:>8} {stats["scroll_timeouts"]:>7} '
+                + ' '.join(f'{"-" if value is None else value:>5}' for value in percentiles)
+                + f' {get_wait_time(chain, max_wait_time, stats):>6g}'
+            )
+        if not settings.REDIS_URL:
+            self.stdout.write(self.style.WARNING(
+                'REDIS_URL is not set: the stats are kept per process, so each worker learns its own wait time '
+                'and this command only shows its own page loads'
+            ))
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from scraper.models import ScrapeRun, ScrapeUnit
+
+# Fields the units can be sorted by
+STAGE_FIELDS = {
+    'total': 'duration',
+    'fetch': 'fetch_time',
+    'parse': 'parse_time',
+    'write': 'write_time',
+}
+
+
+class Command(BaseCommand):
+    """
+    Custom management command to print the slowest scrape units of a run.
+    """
+
+    help = 'Print the slowest scrape units of the latest run, or of a given run'
+
+    def add_arguments(self, parser):
+        """
+        Add command line arguments.
+        """
+        parser.add_argument('-r', '--run', type=str, help='Run ID of the scrape run, the latest run by default')
+        parser.add_argument('-c', '--cinema', type=str, help='Only consider the runs of this cinema chain')
+        parser.add_argument('-s', '--stage', choices=STAGE_FIELDS, default='total', help='Stage to sort the units by')
+        parser.add_argument('-n', '--limit', type=int, default=10, help='Number of units to print')
+
+    def handle(self, *args, **kwargs):
+        """
+        Handle the command execution.
+        """
+        runs = ScrapeRun.objects.order_by('-started_at')
+        if kwargs['cinema']:
+            runs = runs.filter(cinema=kwargs['cinema'].lower())
+        if kwargs['run']:
+            runs = runs.filter(run_id=kwargs['run'])
+        run = runs.first()
+        if run is None:
+            raise CommandError('No scrape run found')
+
+        units = ScrapeUnit.objects.filter(run=run).order_by(f'-{STAGE_FIELDS[kwargs["stage"]]}')[:kwargs['limit']]
+        self.stdout.write(f'Run {run.run_id} of {run.cinema}, started {run.started_at:%Y-%m-%d %H:%M:%S}')
+        self.stdout.write(f'{"city":<20} {"cinema":>6} {"date":<10} {"total":>8} {"fetch":>8} {"parse":>8} '
+                          f'{"write":>8} {"pages":>5} {"kB":>7} {"blocked":>7} {"shows":>6} {"new":>6}  error')
+        for unit in units:
+            self.stdout.write(
+                f'{unit.city:<20} {unit.cinema_number or "":>6} {unit.date:%Y-%m-%d} {unit.duration:8.2f} '
+                f'{unit.fetch_time:8.2f} {unit.parse_time:8.2f} {unit.write_time:8.2f} {unit.pages:>5} '
+                f'{unit.transferred_bytes // 1024:>7} {unit.blocked_requests:>7} {unit.shows:>6} '
+                f'{unit.created_shows:>6}  {unit.error}'
+            )
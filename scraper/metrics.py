@@ -0,0 +1,44 @@
+import time
+from contextlib import contextmanager
+
+
+class ScrapeMetrics:
+    """
+    Timings and counters of a single scrape unit, shared by its scraper and its store.
+
+    Stages are timed with a monotonic clock and accumulated, so that a page fetched twice
+    (over HTTP, then with the browser) reports its whole fetch time.
+    """
+    def __init__(self):
+        """
+        Initialize empty ScrapeMetrics.
+        """
+        self.durations = {}
+        self.counts = {}
+        self.error = ''
+
+    @contextmanager
+    def measure(self, stage):
+        """
+        Context manager adding the time spent in its block to the duration of a stage.
+
+        Args:
+            stage (str): The name of the stage, e.g. 'fetch', 'parse' or 'write'.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[stage] = self.durations.get(stage, 0.0) + time.perf_counter() - start
+
+    def increment(self, name, amount=1):
+        """
+        Add to a counter, e.g. the number of pages loaded.
+        """
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    def record_error(self, error):
+        """
+        Record the class of an error, including errors the scraper recovered from.
+        """
+        self.error = type(error).__name__
@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-18 08:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0005_cinema_number'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cinema',
+            index=models.Index(fields=['city'], name='cinema_city_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='show',
+            index=models.Index(fields=['date', 'cinema'], name='show_date_cinema_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='show',
+            index=models.Index(fields=['date', 'time'], name='show_date_time_idx'),
+        ),
+    ]
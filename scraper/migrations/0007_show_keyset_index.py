@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-18 08:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0006_show_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='show',
+            name='show_date_time_idx',
+        ),
+        migrations.AddIndex(
+            model_name='show',
+            index=models.Index(fields=['date', 'time', 'id'], name='show_date_time_id_idx'),
+        ),
+    ]
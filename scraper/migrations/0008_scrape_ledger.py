@@ -0,0 +1,55 @@
+# Generated by Django 4.2 on 2026-10-18 08:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0007_show_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrapeRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_id', models.CharField(max_length=32, unique=True)),
+                ('cinema', models.CharField(max_length=255)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('finished_at', models.DateTimeField(null=True)),
+                ('units', models.PositiveIntegerField(default=0)),
+                ('failed_units', models.PositiveIntegerField(default=0)),
+                ('films', models.PositiveIntegerField(default=0)),
+                ('shows', models.PositiveIntegerField(default=0)),
+                ('created_shows', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ScrapeUnit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('city', models.CharField(max_length=255)),
+                ('cinema_number', models.IntegerField(null=True)),
+                ('date', models.DateField()),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField()),
+                ('duration', models.FloatField()),
+                ('fetch_time', models.FloatField(default=0)),
+                ('parse_time', models.FloatField(default=0)),
+                ('write_time', models.FloatField(default=0)),
+                ('pages', models.PositiveIntegerField(default=0)),
+                ('films', models.PositiveIntegerField(default=0)),
+                ('shows', models.PositiveIntegerField(default=0)),
+                ('created_shows', models.PositiveIntegerField(default=0)),
+                ('error', models.CharField(blank=True, max_length=255)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scrape_units', to='scraper.scraperun')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='scraperun',
+            index=models.Index(fields=['started_at'], name='scrape_run_started_at_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-18 09:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0008_scrape_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapeunit',
+            name='blocked_requests',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='scrapeunit',
+            name='transferred_bytes',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-18 09:30
+
+from django.db import migrations
+
+
+def merge_duplicate_cinemas(apps, schema_editor):
+    """
+    Merge the cinemas sharing a name, city and number into the oldest one, moving their shows to it.
+    """
+    Cinema = apps.get_model('scraper', 'Cinema')
+    Show = apps.get_model('scraper', 'Show')
+    kept = {}
+    for cinema in Cinema.objects.order_by('id'):
+        key = (cinema.name, cinema.city, cinema.number)
+        if key not in kept:
+            kept[key] = cinema
+            continue
+        Show.objects.filter(cinema=cinema).update(cinema=kept[key])
+        if kept[key].address is None and cinema.address is not None:
+            kept[key].address = cinema.address
+            kept[key].save(update_fields=['address'])
+        cinema.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0010_page_fingerprints'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_cinemas, migrations.RunPython.noop),
+    ]
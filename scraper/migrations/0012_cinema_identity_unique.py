@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-18 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0011_merge_duplicate_cinemas'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='cinema',
+            constraint=models.UniqueConstraint(fields=('name', 'city', 'number'), name='cinema_identity_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='cinema',
+            constraint=models.UniqueConstraint(condition=models.Q(('number__isnull', True)), fields=('name', 'city'), name='cinema_identity_without_number_unique'),
+        ),
+    ]
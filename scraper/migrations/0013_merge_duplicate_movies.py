@@ -0,0 +1,30 @@
+# Generated by Django 4.2 on 2026-10-18 10:05
+
+from django.db import migrations
+
+
+def merge_duplicate_movies(apps, schema_editor):
+    """
+    Merge the movies sharing a title and URL into the oldest one, moving their shows to it.
+    """
+    Movie = apps.get_model('scraper', 'Movie')
+    Show = apps.get_model('scraper', 'Show')
+    kept = {}
+    for movie in Movie.objects.filter(movie_url__isnull=False).order_by('id'):
+        key = (movie.title, movie.movie_url)
+        if key not in kept:
+            kept[key] = movie
+            continue
+        Show.objects.filter(movie=movie).update(movie=kept[key])
+        movie.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0012_cinema_identity_unique'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_movies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 09:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0013_merge_duplicate_movies'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='movie',
+            constraint=models.UniqueConstraint(fields=('title', 'movie_url'), name='movie_identity_unique'),
+        ),
+    ]
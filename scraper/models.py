@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class Cinema(models.Model):
@@ -10,6 +11,18 @@ class Cinema(models.Model):
     address = models.CharField(max_length=200, null=True)
     number = models.IntegerField(null=True)
 
+    class Meta:
+        indexes = [
+            # Pattern ops make the index usable for the city prefix (LIKE 'city%') lookups on PostgreSQL
+            models.Index(fields=['city'], name='cinema_city_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'city', 'number'], name='cinema_identity_unique'),
+            # NULL numbers are distinct in a unique constraint, so the chains without numbers need their own
+            models.UniqueConstraint(fields=['name', 'city'], condition=models.Q(number__isnull=True),
+                                    name='cinema_identity_without_number_unique'),
+        ]
+
 
 class Movie(models.Model):
     """
@@ -21,6 +34,12 @@ class Movie(models.Model):
     image_url = models.URLField(null=True)
     movie_url = models.URLField(max_length=2000, null=True)
 
+    class Meta:
+        constraints = [
+            # The identity of a scraped movie, movies created without a URL are never scraped
+            models.UniqueConstraint(fields=['title', 'movie_url'], name='movie_identity_unique'),
+        ]
+
 
 class Show(models.Model):
     """
@@ -31,3 +50,88 @@ class Show(models.Model):
     date = models.DateField()
     time = models.TimeField()
     booking_link = models.URLField(unique=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'cinema'], name='show_date_cinema_idx'),
+            models.Index(fields=['date', 'time', 'id'], name='show_date_time_id_idx'),
+        ]
+
+
+class PageFingerprint(models.Model):
+    """
+    Model representing the fingerprint of the films and shows last stored from a repertoire page.
+
+    The key identifies the page by chain, city, cinema number and date.
+    """
+    key = models.CharField(max_length=600, unique=True)
+    date = models.DateField()
+    fingerprint = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        """
+        Returns a string representation of the page fingerprint object.
+        """
+        return self.key
+
+
+class ScrapeRun(models.Model):
+    """
+    Model recording a scrape run of a cinema chain and its totals.
+    """
+    run_id = models.CharField(max_length=32, unique=True)
+    cinema = models.CharField(max_length=255)
+    started_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True)
+    units = models.PositiveIntegerField(default=0)
+    failed_units = models.PositiveIntegerField(default=0)
+    unchanged_units = models.PositiveIntegerField(default=0)
+    films = models.PositiveIntegerField(default=0)
+    shows = models.PositiveIntegerField(default=0)
+    created_shows = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['started_at'], name='scrape_run_started_at_idx'),
+        ]
+
+    def __str__(self):
+        """
+        Returns a string representation of the scrape run object.
+        """
+        return f'{self.cinema} {self.started_at:%Y-%m-%d %H:%M}'
+
+
+class ScrapeUnit(models.Model):
+    """
+    Model recording the timings and counts of a single (chain, city, date) scrape unit of a run.
+
+    Times are in seconds. Fetching covers loading the page over HTTP or in the browser, parsing
+    covers building the document tree and extracting the films, writing covers the database ingest.
+    The bytes transferred and the requests blocked are those of the pages loaded in the browser.
+    """
+    run = models.ForeignKey(ScrapeRun, on_delete=models.CASCADE, related_name='scrape_units')
+    city = models.CharField(max_length=255)
+    cinema_number = models.IntegerField(null=True)
+    date = models.DateField()
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    duration = models.FloatField()
+    fetch_time = models.FloatField(default=0)
+    parse_time = models.FloatField(default=0)
+    write_time = models.FloatField(default=0)
+    pages = models.PositiveIntegerField(default=0)
+    transferred_bytes = models.PositiveBigIntegerField(default=0)
+    blocked_requests = models.PositiveIntegerField(default=0)
+    films = models.PositiveIntegerField(default=0)
+    shows = models.PositiveIntegerField(default=0)
+    created_shows = models.PositiveIntegerField(default=0)
+    unchanged = models.BooleanField(default=False)
+    error = models.CharField(max_length=255, blank=True)
+
+    def __str__(self):
+        """
+        Returns a string representation of the scrape unit object.
+        """
+        return f'{self.city} {self.date}'
@@ -1,13 +1,25 @@
+import atexit
+import json
 import logging
+import threading
+import time
 from abc import ABC, abstractmethod
 from contextlib import contextmanager
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from selenium import webdriver
-from selenium.common import WebDriverException
+from selenium.common import NoSuchElementException, TimeoutException, WebDriverException
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as ec
-from bs4 import BeautifulSoup
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
+from django.conf import settings
+
+from .latency import get_wait_time, record_latency, record_scroll_timeout, record_timeout
+from .metrics import ScrapeMetrics
 
 # Constants
 CHROMEDRIVER_PATH = 'chromedriver'
@@ -15,6 +27,69 @@ WAIT_TIME_MULTIKINO = 300
 WAIT_TIME_HELIOS = 60
 MULTIKINO_URL_FORMAT = 'https://multikino.pl/repertuar/{}/teraz-gramy?data={}'
 HELIOS_URL_FORMAT = 'https://www.helios.pl/{},{}/Repertuar/index/dzien/{}/kino/{}'
+DRIVER_POOL_SIZE = 2
+DRIVER_MAX_PAGES = 50
+DRIVER_LEASE_TIMEOUT = 600
+SCROLL_PAUSE_MS = 100
+STABLE_LIST_MS = 1000
+SCROLL_TIME_LIMIT = 60
+READY_POLL_INTERVAL = 0.25
+FALLBACK_HTML_PARSER = 'html.parser'
+HTTP_TIMEOUT = (5, 30)
+HTTP_POOL_SIZE = 10
+HTTP_RETRIES = 2
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml',
+    'Accept-Encoding': 'gzip, deflate',
+    'Accept-Language': 'pl-PL,pl;q=0.9',
+}
+
+# URL patterns of the resources the scraping browser does not need, by kind. Only the HTML is read,
+# poster URLs come from the 'src' attributes, so the resources themselves never have to be downloaded.
+BLOCKED_RESOURCE_PATTERNS = {
+    'image': ['*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*', '*.avif*', '*.svg*', '*.ico*'],
+    'font': ['*.woff*', '*.ttf*', '*.otf*', '*.eot*'],
+    'media': ['*.mp4*', '*.webm*', '*.m3u8*', '*.mp3*'],
+    'third_party': [
+        '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*googlesyndication.com*',
+        '*googleadservices.com*', '*facebook.net*', '*connect.facebook.*', '*hotjar.com*', '*criteo.*',
+        '*tiktok.com*', '*gemius.pl*', '*onetrust.com*', '*cookielaw.org*',
+    ],
+}
+
+# Scrolls the page to the bottom one viewport at a time, pausing between steps so that
+# lazily loaded content gets rendered. Once the end of the page is reached, it reports back
+# as soon as the number of film items has not changed for the given time.
+SCROLL_SCRIPT = '''
+const [pause, itemSelector, stableFor] = arguments;
+const done = arguments[arguments.length - 1];
+let position = 0;
+let items = -1;
+let stableSince = 0;
+const step = () => {
+    if (position < document.body.scrollHeight) {
+        position += window.innerHeight;
+        window.scrollTo(0, position);
+    } else {
+        const count = document.querySelectorAll(itemSelector).length;
+        if (count !== items) {
+            items = count;
+            stableSince = Date.now();
+        } else if (Date.now() - stableSince >= stableFor) {
+            done(count);
+            return;
+        }
+    }
+    setTimeout(step, pause);
+};
+step();
+'''
+
+# States of a repertoire page while it loads
+PAGE_READY = 'ready'
+PAGE_EMPTY = 'empty'
+PAGE_ERROR = 'error'
 
 # Setup logging
 logging.basicConfig(filename='/tmp/movie_scraper.log', level=logging.ERROR,
@@ -22,14 +97,209 @@ logging.basicConfig(filename='/tmp/movie_scraper.log', level=logging.ERROR,
 logger = logging.getLogger(__name__)
 
 
-class WebDriverManager:
+def get_html_parser():
+    """
+    Get the BeautifulSoup tree builder set in SCRAPER_HTML_PARSER, or the pure Python one if it is not installed.
+    """
+    parser = settings.SCRAPER_HTML_PARSER
+    return parser if builder_registry.lookup(parser) is not None else FALLBACK_HTML_PARSER
+
+
+def make_soup(html, parse_only=None):
+    """
+    Parse a page with the configured tree builder.
+
+    Args:
+        html (str or bytes): The HTML of the page.
+        parse_only (SoupStrainer): Restricts the tree to the matching elements and their subtrees.
+
+    Returns:
+        BeautifulSoup: The parsed page.
+    """
+    return BeautifulSoup(html, get_html_parser(), parse_only=parse_only)
+
+
+def is_present(driver, locator):
+    """
+    Check whether an element is on the page, without waiting for it.
+    """
+    try:
+        driver.find_element(*locator)
+    except NoSuchElementException:
+        return False
+    return True
+
+
+def page_state(ready_locator, empty_selectors, error_selectors):
+    """
+    Build the wait condition telling whether the page shows its film list, no shows or an error.
+
+    Args:
+        ready_locator (tuple): Locator of the element signalling that the film list is present.
+        empty_selectors (tuple): CSS selectors of the markup shown when there are no shows.
+        error_selectors (tuple): CSS selectors of the markup of error pages.
+
+    Returns:
+        function: The condition, returning the state of the page, or False while it is still loading.
+    """
+    markers = [
+        (PAGE_READY, [ready_locator]),
+        (PAGE_ERROR, [(By.CSS_SELECTOR, selector) for selector in error_selectors]),
+        (PAGE_EMPTY, [(By.CSS_SELECTOR, selector) for selector in empty_selectors]),
+    ]
+
+    def condition(driver):
+        for state, locators in markers:
+            if any(is_present(driver, locator) for locator in locators):
+                return state
+        return False
+    return condition
+
+
+class WebDriverPool:
     """
-    Class for initializing and cleaning up the Chrome driver.
+    Bounded pool of warm headless Chrome drivers shared by the scrapers of one worker process.
+
+    Drivers are created lazily, reset between leases and recycled after `max_pages` leases
+    or as soon as they stop responding.
     """
+    def __init__(self, factory, max_size=DRIVER_POOL_SIZE, max_pages=DRIVER_MAX_PAGES):
+        """
+        Initialize the WebDriverPool.
+
+        Args:
+            factory (callable): Callable returning a new WebDriver instance.
+            max_size (int): Maximum number of live drivers in the pool.
+            max_pages (int): Number of leases after which a driver is quit and replaced.
+        """
+        self.factory = factory
+        self.max_size = max_size
+        self.max_pages = max_pages
+        self._idle = []
+        self._size = 0
+        self._condition = threading.Condition()
+
     @contextmanager
-    def get_chrome_driver(self):
+    def lease(self, timeout=DRIVER_LEASE_TIMEOUT):
         """
-        Context manager for initializing and cleaning up the Chrome driver.
+        Context manager handing out a pooled driver and taking it back afterwards.
+
+        Args:
+            timeout (float): Seconds to wait for a free driver when the pool is exhausted.
+        """
+        driver, pages = self._acquire(timeout)
+        healthy = True
+        try:
+            yield driver
+        except WebDriverException:
+            healthy = self._is_alive(driver)
+            raise
+        except BaseException as error:
+            healthy = isinstance(error, Exception)
+            raise
+        finally:
+            if healthy:
+                self._release(driver, pages + 1)
+            else:
+                self._discard(driver)
+
+    def close(self):
+        """
+        Quit all idle drivers.
+        """
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._condition.notify_all()
+        for driver, _ in idle:
+            self._quit(driver)
+
+    def _acquire(self, timeout):
+        """
+        Take an idle driver or start a new one if the pool is not full yet.
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while not self._idle and self._size >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    raise WebDriverException('Timed out waiting for a pooled Chrome driver')
+            if self._idle:
+                return self._idle.pop()
+            self._size += 1
+
+        try:
+            return self.factory(), 0
+        except BaseException:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+    def _release(self, driver, pages):
+        """
+        Give a driver back to the pool, or recycle it once it has served `max_pages` leases.
+        """
+        if pages >= self.max_pages or not self._reset(driver):
+            self._discard(driver)
+            return
+        with self._condition:
+            self._idle.append((driver, pages))
+            self._condition.notify()
+
+    def _discard(self, driver):
+        """
+        Quit a driver and free its slot in the pool.
+        """
+        self._quit(driver)
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    @staticmethod
+    def _reset(driver):
+        """
+        Clear cookies and web storage so that the next lease starts from a clean browser.
+        """
+        try:
+            driver.execute_script('window.localStorage.clear(); window.sessionStorage.clear();')
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            driver.get('about:blank')
+        except WebDriverException as error:
+            logger.error("Error occurred while resetting driver: %s", str(error))
+            return False
+        return True
+
+    @staticmethod
+    def _is_alive(driver):
+        """
+        Check whether the browser behind the driver still responds.
+        """
+        try:
+            driver.execute_script('return 1;')
+        except WebDriverException:
+            return False
+        return True
+
+    @staticmethod
+    def _quit(driver):
+        """
+        Quit the driver, ignoring errors from an already crashed browser.
+        """
+        try:
+            driver.quit()
+        except WebDriverException as error:
+            logger.error("Error occurred while quitting driver: %s", str(error))
+
+
+class WebDriverManager:
+    """
+    Class for leasing Chrome drivers from the worker's driver pool.
+    """
+    @staticmethod
+    def create_chrome_driver():
+        """
+        Start a new headless Chrome driver.
         """
         service = Service(CHROMEDRIVER_PATH)
         options = webdriver.ChromeOptions()
@@ -37,19 +307,102 @@ class WebDriverManager:
         options.add_argument('--disable-gpu')
         options.add_argument('--no-sandbox')
         options.add_argument('--disable-dev-shm-usage')
+        # Network events are read from the performance log to report the bytes transferred per page
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
 
-        driver = webdriver.Chrome(service=service, options=options)
-        try:
+        return webdriver.Chrome(service=service, options=options)
+
+    @contextmanager
+    def get_chrome_driver(self):
+        """
+        Context manager leasing a warm Chrome driver from the pool and giving it back afterwards.
+        """
+        with driver_pool.lease() as driver:
             yield driver
-        finally:
-            driver.quit()
+
+
+driver_pool = WebDriverPool(WebDriverManager.create_chrome_driver)
+atexit.register(driver_pool.close)
+
+
+def create_http_session():
+    """
+    Create a keep-alive HTTP session with a bounded connection pool and retries on transient errors.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_SIZE,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=Retry(total=HTTP_RETRIES, backoff_factor=0.5, status_forcelist=(502, 503, 504)),
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update(HTTP_HEADERS)
+    return session
+
+
+http_session = create_http_session()
+
+
+class HttpSessionManager:
+    """
+    Class for fetching server-rendered pages over the worker's pooled HTTP session.
+    """
+    @staticmethod
+    def fetch_page_source(url):
+        """
+        Fetch the page without a browser.
+
+        The raw bytes are returned so that BeautifulSoup detects the document encoding itself.
+
+        Args:
+            url (str): The page URL.
+
+        Returns:
+            bytes: The page content, or None if the request failed.
+        """
+        try:
+            response = http_session.get(url, timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
+        except requests.RequestException as error:
+            logger.error("Error occurred: %s", str(error))
+            return None
+        return response.content
 
 
 class BaseMovieScraper(ABC, WebDriverManager):
     """
     Abstract base class for movie scrapers.
+
+    The fetch and parse times and the pages loaded are recorded in `metrics`, which the store of a
+    scrape unit replaces with its own to report them along with the database write time.
+
+    Resources of the kinds in BLOCKED_RESOURCE_PATTERNS are blocked in the browser, except the kinds
+    allowed for the chain in the SCRAPER_ALLOWED_RESOURCES setting.
+
+    The raw pages fetched by the last get_movie_info call are kept in `fetched_pages`, to be archived.
+
+    Pages are parsed into the subtrees matched by `PARSE_ONLY` only, which holds the film list.
+
+    The browser waits for a page as long as the pages of the chain took recently, see scraper.latency.
+    It stops early on the markup of `EMPTY_PAGE_SELECTORS` and `ERROR_PAGE_SELECTORS`, and once the
+    number of `ITEM_SELECTOR` elements is stable. Only selectors checked against archived pages belong
+    there, as a wrong one drops the films of a page.
     """
     URL_FORMAT = None
+    PARSE_ONLY = None
+    CHAIN = None
+    ITEM_SELECTOR = None
+    EMPTY_PAGE_SELECTORS = ()
+    # The error page of Chrome itself, e.g. when the site cannot be reached
+    ERROR_PAGE_SELECTORS = ('#main-frame-error',)
+
+    def __init__(self):
+        """
+        Initialize the scraper with empty metrics.
+        """
+        self.metrics = ScrapeMetrics()
+        self.fetched_pages = []
 
     @abstractmethod
     def get_movie_info(self, city, showing_date, cinema_numb=None):
@@ -58,12 +411,150 @@ class BaseMovieScraper(ABC, WebDriverManager):
         """
         raise NotImplementedError
 
+    def find_film_items(self, soup):
+        """
+        Return the film item tags of a parsed repertoire page.
+        """
+        raise NotImplementedError
+
+    def parse_film_item(self, soup_item):
+        """
+        Extract the movie information dictionary from a single film item tag.
+        """
+        raise NotImplementedError
+
+    def get_blocked_urls(self):
+        """
+        Get the URL patterns blocked in the browser for the chain.
+
+        Returns:
+            list: The patterns of the blocked resource kinds, empty when SCRAPER_BLOCK_RESOURCES is disabled.
+        """
+        if not settings.SCRAPER_BLOCK_RESOURCES:
+            return []
+        allowed = settings.SCRAPER_ALLOWED_RESOURCES.get(self.CHAIN, ())
+        return [
+            pattern
+            for kind, patterns in BLOCKED_RESOURCE_PATTERNS.items() if kind not in allowed
+            for pattern in patterns
+        ]
+
+    def _record_network_usage(self, driver):
+        """
+        Record the bytes transferred and the requests blocked since the performance log was last read.
+
+        Args:
+            driver (WebDriver): The leased Chrome driver.
+        """
+        for entry in driver.get_log('performance'):
+            message = json.loads(entry['message'])['message']
+            if message['method'] == 'Network.loadingFinished':
+                self.metrics.increment('transferred_bytes', int(message['params']['encodedDataLength']))
+            elif message['method'] == 'Network.loadingFailed' and message['params'].get('blockedReason'):
+                self.metrics.increment('blocked_requests')
+
+    def load_page_source(self, driver, url, ready_locator, wait_time):
+        """
+        Load the page, wait until the film list is present and return its HTML once the list is stable.
+
+        The page gets the wait time learned from the recent page loads of the chain, at most `wait_time`,
+        and the time it took is recorded. A page showing that there are no shows is returned as soon as
+        the markup appears, an error page raises at once instead of waiting for the film list.
+
+        The page is scrolled to the bottom once, in one async script call, which returns when the number
+        of film items stops changing, so that lazily loaded items are rendered before the page source is
+        read. The scroll gets its own SCROLL_TIME_LIMIT, as a long page keeps loading items after the film
+        list is present, and its timeouts are recorded apart from the page load timeouts.
+
+        Unneeded resources are blocked with the DevTools protocol, as the driver may have served another
+        chain before, and the network usage of the page is recorded in the metrics.
+
+        Args:
+            driver (WebDriver): The leased Chrome driver.
+            url (str): The repertoire page URL.
+            ready_locator (tuple): Locator of the element signalling that the film list is present.
+            wait_time (int): Maximum number of seconds to wait for the film list.
+
+        Returns:
+            str: The HTML of the fully rendered page.
+
+        Raises:
+            WebDriverException: If the page shows an error, or does not load or scroll in time.
+        """
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.get_blocked_urls()})
+        # Drop the events of the previous lease
+        driver.get_log('performance')
+
+        timeout = get_wait_time(self.CHAIN, wait_time)
+        driver.set_page_load_timeout(timeout)
+        start = time.monotonic()
+        try:
+            driver.get(url)
+            wait = WebDriverWait(driver, max(0.0, timeout - (time.monotonic() - start)), READY_POLL_INTERVAL)
+            state = wait.until(page_state(ready_locator, self.EMPTY_PAGE_SELECTORS, self.ERROR_PAGE_SELECTORS))
+        except TimeoutException:
+            record_timeout(self.CHAIN)
+            raise
+        if state == PAGE_ERROR:
+            raise WebDriverException(f'Error page shown: {url}')
+        record_latency(self.CHAIN, time.monotonic() - start)
+
+        if state == PAGE_READY:
+            driver.set_script_timeout(SCROLL_TIME_LIMIT)
+            try:
+                driver.execute_async_script(SCROLL_SCRIPT, SCROLL_PAUSE_MS, self.ITEM_SELECTOR, STABLE_LIST_MS)
+            except TimeoutException:
+                record_scroll_timeout(self.CHAIN)
+                raise
+        html = driver.page_source
+        self._record_network_usage(driver)
+        return html
+
+    def parse_movie_info(self, html):
+        """
+        Parse all film items of a repertoire page from a single document tree, restricted to the film list.
+
+        Args:
+            html (str): The HTML of the repertoire page.
+
+        Returns:
+            list: The movie information dictionaries of the page.
+        """
+        return self.extract_movie_info(make_soup(html, self.PARSE_ONLY))
+
+    def extract_movie_info(self, soup):
+        """
+        Extract all film items of an already parsed repertoire page.
+
+        Items which cannot be parsed are logged and skipped.
+
+        Args:
+            soup (BeautifulSoup): The parsed repertoire page.
+
+        Returns:
+            list: The movie information dictionaries of the page.
+        """
+        movie_info_list = []
+        for soup_item in self.find_film_items(soup):
+            try:
+                movie_info = self.parse_film_item(soup_item)
+            except (AttributeError, KeyError, TypeError) as error:
+                logger.error("Error occurred: %s", str(error))
+                continue
+            if movie_info is not None:
+                movie_info_list.append(movie_info)
+        return movie_info_list
+
 
 class MultikinoScraper(BaseMovieScraper):
     """
     Movie scraper for Multikino website.
     """
     URL_FORMAT = MULTIKINO_URL_FORMAT
+    PARSE_ONLY = SoupStrainer(class_='filmlist__item')
+    CHAIN = 'multikino'
+    ITEM_SELECTOR = '.filmlist__item'
 
     def get_movie_info(self, city, showing_date, cinema_numb=None):
         """
@@ -83,79 +574,83 @@ class MultikinoScraper(BaseMovieScraper):
             - hour (str): The time when the movie is playing.
             - booking_link (str): The link for booking the movie.
         """
-        movie_info_list_multikino = []
+        self.fetched_pages = []
         try:
             url = self.URL_FORMAT.format(city, showing_date)
-            with self.get_chrome_driver() as driver:
-                driver.get(url)
-                wait = WebDriverWait(driver, WAIT_TIME_MULTIKINO)
-                wait.until(ec.presence_of_element_located((By.CLASS_NAME, 'filmlist__item')))
-                film_items = driver.find_elements(By.CLASS_NAME, 'filmlist__item')
-
-                for item in film_items:
-                    driver.execute_script("arguments[0].scrollIntoView();", item)
-
-                    # Parse the item's HTML with BeautifulSoup
-                    item_html = item.get_attribute('outerHTML')
-                    soup_item = BeautifulSoup(item_html, 'html.parser')
-
-                    # Continue the process here using 'soup_item' instead of 'item'
-                    title = soup_item.find('div', {'class': 'filmlist__info-txt'}).find('span',
-                                                                                        {'data-v-9364a27e': True}).text
-
-                    # Get the URL address to movie details
-                    movie_url = 'https://multikino.pl' + soup_item \
-                        .find('div', {'class': 'filmlist__info-txt'}) \
-                        .find('a')['href']
-
-                    category = soup_item.find('a', {
-                        'class': 'film-details__item',
-                        'rv-class-film-details__item--selected': 'genre.highlighted'
-                    }).text.strip() if soup_item.find('a', {
-                        'class': 'film-details__item',
-                        'rv-class-film-details__item--selected': 'genre.highlighted'
-                    }) else ''
-
-                    description = soup_item. \
-                        find('p', {'class': 'filmlist__synopsis--twoLines'}).text if soup_item. \
-                        find('p', {'class': 'filmlist__synopsis--twoLines'}) else 'No description'
-
-                    # Get the image URL
-                    img_url = soup_item.find('img', {'class': 'filmlist__poster'}).get('src')
-
-                    show_info = [{
-                        'hour': time.find('time', {'class': 'default'}).text.strip().replace('*', ''),
-                        'booking_link': 'https://multikino.pl' + time.find('a')['href']
-                    } for time in soup_item.find_all('li', {'class': 'times__detail'})
-                        if time.find('time', {'class': 'default'}) is not None]
-
-                    # Append the extracted info to movie_info_list
-                    movie_info_list_multikino.append({
-                        'title': title,
-                        'category': category,
-                        'description': description,
-                        'image_url': img_url,
-                        'show_info': show_info,
-                        'movie_url': movie_url
-                    })
-
-        except (WebDriverException, AttributeError) as error:
-
+            with self.metrics.measure('fetch'), self.get_chrome_driver() as driver:
+                html = self.load_page_source(driver, url, (By.CLASS_NAME, 'filmlist__item'), WAIT_TIME_MULTIKINO)
+        except WebDriverException as error:
             logger.error("Error occurred: %s", str(error))
+            self.metrics.record_error(error)
+            return []
 
-        return movie_info_list_multikino
+        self.metrics.increment('pages')
+        self.fetched_pages.append({'url': url, 'source': 'browser', 'html': html})
+        with self.metrics.measure('parse'):
+            return self.parse_movie_info(html)
 
+    def find_film_items(self, soup):
+        """
+        Return the film item tags of a Multikino repertoire page.
+        """
+        return soup.find_all(class_='filmlist__item')
 
-class HeliosScraper(BaseMovieScraper):
+    def parse_film_item(self, soup_item):
+        """
+        Extract the movie information dictionary from a single Multikino film item tag.
+        """
+        info = soup_item.find('div', {'class': 'filmlist__info-txt'})
+        title = info.find('span', {'data-v-9364a27e': True}).text
+
+        # Get the URL address to movie details
+        movie_url = 'https://multikino.pl' + info.find('a')['href']
+
+        category = soup_item.find('a', {
+            'class': 'film-details__item',
+            'rv-class-film-details__item--selected': 'genre.highlighted'
+        })
+        category = category.text.strip() if category else ''
+
+        description = soup_item.find('p', {'class': 'filmlist__synopsis--twoLines'})
+        description = description.text if description else 'No description'
+
+        # Get the image URL
+        img_url = soup_item.find('img', {'class': 'filmlist__poster'}).get('src')
+
+        show_info = [{
+            'hour': time.find('time', {'class': 'default'}).text.strip().replace('*', ''),
+            'booking_link': 'https://multikino.pl' + time.find('a')['href']
+        } for time in soup_item.find_all('li', {'class': 'times__detail'})
+            if time.find('time', {'class': 'default'}) is not None]
+
+        return {
+            'title': title,
+            'category': category,
+            'description': description,
+            'image_url': img_url,
+            'show_info': show_info,
+            'movie_url': movie_url
+        }
+
+
+class HeliosScraper(BaseMovieScraper, HttpSessionManager):
     """
     Movie scraper for Helios website.
+
+    The repertoire pages are server-rendered, so they are fetched over plain HTTP first and
+    the browser is only used when neither the film list nor the markup of `EMPTY_PAGE_SELECTORS`
+    is in the response.
     """
     URL_FORMAT = HELIOS_URL_FORMAT
+    PARSE_ONLY = SoupStrainer(class_='seances-list')
+    FILM_ITEM_SELECTOR = soupsieve.compile('ul > .seance.gallery-column')
+    CHAIN = 'helios'
+    ITEM_SELECTOR = '.seances-list .seance.gallery-column'
 
     def get_movie_info(self, city, day, cinema_numb):
         """
-        This function uses Selenium and BeautifulSoup to scrape the Helio website
-        and get information about movies that are currently playing in the given city
+        This function uses plain HTTP (or Selenium as a fallback) and BeautifulSoup to scrape
+        the Helio website and get information about movies that are currently playing in the given city
         on the specified showing date.
 
         Args:
@@ -170,50 +665,69 @@ class HeliosScraper(BaseMovieScraper):
             - hour (str): The time when the movie is playing.
             - booking_link (str): The link for booking the movie.
         """
-        movie_info_list_helios = []
+        self.fetched_pages = []
+        url = self.URL_FORMAT.format(cinema_numb, city, day, cinema_numb)
+        with self.metrics.measure('fetch'):
+            html = self.fetch_page_source(url)
+        if html is not None:
+            self.metrics.increment('pages')
+            self.fetched_pages.append({'url': url, 'source': 'http', 'html': html})
+            with self.metrics.measure('parse'):
+                soup = make_soup(html, self.PARSE_ONLY)
+                if soup.find(class_='seances-list') is not None:
+                    return self.extract_movie_info(soup)
+                # No shows on the day, there is nothing for the browser to render
+                if self.EMPTY_PAGE_SELECTORS and make_soup(html).select_one(', '.join(self.EMPTY_PAGE_SELECTORS)):
+                    return []
+            logger.warning("Expected markup missing, falling back to Selenium: %s", url)
+
         try:
-            url = self.URL_FORMAT.format(cinema_numb, city, day, cinema_numb)
-            with self.get_chrome_driver() as driver:
-                driver.get(url)
-                wait = WebDriverWait(driver, WAIT_TIME_HELIOS)
-                wait.until(ec.presence_of_element_located((By.CLASS_NAME, 'seances-list')))
-                film_items = driver.find_elements(By.XPATH, "//ul/*[contains(@class, 'seance gallery-column')]")
-
-                for item in film_items:
-                    driver.execute_script("arguments[0].scrollIntoView();", item)
-
-                    # Parse the item's HTML with BeautifulSoup
-                    item_html = item.get_attribute('outerHTML')
-                    soup_item = BeautifulSoup(item_html, 'html.parser')
-
-                    # Continue the process here using 'soup_item' instead of 'item'
-                    title = soup_item.find('h2', {'class': 'movie-title'}).find('a',
-                                                                                {'class': 'movie-link'}).text.strip()
-
-                    # Get the URL address to movie details
-                    movie_url = 'https://helios.pl' + soup_item \
-                        .find('h2', {'class': 'movie-title'}) \
-                        .find('a')['href']
-
-                    # Get the image URL
-                    img_url = soup_item.find('img').get('src')
-
-                    show_info = [{
-                        'hour': time.find('a', {'class': 'hour-link fancybox-reservation'}).text.strip(),
-                        'booking_link': 'https://helios.pl' + time.find('a')['href']
-                    } for time in soup_item.find_all('li', {'class': 'hour toolTipContainer'})
-                        if time.find('a', {'class': 'hour-link fancybox-reservation'}) is not None]
-
-                    if show_info:
-                        # Append the extracted info to movie_info_list
-                        movie_info_list_helios.append({
-                            'title': title,
-                            'image_url': img_url,
-                            'show_info': show_info,
-                            'movie_url': movie_url
-                        })
-
-        except (WebDriverException, AttributeError) as error:
+            with self.metrics.measure('fetch'), self.get_chrome_driver() as driver:
+                html = self.load_page_source(driver, url, (By.CLASS_NAME, 'seances-list'), WAIT_TIME_HELIOS)
+        except WebDriverException as error:
             logger.error("Error occurred: %s", str(error))
+            self.metrics.record_error(error)
+            return []
+
+        self.metrics.increment('pages')
+        self.fetched_pages.append({'url': url, 'source': 'browser', 'html': html})
+        with self.metrics.measure('parse'):
+            return self.parse_movie_info(html)
+
+    def find_film_items(self, soup):
+        """
+        Return the film item tags of a Helios repertoire page.
+        """
+        return self.FILM_ITEM_SELECTOR.select(soup)
 
-        return movie_info_list_helios
+    def parse_film_item(self, soup_item):
+        """
+        Extract the movie information dictionary from a single Helios film item tag.
+
+        Returns None for films without any bookable show.
+        """
+        title = soup_item.find('h2', {'class': 'movie-title'}).find('a', {'class': 'movie-link'}).text.strip()
+
+        # Get the URL address to movie details
+        movie_url = 'https://helios.pl' + soup_item \
+            .find('h2', {'class': 'movie-title'}) \
+            .find('a')['href']
+
+        # Get the image URL
+        img_url = soup_item.find('img').get('src')
+
+        show_info = [{
+            'hour': time.find('a', {'class': 'hour-link fancybox-reservation'}).text.strip(),
+            'booking_link': 'https://helios.pl' + time.find('a')['href']
+        } for time in soup_item.find_all('li', {'class': 'hour toolTipContainer'})
+            if time.find('a', {'class': 'hour-link fancybox-reservation'}) is not None]
+
+        if not show_info:
+            return None
+
+        return {
+            'title': title,
+            'image_url': img_url,
+            'show_info': show_info,
+            'movie_url': movie_url
+        }
@@ -1,9 +1,34 @@
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
-from celery import shared_task
+from uuid import uuid4
+from celery import chord, shared_task
+from celery.signals import worker_process_shutdown
+from celery.utils.log import get_task_logger
+from django.db import DatabaseError, transaction
+from django.db.models import Sum
+from django.utils import timezone
 
-from .models import Cinema, Movie, Show
-from .scraper import MultikinoScraper, HeliosScraper
+from movie_api.cache import bump_listing_version
+from movie_api.snapshots import write_listing_snapshots
+
+from .archive import archive_pages, prune_archive
+from .fingerprints import is_unchanged, page_fingerprint, page_key, save_fingerprint
+from .identity_cache import IdentityCache, identity_cache
+from .metrics import ScrapeMetrics
+from .models import Cinema, Movie, PageFingerprint, Show, ScrapeRun, ScrapeUnit
+from .scraper import MultikinoScraper, HeliosScraper, driver_pool
+
+logger = get_task_logger(__name__)
+
+# Time limits of a single (chain, city, date) scrape unit
+SCRAPE_UNIT_SOFT_TIME_LIMIT = 900
+SCRAPE_UNIT_TIME_LIMIT = 1000
+
+# Number of shows written per INSERT statement
+SHOW_BATCH_SIZE = 500
+
+# Days the scrape run ledger is kept
+SCRAPE_RUN_RETENTION_DAYS = 90
 
 
 def add_days(today, num_of_days):
@@ -20,23 +45,44 @@ def add_days(today, num_of_days):
     return today + timedelta(days=num_of_days)
 
 
+def parse_show_time(hour):
+    """
+    Parse the scraped hour of a show.
+
+    Args:
+        hour (str): The time in the format '%H:%M'.
+
+    Returns:
+        time: The time of the show, or None if the hour is not a valid time.
+    """
+    try:
+        return datetime.strptime(hour, '%H:%M').time()
+    except ValueError:
+        return None
+
+
 class BaseScrapeStore(ABC):
     """
     Abstract base class for scraping and storing movie data.
     """
     AMOUNT_OF_DAYS = 4
 
+    # Identity cache of the scrape run the store ingests data for, None outside of a run
+    identity_cache = None
+
     def __init__(self, cities, cinema_name):
         """
         Initialize the BaseScrapeStore.
 
         Args:
-            cities (list): List of cities to scrape movie data for.
+            cities (list): List of cities to scrape movie data for, None when only single units are scraped.
             cinema_name (str): Name of the cinema for which the data is being scraped.
         """
         self.cities = cities
         self.cinema_name = cinema_name
+        self.metrics = ScrapeMetrics()
         self.scraper = self.create_scraper()
+        self.scraper.metrics = self.metrics
 
     @abstractmethod
     def create_scraper(self):
@@ -45,15 +91,20 @@ class BaseScrapeStore(ABC):
         """
 
     @abstractmethod
-    def get_dates(self):
+    def get_units(self):
         """
-        Get a list of dates for which to scrape movie data.
+        Get the list of independent scrape units, one per repertoire page.
+
+        Each unit is a JSON serializable dictionary so that it can be passed to a Celery task.
         """
 
     def create_cinema(self, city_name, cinema_number=None):
         """
         Create and return a Cinema object.
 
+        Cinemas are unique on their name, city and number, so when units of the same city race to
+        create it, the losing INSERT fails and get_or_create reads the row of the winning one.
+
         Args:
             city_name (str): Name of the city.
             cinema_number (int): Number of the cinema.
@@ -68,51 +119,158 @@ class BaseScrapeStore(ABC):
         )
         return cinema
 
-    @abstractmethod
     def scrape_and_store_data(self):
         """
         Scrape movie data for the specified cities and dates, and store it in the database.
+
+        The work is fanned out into one Celery task per scrape unit, so the units run in parallel
+        on all available workers, and a chord callback finalizes the run once all of them finished.
+
+        Returns:
+            AsyncResult: The result of the chord callback.
         """
+        run_id = uuid4().hex
+        units = [scrape_and_store_unit.s(self.cinema_name, unit, run_id) for unit in self.get_units()]
+        ScrapeRun.objects.create(run_id=run_id, cinema=self.cinema_name, units=len(units))
+        return chord(units)(finalize_scrape_run.s(self.cinema_name, run_id))
 
     @abstractmethod
-    def create_movie(self, movie_info):
+    def scrape_and_store_unit(self, unit):
         """
-        Create and return a Movie object.
+        Scrape a single repertoire page and store its shows in the database.
+
+        Args:
+            unit (dict): The scrape unit, as returned by get_units.
+
+        Returns:
+            dict: Number of films and shows stored for the unit.
+        """
+
+    @abstractmethod
+    def build_movie(self, movie_info):
+        """
+        Build an unsaved Movie object.
 
         Args:
             movie_info (dict): Information about the movie.
         """
 
-    def create_show(self, booking_link, cinema, movie, date, show_time):
+    def store_movie_info(self, movie_info_list, date, city_name, cinema_number=None):
         """
-        Create and store a Show object.
+        Store the shows of a single scraped repertoire page.
+
+        The cinema is resolved once, all movies of the page with one query (and one INSERT and SELECT of
+        the new ones), and the shows are
+        upserted on their booking link in batches, all within a single transaction. Within a scrape
+        run, cinemas and movies already known to the run's identity cache are not queried at all.
+        The write time and the number of shows which did not exist yet are recorded in the metrics.
 
         Args:
-            booking_link (str): Link to book the show.
-            cinema (Cinema): The Cinema object.
-            movie (Movie): The Movie object.
-            date (str): The date of the show in the format '%Y-%m-%d'.
-            show_time (time): The time of the show.
+            movie_info_list (list): Information about the movies and their shows, as returned by the scraper.
+            date (str): The date of the shows in the format '%Y-%m-%d'.
+            city_name (str): Name of the city.
+            cinema_number (int): Number of the cinema.
 
         Returns:
-            Show: The created Show object.
-        """
-        Show.objects.get_or_create(
-            booking_link=booking_link,
-            defaults={
-                'cinema': cinema,
-                'movie': movie,
-                'date': date,
-                'time': show_time,
-            },
-        )
+            int: Number of stored shows.
+        """
+        cache = self.identity_cache
+        cinema_key = IdentityCache.cinema_key(self.cinema_name, city_name, cinema_number)
+        with self.metrics.measure('write'), transaction.atomic():
+            cinema = cache.get_cinema(cinema_key) if cache else None
+            if cinema is None:
+                cinema = self.create_cinema(city_name, cinema_number)
+            movies = self._resolve_movies(movie_info_list)
+
+            shows = {}
+            for movie_info in movie_info_list:
+                movie = movies[(movie_info['title'], movie_info['movie_url'])]
+                for show_info in movie_info['show_info']:
+                    show_time = parse_show_time(show_info['hour'])
+                    if show_time is None:
+                        continue
+                    booking_link = show_info['booking_link']
+                    shows[booking_link] = Show(
+                        cinema=cinema, movie=movie, date=date, time=show_time, booking_link=booking_link
+                    )
+
+            existing = Show.objects.filter(booking_link__in=list(shows)).count() if shows else 0
+            Show.objects.bulk_create(
+                shows.values(),
+                batch_size=SHOW_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['booking_link'],
+                update_fields=['cinema', 'movie', 'date', 'time'],
+            )
+
+        self.metrics.increment('created_shows', len(shows) - existing)
+
+        # Only rows from a committed page are cached, so the cache never refers to rolled back rows
+        if cache:
+            cache.add(cinema_key, cinema, movies)
+        return len(shows)
+
+    def _ingest_page(self, movie_info_list, date, city_name, cinema_number=None):
+        """
+        Store the shows of a scraped page, unless the page did not change since it was last stored.
+
+        The fingerprint of the page is saved once its shows are committed. Empty pages, which are
+        also what the scrapers return on errors, are neither fingerprinted nor written to the database.
+
+        Args:
+            movie_info_list (list): Information about the movies and their shows, as returned by the scraper.
+            date (str): The date of the shows in the format '%Y-%m-%d'.
+            city_name (str): Name of the city.
+            cinema_number (int): Number of the cinema.
+
+        Returns:
+            dict: Number of films and shows stored for the page, flagged 'unchanged' when the ingest was skipped.
+        """
+        if not movie_info_list:
+            return {'films': 0, 'shows': 0}
+
+        key = page_key(self.cinema_name, city_name, cinema_number, date)
+        fingerprint = page_fingerprint(movie_info_list)
+        if is_unchanged(key, fingerprint):
+            return {'films': len(movie_info_list), 'shows': 0, 'unchanged': True}
+
+        shows = self.store_movie_info(movie_info_list, date, city_name, cinema_number)
+        save_fingerprint(key, date, fingerprint)
+        return {'films': len(movie_info_list), 'shows': shows}
+
+    def _resolve_movies(self, movie_info_list):
+        """
+        Get or create the Movie objects of a page with at most two SELECTs and one INSERT.
+
+        Movies are unique on their (title, movie_url). A movie inserted by a concurrent unit after it
+        was looked up is skipped by the INSERT, so the missing movies are selected again once inserted.
+
+        Args:
+            movie_info_list (list): Information about the movies.
+
+        Returns:
+            dict: Movie objects keyed by their (title, movie_url).
+        """
+        movie_infos = {(movie_info['title'], movie_info['movie_url']): movie_info for movie_info in movie_info_list}
+        movies = self.identity_cache.get_movies(movie_infos) if self.identity_cache else {}
+        uncached = {movie_url for (title, movie_url) in movie_infos if (title, movie_url) not in movies}
+        if uncached:
+            for movie in Movie.objects.filter(movie_url__in=uncached):
+                movies.setdefault((movie.title, movie.movie_url), movie)
+
+        missing = [self.build_movie(movie_info) for key, movie_info in movie_infos.items() if key not in movies]
+        if missing:
+            Movie.objects.bulk_create(missing, ignore_conflicts=True)
+            for movie in Movie.objects.filter(movie_url__in={movie.movie_url for movie in missing}):
+                movies.setdefault((movie.title, movie.movie_url), movie)
+        return movies
 
 
 class MultikinoScrapeStore(BaseScrapeStore):
     """
     Scrape and store movie data from the Multikino website.
     """
-    def __init__(self, cities):
+    def __init__(self, cities=None):
         """
         Initialize the MultikinoScrapeStore.
         """
@@ -131,53 +289,53 @@ class MultikinoScrapeStore(BaseScrapeStore):
         today = datetime.today()
         return [add_days(today, i).strftime('%Y-%m-%d') for i in range(self.AMOUNT_OF_DAYS)]
 
-    def create_movie(self, movie_info):
+    def build_movie(self, movie_info):
         """
-        Create and return a Movie object.
+        Build an unsaved Movie object.
 
         Args:
             movie_info (dict): Information about the movie.
 
         Returns:
-            Movie: The created or retrieved Movie object.
+            Movie: The unsaved Movie object.
         """
-        movie, _ = Movie.objects.get_or_create(
+        return Movie(
             title=movie_info['title'],
             movie_url=movie_info['movie_url'],
-            defaults={
-                'category': movie_info['category'],
-                'description': movie_info['description'],
-                'image_url': movie_info['image_url'],
-            }
+            category=movie_info['category'],
+            description=movie_info['description'],
+            image_url=movie_info['image_url'],
         )
-        return movie
 
-    def scrape_and_store_data(self):
+    def get_units(self):
         """
-        Scrape movie data from the Multikino website for the specified cities and dates,
-        and store it in the database.
+        Get one scrape unit per city and date.
+        """
+        return [{'city': city_name, 'date': date} for date in self.get_dates() for city_name in self.cities]
+
+    def scrape_and_store_unit(self, unit):
         """
-        for date in self.get_dates():
-            # Convert the date to 'DD-MM-YYYY' format for MultikinoScraper
-            formatted_date = datetime.strptime(date, '%Y-%m-%d').strftime('%d-%m-%Y')
+        Scrape movie data from the Multikino website for a single city and date,
+        and store it in the database.
 
-            for city_name in self.cities:
-                movie_info_list = self.scraper.get_movie_info(city_name, formatted_date)
+        Args:
+            unit (dict): The city and the date in the format '%Y-%m-%d'.
 
-                for movie_info in movie_info_list:
-                    for show_info in movie_info['show_info']:
-                        show_time = datetime.strptime(show_info['hour'], '%H:%M').time()
-                        booking_link = show_info['booking_link']
-                        cinema = self.create_cinema(city_name)
-                        movie = self.create_movie(movie_info)
-                        self.create_show(booking_link, cinema, movie, date, show_time)
+        Returns:
+            dict: Number of films and shows stored for the unit.
+        """
+        city_name, date = unit['city'], unit['date']
+        # Convert the date to 'DD-MM-YYYY' format for MultikinoScraper
+        formatted_date = datetime.strptime(date, '%Y-%m-%d').strftime('%d-%m-%Y')
+        movie_info_list = self.scraper.get_movie_info(city_name, formatted_date)
+        return self._ingest_page(movie_info_list, date, city_name)
 
 
 class HeliosScrapeStore(BaseScrapeStore):
     """
     Scrape and store movie data from the Helios website.
     """
-    def __init__(self, cities):
+    def __init__(self, cities=None):
         """
         Initialize the HeliosScrapeStore.
 
@@ -199,53 +357,222 @@ class HeliosScrapeStore(BaseScrapeStore):
         today = datetime.today()
         return {add_days(today, i).strftime('%Y-%m-%d'): i for i in range(self.AMOUNT_OF_DAYS)}
 
-    def create_movie(self, movie_info):
+    def build_movie(self, movie_info):
         """
-        Create and return a Movie object.
+        Build an unsaved Movie object.
 
         Args:
             movie_info (dict): Information about the movie.
 
         Returns:
-            Movie: The created or retrieved Movie object.
+            Movie: The unsaved Movie object.
         """
-        movie, _ = Movie.objects.get_or_create(
+        return Movie(
             title=movie_info['title'],
             movie_url=movie_info['movie_url'],
-            defaults={
-                'image_url': movie_info['image_url'],
-            }
+            image_url=movie_info['image_url'],
         )
-        return movie
 
-    def scrape_and_store_data(self):
+    def get_units(self):
+        """
+        Get one scrape unit per cinema and date.
         """
-        Scrape movie data from the Helios website for the specified cities, dates, and cinema numbers,
+        return [
+            {'city': city_name, 'cinema_number': cinema_num_in_city, 'date': date, 'day': day_numb}
+            for date, day_numb in self.get_dates().items()
+            for cinema_num_in_city, city_name in self.cities.items()
+        ]
+
+    def scrape_and_store_unit(self, unit):
+        """
+        Scrape movie data from the Helios website for a single cinema and date,
         and store it in the database.
+
+        Args:
+            unit (dict): The city, the cinema number, the date in the format '%Y-%m-%d'
+                and the number of days from today.
+
+        Returns:
+            dict: Number of films and shows stored for the unit.
         """
-        for date, day_numb in self.get_dates().items():
-            for cinema_num_in_city, city_name in self.cities.items():
-                movie_info_list = self.scraper.get_movie_info(city_name, day_numb, cinema_num_in_city)
+        city_name, cinema_num_in_city, date = unit['city'], unit['cinema_number'], unit['date']
+        movie_info_list = self.scraper.get_movie_info(city_name, unit['day'], cinema_num_in_city)
+        return self._ingest_page(movie_info_list, date, city_name, cinema_num_in_city)
+
 
-                for movie_info in movie_info_list:
-                    for show_info in movie_info['show_info']:
-                        try:
-                            show_time = datetime.strptime(show_info['hour'], '%H:%M').time()
-                        except ValueError:
-                            continue
-                        booking_link = show_info['booking_link']
-                        cinema = self.create_cinema(city_name, cinema_num_in_city)
-                        movie = self.create_movie(movie_info)
-                        self.create_show(booking_link, cinema, movie, date, show_time)
+SCRAPE_STORES = {
+    'multikino': MultikinoScrapeStore,
+    'helios': HeliosScrapeStore,
+}
+
+
+def archive_unit_pages(cinema_name, unit, scraper):
+    """
+    Archive the raw pages the scraper fetched for a unit, whether or not they could be parsed and stored.
+
+    A failure to archive the pages is only logged, as the archive must never fail the scrape itself.
+
+    Args:
+        cinema_name (str): Name of the cinema chain.
+        unit (dict): The scrape unit, as returned by get_units.
+        scraper (BaseMovieScraper): The scraper of the unit.
+    """
+    try:
+        archive_pages(cinema_name, unit, scraper.fetched_pages)
+    except OSError:
+        logger.exception("Pages of scrape unit %s could not be archived", unit)
+
+
+def record_scrape_unit(cinema_name, run_id, unit, started_at, metrics, result):
+    """
+    Record the timings and counts of a finished scrape unit in the scrape run ledger.
+
+    A failure to record the unit is only logged, as the ledger must never fail the scrape itself.
+
+    Args:
+        cinema_name (str): Name of the cinema chain.
+        run_id (str): Identifier of the scrape run the unit belongs to.
+        unit (dict): The scrape unit, as returned by get_units.
+        started_at (datetime): When the unit started.
+        metrics (ScrapeMetrics): The metrics of the unit.
+        result (dict): The result of the unit, with the number of films and shows or the error class.
+    """
+    finished_at = timezone.now()
+    cinema_number = unit.get('cinema_number')
+    try:
+        run, _ = ScrapeRun.objects.get_or_create(run_id=run_id, defaults={'cinema': cinema_name})
+        ScrapeUnit.objects.create(
+            run=run,
+            city=unit['city'],
+            cinema_number=None if cinema_number is None else int(cinema_number),
+            date=unit['date'],
+            started_at=started_at,
+            finished_at=finished_at,
+            duration=(finished_at - started_at).total_seconds(),
+            fetch_time=metrics.durations.get('fetch', 0),
+            parse_time=metrics.durations.get('parse', 0),
+            write_time=metrics.durations.get('write', 0),
+            pages=metrics.counts.get('pages', 0),
+            transferred_bytes=metrics.counts.get('transferred_bytes', 0),
+            blocked_requests=metrics.counts.get('blocked_requests', 0),
+            films=result.get('films', 0),
+            shows=result.get('shows', 0),
+            created_shows=metrics.counts.get('created_shows', 0),
+            unchanged=result.get('unchanged', False),
+            error=result.get('error', metrics.error),
+        )
+    except DatabaseError:
+        logger.exception("Scrape unit %s of run %s could not be recorded", unit, run_id)
+
+
+@worker_process_shutdown.connect
+def close_driver_pool(**_kwargs):
+    """
+    Quit the pooled Chrome drivers when a worker process shuts down.
+    """
+    driver_pool.close()
 
 
 @shared_task
 def delete_past_shows():
     """
-    Celery task for deleting past shows from the database.
+    Celery task for deleting past shows, and scrape runs older than the retention window, from the database.
+
+    Archived pages older than their retention window are removed as well.
     """
     today = datetime.today().date()
     Show.objects.filter(date__lt=today).delete()
+    PageFingerprint.objects.filter(date__lt=today).delete()
+    prune_archive()
+    ScrapeRun.objects.filter(started_at__lt=timezone.now() - timedelta(days=SCRAPE_RUN_RETENTION_DAYS)).delete()
+    bump_listing_version()
+    write_listing_snapshots()
+
+
+@shared_task(soft_time_limit=SCRAPE_UNIT_SOFT_TIME_LIMIT, time_limit=SCRAPE_UNIT_TIME_LIMIT)
+def scrape_and_store_unit(cinema_name, unit, run_id):
+    """
+    Celery task for scraping and storing a single (chain, city, date) unit.
+
+    Errors are logged and reported in the result instead of being raised, so that
+    one failing unit does not prevent the chord callback from finalizing the run.
+    The fetched pages are archived and the timings and counts of the unit are recorded in the scrape run ledger.
+
+    Args:
+        cinema_name (str): Name of the cinema chain.
+        unit (dict): The scrape unit, as returned by get_units.
+        run_id (str): Identifier of the scrape run the unit belongs to.
+
+    Returns:
+        dict: The unit with the number of films and shows stored, or the error class.
+    """
+    started_at = timezone.now()
+    store = SCRAPE_STORES[cinema_name]()
+    store.identity_cache = identity_cache
+    try:
+        identity_cache.start_run(run_id, cinema_name)
+        cache_stats = identity_cache.stats()
+        counts = store.scrape_and_store_unit(unit)
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        logger.exception("Scrape unit %s of run %s failed", unit, run_id)
+        result = {**unit, 'error': type(error).__name__}
+        archive_unit_pages(cinema_name, unit, store.scraper)
+        record_scrape_unit(cinema_name, run_id, unit, started_at, store.metrics, result)
+        return result
+    archive_unit_pages(cinema_name, unit, store.scraper)
+    record_scrape_unit(cinema_name, run_id, unit, started_at, store.metrics, counts)
+
+    # New shows must not be hidden behind listings cached before this unit was stored
+    if not counts.get('unchanged'):
+        bump_listing_version()
+
+    # Report the cache counters of this unit only, as a worker process serves many units of a run
+    counts.update({key: value - cache_stats[key] for key, value in identity_cache.stats().items()})
+    return {**unit, **counts}
+
+
+@shared_task
+def finalize_scrape_run(results, cinema_name, run_id):
+    """
+    Celery chord callback finalizing a scrape run once all of its units finished.
+
+    The totals are recorded in the scrape run ledger and the listing snapshots are written
+    for the data of the finished run.
+
+    Args:
+        results (list): Results of the scrape_and_store_unit tasks of the run.
+        cinema_name (str): Name of the cinema chain.
+        run_id (str): Identifier of the scrape run.
+
+    Returns:
+        dict: Totals of the run, stored as the result of this task.
+    """
+    totals = {
+        'run_id': run_id,
+        'cinema': cinema_name,
+        'units': len(results),
+        'failed_units': sum(1 for result in results if 'error' in result),
+        'unchanged_units': sum(1 for result in results if result.get('unchanged')),
+        'films': sum(result.get('films', 0) for result in results),
+        'shows': sum(result.get('shows', 0) for result in results),
+        'cache_hits': sum(result.get('cache_hits', 0) for result in results),
+        'cache_misses': sum(result.get('cache_misses', 0) for result in results),
+    }
+    logger.info("Scrape run finished: %s", totals)
+    logger.info("Identity cache of run %s: %s hits, %s misses", run_id, totals['cache_hits'], totals['cache_misses'])
+    created_shows = ScrapeUnit.objects.filter(run__run_id=run_id).aggregate(created=Sum('created_shows'))['created']
+    ScrapeRun.objects.filter(run_id=run_id).update(
+        finished_at=timezone.now(),
+        units=totals['units'],
+        failed_units=totals['failed_units'],
+        unchanged_units=totals['unchanged_units'],
+        films=totals['films'],
+        shows=totals['shows'],
+        created_shows=created_shows or 0,
+    )
+    bump_listing_version()
+    totals['snapshots'] = write_listing_snapshots()
+    return totals
 
 
 @shared_task
@@ -253,6 +580,8 @@ def scrape_and_store_multikino(cities):
     """
     Celery task for scraping and storing movie data from Multikino website.
 
+    The scrape is dispatched as one scrape_and_store_unit task per city and date.
+
     Args:
         cities (list): List of cities to scrape movie data for.
     """
@@ -265,6 +594,8 @@ def scrape_and_store_helios(cities):
     """
     Celery task for scraping and storing movie data from Helios website.
 
+    The scrape is dispatched as one scrape_and_store_unit task per cinema and date.
+
     Args:
         cities (dict): Dictionary of cities and cinema numbers to scrape movie data for.
     """
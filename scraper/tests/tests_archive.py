@@ -0,0 +1,127 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from scraper.archive import archive_pages, list_archived_pages, prune_archive, read_archived_page
+from scraper.models import Show
+from scraper.tasks import scrape_and_store_unit
+from scraper.tests.tests_scraper import HELIOS_HTML, MULTIKINO_HTML
+
+
+class ArchiveTestCase(TestCase):
+    """
+    Test case archiving pages into a temporary directory.
+    """
+
+    def setUp(self):
+        """
+        Point the archive to a temporary directory.
+        """
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        settings_override = override_settings(SCRAPER_ARCHIVE_ROOT=str(self.root))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class TestPageArchive(ArchiveTestCase):
+    """
+    Test class for the content-addressed page archive.
+    """
+    UNIT = {'city': 'krakow', 'date': '2035-06-01'}
+
+    def test_pages_are_stored_once_and_listed_per_fetch(self):
+        """
+        Test case to check that identical pages share one compressed object and are listed for every fetch.
+        """
+        page = {'url': 'https://multikino.pl/repertuar/krakow', 'source': 'browser', 'html': MULTIKINO_HTML}
+        self.assertEqual(archive_pages('multikino', self.UNIT, [page]), 1)
+        archive_pages('multikino', self.UNIT, [page])
+
+        entries = list_archived_pages()
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(entries[0]['sha256'], entries[1]['sha256'])
+        self.assertEqual((entries[0]['cinema'], entries[0]['city']), ('multikino', 'krakow'))
+        objects = list((self.root / 'objects').glob('*/*.html.zst'))
+        self.assertEqual(len(objects), 1)
+        self.assertLess(objects[0].stat().st_size, len(MULTIKINO_HTML))
+        self.assertEqual(read_archived_page(entries[0]['sha256']), MULTIKINO_HTML.encode('utf-8'))
+
+    def test_prune_removes_expired_pages(self):
+        """
+        Test case to check that pages listed in expired manifests only are removed.
+        """
+        archive_pages('multikino', self.UNIT, [{'url': 'old', 'source': 'browser', 'html': 'old page'}])
+        old_day = (timezone.localdate() - timedelta(days=30)).isoformat()
+        (self.root / 'manifests' / f'{timezone.localdate().isoformat()}.jsonl').rename(
+            self.root / 'manifests' / f'{old_day}.jsonl')
+        archive_pages('multikino', self.UNIT, [{'url': 'new', 'source': 'browser', 'html': 'new page'}])
+
+        self.assertEqual(prune_archive(retention_days=14), 1)
+        self.assertEqual(list_archived_pages(old_day), [])
+        self.assertEqual(read_archived_page(list_archived_pages()[0]['sha256']), b'new page')
+
+    @patch('scraper.scraper.WebDriverManager.get_chrome_driver')
+    @patch('scraper.scraper.http_session.get')
+    def test_unit_archives_fetched_pages(self, mock_get, _mock_get_chrome_driver):
+        """
+        Test case to check that the pages fetched by a scrape unit are archived.
+        """
+        mock_get.return_value.content = HELIOS_HTML.encode('utf-8')
+        unit = {'city': 'krakow', 'cinema_number': '1', 'date': '2035-06-01', 'day': 0}
+
+        scrape_and_store_unit('helios', unit, 'archive-run')
+
+        entry, = list_archived_pages()
+        self.assertEqual((entry['cinema'], entry['cinema_number'], entry['source']), ('helios', '1', 'http'))
+        self.assertEqual(read_archived_page(entry['sha256']), HELIOS_HTML.encode('utf-8'))
+
+
+class TestReparseArchiveCommand(ArchiveTestCase):
+    """
+    Test class for the reparse_archive management command.
+    """
+
+    def setUp(self):
+        """
+        Archive a Multikino and a Helios page.
+        """
+        super().setUp()
+        archive_pages('multikino', {'city': 'krakow', 'date': '2035-06-01'},
+                      [{'url': 'multikino', 'source': 'browser', 'html': MULTIKINO_HTML}])
+        archive_pages('helios', {'city': 'krakow', 'cinema_number': '1', 'date': '2035-06-01', 'day': 0},
+                      [{'url': 'helios', 'source': 'http', 'html': HELIOS_HTML.encode('utf-8')}])
+
+    def test_pages_are_parsed_without_storing(self):
+        """
+        Test case to check that the archived pages are parsed and reported without touching the database.
+        """
+        out = StringIO()
+        call_command('reparse_archive', stdout=out)
+
+        self.assertIn('Parsed 2 pages', out.getvalue())
+        self.assertIn('3 films, 4 shows', out.getvalue())
+        self.assertFalse(Show.objects.exists())
+
+    @patch('scraper.management.commands.reparse_archive.write_listing_snapshots')
+    def test_pages_are_stored(self, mock_write_listing_snapshots):
+        """
+        Test case to check that the shows parsed from the archived pages of a chain can be stored.
+        """
+        call_command('reparse_archive', '--cinema', 'multikino', '--store', stdout=StringIO())
+
+        self.assertEqual(Show.objects.filter(cinema__name='multikino').count(), 3)
+        self.assertFalse(Show.objects.filter(cinema__name='helios').exists())
+        mock_write_listing_snapshots.assert_called_once()
+
+    def test_missing_day(self):
+        """
+        Test case to check that a day without archived pages is reported as an error.
+        """
+        with self.assertRaisesMessage(CommandError, 'No archived pages found'):
+            call_command('reparse_archive', '--day', '2000-01-01')
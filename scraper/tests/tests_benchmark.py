@@ -0,0 +1,134 @@
+import gzip
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+from bs4 import BeautifulSoup
+from django.core.management import CommandError, call_command
+from scraper.archive import archive_pages, list_archived_pages
+from scraper.benchmark import BENCHMARK_SCRAPERS, FIXTURE_SIZES, export_fixture, load_fixture, \
+    load_fixture_sources, run_benchmark
+from scraper.tests.tests_archive import ArchiveTestCase
+from scraper.tests.tests_scraper import MULTIKINO_HTML
+
+
+class TestParserBenchmark(TestCase):
+    """
+    Test class for the offline parser benchmark.
+    """
+
+    def test_fixtures_parse_alike_with_each_backend(self):
+        """
+        Test case to check that every fixture yields the same films with both parser backends.
+        """
+        for chain, scraper_class in BENCHMARK_SCRAPERS.items():
+            for size in FIXTURE_SIZES:
+                with self.subTest(chain=chain, size=size):
+                    html = load_fixture(chain, size)
+                    movie_info_list = scraper_class().extract_movie_info(BeautifulSoup(html, 'html.parser'))
+                    self.assertTrue(movie_info_list)
+                    self.assertEqual(scraper_class().extract_movie_info(BeautifulSoup(html, 'lxml')), movie_info_list)
+
+    def test_film_list_subtree_parses_like_whole_page(self):
+        """
+        Test case to check that parsing only the film list yields the same films as parsing the whole page.
+        """
+        for chain, scraper_class in BENCHMARK_SCRAPERS.items():
+            for size in FIXTURE_SIZES:
+                with self.subTest(chain=chain, size=size):
+                    html = load_fixture(chain, size)
+                    scraper = scraper_class()
+                    self.assertEqual(scraper.parse_movie_info(html),
+                                     scraper.extract_movie_info(BeautifulSoup(html, 'html.parser')))
+
+    def test_run_benchmark(self):
+        """
+        Test case to check that each page is measured with each parser backend.
+        """
+        benchmark = run_benchmark(sizes=['small'], repeat=1)
+
+        self.assertEqual([(result['chain'], result['parser']) for result in benchmark['results']], [
+            ('multikino', 'html.parser'), ('multikino', 'lxml'), ('helios', 'html.parser'), ('helios', 'lxml'),
+        ])
+        result = benchmark['results'][0]
+        self.assertEqual((result['films'], result['shows']), (4, 23))
+        self.assertEqual(result['source'], load_fixture_sources()['multikino_small']['source'])
+        self.assertGreater(result['films_per_second'], 0)
+        self.assertGreater(result['peak_memory_kb'], 0)
+
+    def test_command_appends_results(self):
+        """
+        Test case to check that each run of the command is appended to the JSON file.
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        output = Path(directory) / 'benchmark.json'
+
+        for _ in range(2):
+            call_command('benchmark_parsers', '--chain', 'helios', '--size', 'small', '--parser', 'lxml',
+                         '--repeat', '1', '--output', str(output), stdout=StringIO())
+
+        runs = json.loads(output.read_text(encoding='utf-8'))
+        self.assertEqual(len(runs), 2)
+        self.assertEqual([result['parser'] for result in runs[1]['results']], ['lxml'])
+
+
+class TestFixtureExport(ArchiveTestCase):
+    """
+    Test class for the export of archived pages as benchmark fixtures.
+    """
+    UNIT = {'city': 'krakow', 'date': '2035-06-01'}
+    PAGE = f'<html><head><script>var tracking = 1;</script><style>.a {{}}</style></head>' \
+           f'<body><!-- banner -->{MULTIKINO_HTML}</body></html>'
+
+    def setUp(self):
+        """
+        Archive a page and point the fixtures to a temporary directory.
+        """
+        super().setUp()
+        self.fixture_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.fixture_dir)
+        archive_pages('multikino', self.UNIT, [{'url': 'https://multikino.pl/repertuar/krakow', 'source': 'browser',
+                                                'html': self.PAGE}])
+        self.entry, = list_archived_pages()
+
+    def test_page_is_trimmed_and_its_source_recorded(self):
+        """
+        Test case to check that the exported page keeps its films without the markup the scrapers never read.
+        """
+        source = export_fixture(self.entry, 'typical', self.fixture_dir)
+
+        html = gzip.decompress((self.fixture_dir / 'multikino_typical.html.gz').read_bytes())
+        self.assertNotIn(b'<script', html)
+        self.assertNotIn(b'banner', html)
+        scraper = BENCHMARK_SCRAPERS['multikino']()
+        self.assertEqual(scraper.parse_movie_info(html), scraper.parse_movie_info(self.PAGE))
+        self.assertEqual(load_fixture_sources(self.fixture_dir), {'multikino_typical': source})
+        self.assertEqual((source['source'], source['sha256']), ('archive', self.entry['sha256']))
+        self.assertEqual((source['city'], source['date']), ('krakow', '2035-06-01'))
+        self.assertEqual(source['films'], 2)
+        self.assertLess(source['trimmed_bytes'], source['bytes'])
+
+    def test_page_without_films_is_rejected(self):
+        """
+        Test case to check that an archived page without films is not exported.
+        """
+        archive_pages('multikino', self.UNIT, [{'url': 'empty', 'source': 'browser', 'html': '<html></html>'}])
+
+        with self.assertRaises(ValueError):
+            export_fixture(list_archived_pages()[-1], 'small', self.fixture_dir)
+        self.assertFalse(any(self.fixture_dir.iterdir()))
+
+    def test_command_exports_page_by_digest_prefix(self):
+        """
+        Test case to check that the command exports the archived page matching a prefix of its digest.
+        """
+        with patch('scraper.benchmark.FIXTURE_DIR', self.fixture_dir):
+            call_command('export_benchmark_fixture', self.entry['sha256'][:8], '--size', 'huge', stdout=StringIO())
+            with self.assertRaises(CommandError):
+                call_command('export_benchmark_fixture', 'missing', '--size', 'huge', stdout=StringIO())
+
+        self.assertEqual(load_fixture_sources(self.fixture_dir)['multikino_huge']['sha256'], self.entry['sha256'])
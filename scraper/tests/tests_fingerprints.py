@@ -0,0 +1,88 @@
+from copy import deepcopy
+from unittest import TestCase
+from unittest.mock import patch
+from django.test import TestCase as DatabaseTestCase
+from scraper.fingerprints import page_fingerprint, page_key
+from scraper.models import PageFingerprint, Show
+from scraper.tasks import scrape_and_store_unit
+from scraper.tests import tests_tasks
+
+
+class TestPageFingerprint(TestCase):
+    """
+    Test class for the fingerprints of scraped pages.
+    """
+    MOVIE_INFO = tests_tasks.TestScrapeUnitTasks.MOVIE_INFO
+
+    def test_fingerprint_ignores_order(self):
+        """
+        Test case to check that the order of the films and shows on the page does not change the fingerprint.
+        """
+        other_movie = {**self.MOVIE_INFO[0], 'title': 'Other', 'show_info': []}
+        reordered = deepcopy(self.MOVIE_INFO)
+        reordered[0]['show_info'].reverse()
+
+        self.assertEqual(page_fingerprint([*self.MOVIE_INFO, other_movie]), page_fingerprint([other_movie, *reordered]))
+
+    def test_fingerprint_changes_with_shows(self):
+        """
+        Test case to check that a changed show time changes the fingerprint.
+        """
+        changed = deepcopy(self.MOVIE_INFO)
+        changed[0]['show_info'][0]['hour'] = '12:15'
+
+        self.assertNotEqual(page_fingerprint(self.MOVIE_INFO), page_fingerprint(changed))
+
+    def test_page_key_normalizes_cinema_number(self):
+        """
+        Test case to check that cinema numbers given as strings and integers give the same key.
+        """
+        self.assertEqual(page_key('helios', 'krakow', '1', '2035-06-01'), page_key('helios', 'krakow', 1, '2035-06-01'))
+        self.assertEqual(page_key('multikino', 'krakow', None, '2035-06-01'), 'multikino:krakow::2035-06-01')
+
+
+class TestUnchangedPageSkip(DatabaseTestCase):
+    """
+    Test class for skipping the ingest of unchanged pages.
+    """
+    MOVIE_INFO = tests_tasks.TestScrapeUnitTasks.MOVIE_INFO
+    UNIT = {'city': 'krakow', 'date': '2035-06-01'}
+
+    @patch('scraper.tasks.bump_listing_version')
+    @patch('scraper.tasks.MultikinoScraper')
+    def test_unchanged_page_is_not_stored_again(self, mock_scraper, mock_bump_listing_version):
+        """
+        Test case to check that a page with the fingerprint of its last ingest is skipped,
+        and that a changed page is stored again.
+        """
+        mock_scraper.return_value.get_movie_info.return_value = self.MOVIE_INFO
+        scrape_and_store_unit('multikino', self.UNIT, 'first-run')
+        self.assertEqual(PageFingerprint.objects.get().key, 'multikino:krakow::2035-06-01')
+        Show.objects.all().delete()
+
+        result = scrape_and_store_unit('multikino', self.UNIT, 'second-run')
+
+        self.assertTrue(result['unchanged'])
+        self.assertEqual(result['shows'], 0)
+        self.assertFalse(Show.objects.exists())
+        mock_bump_listing_version.assert_called_once()
+
+        changed = deepcopy(self.MOVIE_INFO)
+        changed[0]['show_info'].pop()
+        mock_scraper.return_value.get_movie_info.return_value = changed
+
+        result = scrape_and_store_unit('multikino', self.UNIT, 'third-run')
+
+        self.assertNotIn('unchanged', result)
+        self.assertEqual(Show.objects.count(), 1)
+
+    @patch('scraper.tasks.MultikinoScraper')
+    def test_empty_page_is_not_fingerprinted(self, mock_scraper):
+        """
+        Test case to check that empty pages, also returned on scraping errors, are never skipped.
+        """
+        mock_scraper.return_value.get_movie_info.return_value = []
+
+        scrape_and_store_unit('multikino', self.UNIT, 'empty-run')
+
+        self.assertFalse(PageFingerprint.objects.exists())
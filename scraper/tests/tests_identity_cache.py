@@ -0,0 +1,66 @@
+from django.test import TestCase
+from scraper.identity_cache import IdentityCache
+from scraper.models import Cinema, Movie, Show
+from scraper.tasks import HeliosScrapeStore
+
+
+class TestIdentityCache(TestCase):
+    """
+    Test class for the IdentityCache class.
+    """
+
+    def setUp(self):
+        """
+        Set up a cinema with a movie playing in the future and a fresh cache.
+        """
+        self.cinema = Cinema.objects.create(name='helios', city='krakow', number=1)
+        self.movie = Movie.objects.create(title='Movie Test', movie_url='https://helios.pl/filmy/movie-test')
+        Show.objects.create(
+            cinema=self.cinema, movie=self.movie, date='2035-06-01', time='12:00', booking_link='link/1')
+        self.cache = IdentityCache()
+
+    def test_start_run_warms_chain_once(self):
+        """
+        Test case to check that a chain is warmed with one query per model, once per run.
+        """
+        with self.assertNumQueries(2):
+            self.cache.start_run('run', 'helios')
+        with self.assertNumQueries(0):
+            self.cache.start_run('run', 'helios')
+
+        self.assertEqual(self.cache.get_cinema(IdentityCache.cinema_key('helios', 'krakow', '1')), self.cinema)
+        self.assertEqual(self.cache.get_movies([('Movie Test', self.movie.movie_url)]),
+                         {('Movie Test', self.movie.movie_url): self.movie})
+        self.assertEqual(self.cache.stats(), {'cache_hits': 2, 'cache_misses': 0})
+
+    def test_new_run_drops_previous_entries(self):
+        """
+        Test case to check that starting another run drops the rows and counters of the previous one.
+        """
+        self.cache.start_run('run', 'helios')
+        self.cache.get_cinema(('helios', 'kielce', 2))
+        self.cache.start_run('other-run', 'multikino')
+
+        self.assertIsNone(self.cache.get_cinema(IdentityCache.cinema_key('helios', 'krakow', 1)))
+        self.assertEqual(self.cache.stats(), {'cache_hits': 0, 'cache_misses': 1})
+
+    def test_store_skips_cached_lookups(self):
+        """
+        Test case to check that the store does not query cinemas and movies known to the cache.
+        """
+        store = HeliosScrapeStore()
+        store.identity_cache = self.cache
+        self.cache.start_run('run', 'helios')
+        movie_info = {
+            'title': 'Movie Test',
+            'image_url': 'https://helios.pl/poster.jpg',
+            'movie_url': 'https://helios.pl/filmy/movie-test',
+            'show_info': [{'hour': '18:00', 'booking_link': 'link/2'}],
+        }
+
+        # Savepoint, count of the existing shows, upsert of the shows and release
+        with self.assertNumQueries(4):
+            store.store_movie_info([movie_info], '2035-06-02', 'krakow', '1')
+
+        self.assertEqual(Show.objects.get(booking_link='link/2').movie, self.movie)
+        self.assertEqual(self.cache.stats(), {'cache_hits': 2, 'cache_misses': 0})
@@ -0,0 +1,256 @@
+from io import StringIO
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.webdriver.common.by import By
+from scraper.latency import LATENCY_BUCKETS, MIN_WAIT_TIME, get_latency_stats, get_wait_time, latency_percentile, \
+    record_latency, record_scroll_timeout, record_timeout
+from scraper.scraper import SCROLL_TIME_LIMIT, HeliosScraper, MultikinoScraper
+
+
+class TestLatencyStats(TestCase):
+    """
+    Test class for the page load latency histograms of the cinema chains.
+    """
+    def setUp(self):
+        """
+        Start from empty histograms.
+        """
+        cache.clear()
+
+    def test_record_latency(self):
+        """
+        Test case to check that page loads are counted in the bucket of their latency and timeouts apart.
+        """
+        for seconds in (0.4, 1, 2.5, 1000):
+            record_latency('multikino', seconds)
+        record_timeout('multikino')
+        record_scroll_timeout('multikino')
+        record_scroll_timeout('multikino')
+
+        stats = get_latency_stats('multikino')
+        self.assertEqual(stats['histogram'][:3], [2, 0, 1])
+        self.assertEqual(stats['histogram'][-1], 1)
+        self.assertEqual((stats['timeouts'], stats['scroll_timeouts']), (1, 2))
+        self.assertEqual(sum(get_latency_stats('helios')['histogram']), 0)
+
+    def test_percentile(self):
+        """
+        Test case to check that the percentile is the bound of its bucket, once there are enough samples.
+        """
+        histogram = [0] * len(LATENCY_BUCKETS)
+        self.assertIsNone(latency_percentile(histogram, 0.99))
+
+        histogram[1], histogram[8] = 98, 2
+        self.assertEqual(latency_percentile(histogram, 0.5), 2)
+        self.assertEqual(latency_percentile(histogram, 0.99), 12)
+
+    def test_wait_time(self):
+        """
+        Test case to check that the wait time is twice the p99, bounded, and the maximum until it is learned.
+        """
+        histogram = [0] * len(LATENCY_BUCKETS)
+        stats = {'histogram': histogram, 'timeouts': 0}
+        self.assertEqual(get_wait_time('multikino', 300, stats), 300)
+
+        histogram[8] = 100
+        self.assertEqual(get_wait_time('multikino', 300, stats), 24)
+        self.assertEqual(get_wait_time('multikino', 20, stats), 20)
+
+        histogram[8], histogram[0] = 0, 100
+        self.assertEqual(get_wait_time('multikino', 300, stats), MIN_WAIT_TIME)
+
+    def test_timeouts_widen_wait_time(self):
+        """
+        Test case to check that the wait time goes back up once the pages of a chain time out, while a single
+        timeout among many fast pages does not change it.
+        """
+        for _ in range(100):
+            record_latency('helios', 1)
+        record_timeout('helios')
+        self.assertEqual(get_wait_time('helios', 60), MIN_WAIT_TIME)
+
+        for _ in range(4):
+            record_timeout('helios')
+        self.assertEqual(get_wait_time('helios', 60), 60)
+
+    def test_evicted_counter_is_set_again(self):
+        """
+        Test case to check that a counter evicted between its creation and its increment is set again,
+        and that a failing cache does not fail the page load it is recorded for.
+        """
+        with patch('scraper.latency.cache.incr', side_effect=ValueError):
+            record_latency('multikino', 1)
+        self.assertEqual(get_latency_stats('multikino')['histogram'][0], 1)
+
+        with patch('scraper.latency.cache.add', side_effect=ConnectionError), \
+                patch('scraper.latency.logger.exception') as mock_logging_exception:
+            record_timeout('multikino')
+        mock_logging_exception.assert_called_once()
+
+        with patch('scraper.latency.cache.get_many', side_effect=ConnectionError), \
+                patch('scraper.latency.logger.exception'):
+            self.assertEqual(get_wait_time('multikino', 300), 300)
+
+    @override_settings(REDIS_URL='')
+    def test_command(self):
+        """
+        Test case to check that the command prints the stats and the wait time of each chain.
+        """
+        for _ in range(100):
+            record_latency('helios', 5)
+        stdout = StringIO()
+
+        call_command('scrape_latency', stdout=stdout)
+
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(lines[1].split(), ['multikino', '0', '0', '0', '-', '-', '-', '300'])
+        self.assertEqual(lines[2].split(), ['helios', '100', '0', '0', '5', '5', '5', '10'])
+        self.assertIn('REDIS_URL is not set', lines[3])
+
+
+class BrowserPageTestCase(TestCase):
+    """
+    Test case loading pages in a mocked browser, starting from empty histograms.
+    """
+    def setUp(self):
+        """
+        Start from empty histograms.
+        """
+        cache.clear()
+
+    @staticmethod
+    def mock_driver(page_source, present_selectors=()):
+        """
+        Build a driver finding only the elements matching the given CSS selectors.
+        """
+        def find_element(strategy, value):
+            if strategy != By.CSS_SELECTOR or value not in present_selectors:
+                raise NoSuchElementException(value)
+            return MagicMock()
+
+        driver = MagicMock()
+        driver.page_source = page_source
+        driver.find_element.side_effect = find_element
+        return driver
+
+
+class TestAdaptiveWait(BrowserPageTestCase):
+    """
+    Test class for the readiness detection of the pages loaded in the browser.
+    """
+
+    @patch('scraper.scraper.WebDriverManager.get_chrome_driver')
+    def test_page_without_shows_returns_early(self, mock_get_chrome_driver):
+        """
+        Test case to check that a page showing the markup of no shows is not waited for nor scrolled.
+        """
+        driver = self.mock_driver('<div class="no-shows"></div>', ['.no-shows'])
+        mock_get_chrome_driver.return_value.__enter__.return_value = driver
+
+        with patch.object(MultikinoScraper, 'EMPTY_PAGE_SELECTORS', ('.no-shows',)):
+            self.assertEqual(MultikinoScraper().get_movie_info('krakow', '01-06-2035'), [])
+
+        driver.execute_async_script.assert_not_called()
+        self.assertEqual(sum(get_latency_stats('multikino')['histogram']), 1)
+
+    @patch('scraper.scraper.WebDriverManager.get_chrome_driver')
+    def test_error_page_fails_early(self, mock_get_chrome_driver):
+        """
+        Test case to check that the error page of the browser is reported as an error as soon as it is shown.
+        """
+        driver = self.mock_driver('<div id="main-frame-error"></div>', ['#main-frame-error'])
+        mock_get_chrome_driver.return_value.__enter__.return_value = driver
+        scraper = MultikinoScraper()
+
+        with patch('scraper.scraper.logger.error') as mock_logging_error:
+            self.assertEqual(scraper.get_movie_info('krakow', '01-06-2035'), [])
+
+        mock_logging_error.assert_called_once()
+        self.assertEqual(scraper.metrics.error, 'WebDriverException')
+        self.assertEqual(sum(get_latency_stats('multikino')['histogram']), 0)
+
+    @patch('scraper.scraper.WebDriverManager.get_chrome_driver')
+    def test_timeout_uses_learned_wait_time(self, mock_get_chrome_driver):
+        """
+        Test case to check that the page gets the learned wait time and that a timeout is counted.
+        """
+        for _ in range(100):
+            record_latency('multikino', 5)
+        driver = self.mock_driver('')
+        mock_get_chrome_driver.return_value.__enter__.return_value = driver
+        scraper = MultikinoScraper()
+
+        with patch('scraper.scraper.WebDriverWait') as mock_wait:
+            mock_wait.return_value.until.side_effect = TimeoutException()
+            self.assertEqual(scraper.get_movie_info('krakow', '01-06-2035'), [])
+
+        driver.set_page_load_timeout.assert_called_once_with(10)
+        self.assertLessEqual(mock_wait.call_args.args[1], 10)
+        self.assertEqual(scraper.metrics.error, 'TimeoutException')
+        self.assertEqual(get_latency_stats('multikino')['timeouts'], 1)
+
+    @patch('scraper.scraper.WebDriverManager.get_chrome_driver')
+    @patch('scraper.scraper.http_session.get')
+    def test_helios_page_without_shows_skips_browser(self, mock_get, mock_get_chrome_driver):
+        """
+        Test case to check that a Helios page showing the markup of no shows does not fall back to the browser.
+        """
+        mock_get.return_value.content = b'<html><body><div class="no-shows">Brak seansow</div></body></html>'
+
+        with patch.object(HeliosScraper, 'EMPTY_PAGE_SELECTORS', ('.no-shows',)):
+            self.assertEqual(HeliosScraper().get_movie_info('krakow', 0, 1), [])
+        mock_get_chrome_driver.assert_not_called()
+
+    @patch('scraper.scraper.WebDriverManager.get_chrome_driver')
+    @patch('scraper.scraper.http_session.get')
+    def test_helios_page_without_film_list_uses_browser(self, mock_get, mock_get_chrome_driver):
+        """
+        Test case to check that a Helios page without the film list falls back to the browser, as long as
+        no markup of pages without shows is configured.
+        """
+        mock_get.return_value.content = b'<html><body><div class="no-seances">Brak seansow</div></body></html>'
+        mock_get_chrome_driver.return_value.__enter__.return_value.page_source = ''
+
+        with patch('scraper.scraper.logger.warning'):
+            self.assertEqual(HeliosScraper().get_movie_info('krakow', 0, 1), [])
+        mock_get_chrome_driver.assert_called_once()
+
+
+class TestScroll(BrowserPageTestCase):
+    """
+    Test class for the scroll pass reading the whole film list of the pages.
+    """
+
+    def test_list_is_read_once_stable(self):
+        """
+        Test case to check that the page source is read after the scroll pass waited for a stable film list.
+        """
+        driver = MagicMock()
+
+        HeliosScraper().load_page_source(driver, 'https://www.helios.pl', (By.CLASS_NAME, 'seances-list'), 60)
+
+        self.assertEqual(driver.execute_async_script.call_args.args[2], HeliosScraper.ITEM_SELECTOR)
+        self.assertEqual(sum(get_latency_stats('helios')['histogram']), 1)
+
+    def test_scroll_gets_its_own_time_limit(self):
+        """
+        Test case to check that a scroll slower than the learned wait time is not cut short by it, and that
+        a scroll timeout is counted apart from the page load timeouts.
+        """
+        for _ in range(100):
+            record_latency('helios', 1)
+        driver = MagicMock()
+        driver.execute_async_script.side_effect = TimeoutException()
+
+        with self.assertRaises(TimeoutException):
+            HeliosScraper().load_page_source(driver, 'https://www.helios.pl', (By.CLASS_NAME, 'seances-list'), 60)
+
+        driver.set_page_load_timeout.assert_called_once_with(10)
+        driver.set_script_timeout.assert_called_once_with(SCROLL_TIME_LIMIT)
+        self.assertGreater(SCROLL_TIME_LIMIT, 10)
+        stats = get_latency_stats('helios')
+        self.assertEqual((sum(stats['histogram']), stats['timeouts'], stats['scroll_timeouts']), (101, 0, 1))
@@ -0,0 +1,93 @@
+from io import StringIO
+from datetime import timedelta
+from unittest.mock import patch
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from scraper.models import Cinema, Movie, Show, ScrapeRun, ScrapeUnit
+from scraper.tasks import finalize_scrape_run, scrape_and_store_unit
+from scraper.tests import tests_tasks
+
+
+class TestScrapeLedger(TestCase):
+    """
+    Test class for the scrape run ledger kept by the scrape tasks.
+    """
+    MOVIE_INFO = tests_tasks.TestScrapeUnitTasks.MOVIE_INFO
+
+    def setUp(self):
+        """
+        Set up a run and an already stored show of it.
+        """
+        self.run = ScrapeRun.objects.create(run_id='ledger-run', cinema='multikino', units=2)
+        cinema = Cinema.objects.create(name='multikino', city='krakow')
+        movie = Movie.objects.create(title='Movie Test', movie_url='https://multikino.pl/filmy/movie-test')
+        Show.objects.create(cinema=cinema, movie=movie, date='2035-06-01', time='12:00',
+                            booking_link='https://multikino.pl/rezerwacja/1')
+
+    @patch('scraper.tasks.MultikinoScraper')
+    def test_unit_is_recorded(self, mock_scraper):
+        """
+        Test case to check that a unit records its counts, separating new shows from already stored ones.
+        """
+        mock_scraper.return_value.get_movie_info.return_value = self.MOVIE_INFO
+
+        scrape_and_store_unit('multikino', {'city': 'krakow', 'date': '2035-06-01'}, 'ledger-run')
+
+        unit = ScrapeUnit.objects.get(run=self.run)
+        self.assertEqual((unit.city, unit.date.isoformat()), ('krakow', '2035-06-01'))
+        self.assertEqual((unit.films, unit.shows, unit.created_shows), (1, 2, 1))
+        self.assertEqual(unit.error, '')
+        self.assertGreater(unit.write_time, 0)
+        self.assertGreaterEqual(unit.duration, unit.write_time)
+
+    @patch('scraper.tasks.HeliosScraper')
+    def test_failing_unit_is_recorded(self, mock_scraper):
+        """
+        Test case to check that a failing unit records its error class.
+        """
+        mock_scraper.return_value.get_movie_info.side_effect = ValueError('Broken page')
+        unit = {'city': 'krakow', 'cinema_number': '1', 'date': '2035-06-01', 'day': 0}
+
+        scrape_and_store_unit('helios', unit, 'unknown-run')
+
+        unit = ScrapeUnit.objects.get(run__run_id='unknown-run')
+        self.assertEqual((unit.run.cinema, unit.cinema_number, unit.error), ('helios', 1, 'ValueError'))
+
+    @patch('scraper.tasks.write_listing_snapshots', return_value=0)
+    def test_finalize_records_totals(self, _mock_write_listing_snapshots):
+        """
+        Test case to check that the chord callback records the end and the totals of the run.
+        """
+        now = timezone.now()
+        ScrapeUnit.objects.create(run=self.run, city='krakow', date='2035-06-01', started_at=now,
+                                  finished_at=now, duration=1, shows=10, created_shows=4)
+
+        finalize_scrape_run([{'films': 3, 'shows': 10}, {'error': 'TimeoutException'}], 'multikino', 'ledger-run')
+
+        self.run.refresh_from_db()
+        self.assertIsNotNone(self.run.finished_at)
+        self.assertEqual((self.run.units, self.run.failed_units, self.run.films), (2, 1, 3))
+        self.assertEqual((self.run.shows, self.run.created_shows), (10, 4))
+
+    def test_slowest_units_command(self):
+        """
+        Test case to check that the command prints the units of the latest run, slowest first.
+        """
+        now = timezone.now()
+        older = ScrapeRun.objects.create(run_id='older-run', cinema='multikino', started_at=now - timedelta(days=1))
+        ScrapeUnit.objects.create(run=older, city='older', date='2035-06-01', started_at=now, finished_at=now,
+                                  duration=99)
+        for city, duration, parse_time in (('krakow', 5, 1), ('kielce', 9, 0.5), ('lodz', 2, 1.5)):
+            ScrapeUnit.objects.create(run=self.run, city=city, date='2035-06-01', started_at=now, finished_at=now,
+                                      duration=duration, parse_time=parse_time)
+
+        out = StringIO()
+        call_command('slowest_units', '--limit', '2', stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertIn('ledger-run', lines[0])
+        self.assertEqual([line.split()[0] for line in lines[2:]], ['kielce', 'krakow'])
+
+        out = StringIO()
+        call_command('slowest_units', '--stage', 'parse', stdout=out)
+        self.assertEqual([line.split()[0] for line in out.getvalue().splitlines()[2:]], ['lodz', 'krakow', 'kielce'])
@@ -1,3 +1,4 @@
+from django.db import IntegrityError, transaction
 from django.test import TestCase
 from scraper.models import Cinema, Movie, Show
 
@@ -14,6 +15,18 @@ class CinemaModelTest(TestCase):
         self.assertEqual(cinema.name, 'Cinema Test')
         self.assertEqual(cinema.city, 'City Test')
 
+    def test_cinema_is_unique(self):
+        """
+        Test case to check that a cinema cannot be created twice, with or without a number.
+        """
+        Cinema.objects.create(name='multikino', city='krakow')
+        Cinema.objects.create(name='helios', city='krakow', number=1)
+        Cinema.objects.create(name='helios', city='krakow', number=2)
+
+        for number in (None, 1):
+            with self.subTest(number=number), self.assertRaises(IntegrityError), transaction.atomic():
+                Cinema.objects.create(name='multikino' if number is None else 'helios', city='krakow', number=number)
+
 
 class MovieModelTest(TestCase):
     """
@@ -1,8 +1,62 @@
+import json
 from unittest import TestCase
 from unittest.mock import patch, MagicMock
+import requests
+from django.test import override_settings
 from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.chrome.service import Service
-from scraper.scraper import MultikinoScraper, HeliosScraper, WebDriverManager, BaseMovieScraper
+from selenium.webdriver.common.by import By
+from scraper.scraper import MultikinoScraper, HeliosScraper, WebDriverManager, BaseMovieScraper, WebDriverPool, \
+    create_http_session, get_html_parser, make_soup
+
+
+MULTIKINO_HTML = """
+<div class="filmlist">
+  <div class="filmlist__item">
+    <img class="filmlist__poster" src="https://multikino.pl/posters/dune.jpg">
+    <div class="filmlist__info-txt">
+      <a href="/filmy/diuna"><span data-v-9364a27e="">Diuna</span></a>
+    </div>
+    <a class="film-details__item" rv-class-film-details__item--selected="genre.highlighted"> Sci-Fi </a>
+    <p class="filmlist__synopsis--twoLines">Paul Atreides travels to Arrakis.</p>
+    <ul>
+      <li class="times__detail"><a href="/rezerwacja/1"><time class="default"> 12:30* </time></a></li>
+      <li class="times__detail"><a href="/rezerwacja/2"><time class="default">18:00</time></a></li>
+      <li class="times__detail"><a href="/rezerwacja/3"></a></li>
+    </ul>
+  </div>
+  <div class="filmlist__item">
+    <img class="filmlist__poster" src="https://multikino.pl/posters/barbie.jpg">
+    <div class="filmlist__info-txt">
+      <a href="/filmy/barbie"><span data-v-9364a27e="">Barbie</span></a>
+    </div>
+    <ul>
+      <li class="times__detail"><a href="/rezerwacja/4"><time class="default">20:15</time></a></li>
+    </ul>
+  </div>
+  <div class="filmlist__item"><p>Broken item</p></div>
+</div>
+"""
+
+HELIOS_HTML = """
+<div class="seances-list">
+  <ul>
+    <li class="seance gallery-column">
+      <img src="https://helios.pl/posters/oppenheimer.jpg">
+      <h2 class="movie-title"><a class="movie-link" href="/filmy/oppenheimer"> Oppenheimer </a></h2>
+      <ul>
+        <li class="hour toolTipContainer"><a class="hour-link fancybox-reservation" href="/rez/10"> 17:45 </a></li>
+        <li class="hour toolTipContainer"><span>sold out</span></li>
+      </ul>
+    </li>
+    <li class="seance gallery-column">
+      <img src="https://helios.pl/posters/empty.jpg">
+      <h2 class="movie-title"><a class="movie-link" href="/filmy/empty">No shows</a></h2>
+      <ul></ul>
+    </li>
+  </ul>
+</div>
+"""
 
 
 class TestLogging(TestCase):
@@ -36,9 +90,10 @@ class TestHeliosScraperLogging(TestCase):
     """
     Unit tests for exception logging in the HeliosScraper class.
     """
+    @patch('scraper.scraper.HeliosScraper.fetch_page_source', return_value=None)
     @patch('scraper.scraper.HeliosScraper.get_chrome_driver')
     @patch('scraper.scraper.logger.error')
-    def test_exception_logging_in_get_movie_info(self, mock_logging_error, mock_get_chrome_driver):
+    def test_exception_logging_in_get_movie_info(self, mock_logging_error, mock_get_chrome_driver, _mock_fetch):
         """
         Test that an exception in get_movie_info is logged correctly.
         """
@@ -81,6 +136,79 @@ class TestWebDriverManager(TestCase):
         self.assertEqual(kwargs['options'], mock_options.return_value)
 
 
+class TestWebDriverPool(TestCase):
+    """
+    Test class for the WebDriverPool class.
+    """
+    def setUp(self):
+        """
+        Set up a pool whose factory hands out mock drivers.
+        """
+        self.factory = MagicMock(side_effect=MagicMock)
+        self.pool = WebDriverPool(self.factory, max_size=1, max_pages=2)
+
+    def test_driver_is_reused_and_reset(self):
+        """
+        Test case to check that a driver is reused between leases and reset after each of them.
+        """
+        with self.pool.lease() as first:
+            pass
+        with self.pool.lease() as second:
+            pass
+
+        self.assertIs(first, second)
+        self.assertEqual(self.factory.call_count, 1)
+        first.execute_cdp_cmd.assert_called_with('Network.clearBrowserCookies', {})
+        first.get.assert_called_with('about:blank')
+
+    def test_driver_is_recycled_after_max_pages(self):
+        """
+        Test case to check that a driver is quit and replaced after max_pages leases.
+        """
+        for _ in range(2):
+            with self.pool.lease() as driver:
+                pass
+        driver.quit.assert_called_once()
+
+        with self.pool.lease() as new_driver:
+            pass
+        self.assertIsNot(driver, new_driver)
+        self.assertEqual(self.factory.call_count, 2)
+
+    def test_crashed_driver_is_discarded(self):
+        """
+        Test case to check that a driver which stopped responding is not handed out again.
+        """
+        with self.assertRaises(WebDriverException):
+            with self.pool.lease() as driver:
+                driver.execute_script.side_effect = WebDriverException('Crashed')
+                raise WebDriverException('Crashed')
+        driver.quit.assert_called_once()
+
+        with self.pool.lease() as new_driver:
+            pass
+        self.assertIsNot(driver, new_driver)
+
+    def test_lease_times_out_when_pool_is_exhausted(self):
+        """
+        Test case to check that the pool never starts more drivers than max_size.
+        """
+        with self.pool.lease():
+            with self.assertRaises(WebDriverException):
+                with self.pool.lease(timeout=0.01):
+                    pass
+        self.assertEqual(self.factory.call_count, 1)
+
+    def test_close_quits_idle_drivers(self):
+        """
+        Test case to check that close quits the idle drivers.
+        """
+        with self.pool.lease() as driver:
+            pass
+        self.pool.close()
+        driver.quit.assert_called_once()
+
+
 class TestBaseMovieScraper(TestCase):
     """
     Test class for the BaseMovieScraper class.
@@ -113,6 +241,7 @@ class TestMultikinoScraper(TestCase):
         # Setup mock driver
         mock_driver = MagicMock()
         mock_driver.get.return_value = None
+        mock_driver.page_source = ''
         mock_get_chrome_driver.return_value.__enter__.return_value = mock_driver
 
         # Setup MultikinoScraper
@@ -134,14 +263,16 @@ class TestHeliosScraper(TestCase):
     """
     Test class for the HeliosScraper class.
     """
+    @patch('scraper.scraper.HeliosScraper.fetch_page_source', return_value=None)
     @patch('scraper.scraper.WebDriverManager.get_chrome_driver')
-    def test_get_movie_info(self, mock_get_chrome_driver):
+    def test_get_movie_info(self, mock_get_chrome_driver, _mock_fetch):
         """
         Test case to check that get_movie_info returns correct data.
         """
         # Setup mock driver
         mock_driver = MagicMock()
         mock_driver.get.return_value = None
+        mock_driver.page_source = ''
         mock_get_chrome_driver.return_value.__enter__.return_value = mock_driver
 
         # Setup HeliosScraper
@@ -157,3 +288,246 @@ class TestHeliosScraper(TestCase):
             all(isinstance(show, dict) and 'hour' in show and 'booking_link' in show for show in item['show_info']) for
             item in data)
         assert all(isinstance(item[key], str) for item in data for key in ["title"])
+
+
+class TestSinglePassExtraction(TestCase):
+    """
+    Test class for the single-pass page extraction of the scrapers.
+    """
+    @patch('scraper.scraper.WebDriverManager.get_chrome_driver')
+    def test_multikino_page_is_read_once(self, mock_get_chrome_driver):
+        """
+        Test case to check that the page is scrolled and read once, without per-item round trips.
+        """
+        mock_driver = MagicMock()
+        mock_driver.page_source = MULTIKINO_HTML
+        mock_get_chrome_driver.return_value.__enter__.return_value = mock_driver
+
+        data = MultikinoScraper().get_movie_info('krakow', '01-06-2023')
+
+        self.assertEqual(len(data), 2)
+        mock_driver.execute_async_script.assert_called_once()
+        mock_driver.execute_script.assert_not_called()
+        mock_driver.find_elements.assert_not_called()
+
+    def test_multikino_parse_movie_info(self):
+        """
+        Test case to check that all Multikino film items are parsed from one document.
+        """
+        data = MultikinoScraper().parse_movie_info(MULTIKINO_HTML)
+
+        self.assertEqual(data[0], {
+            'title': 'Diuna',
+            'category': 'Sci-Fi',
+            'description': 'Paul Atreides travels to Arrakis.',
+            'image_url': 'https://multikino.pl/posters/dune.jpg',
+            'show_info': [
+                {'hour': '12:30', 'booking_link': 'https://multikino.pl/rezerwacja/1'},
+                {'hour': '18:00', 'booking_link': 'https://multikino.pl/rezerwacja/2'},
+            ],
+            'movie_url': 'https://multikino.pl/filmy/diuna',
+        })
+        self.assertEqual(data[1]['category'], '')
+        self.assertEqual(data[1]['description'], 'No description')
+
+    @patch('scraper.scraper.logger.error')
+    def test_broken_item_is_skipped(self, mock_logging_error):
+        """
+        Test case to check that an item which cannot be parsed is logged and skipped.
+        """
+        data = MultikinoScraper().parse_movie_info(MULTIKINO_HTML)
+
+        self.assertEqual([item['title'] for item in data], ['Diuna', 'Barbie'])
+        mock_logging_error.assert_called_once()
+
+    def test_helios_parse_movie_info(self):
+        """
+        Test case to check that all Helios film items are parsed and films without shows are dropped.
+        """
+        data = HeliosScraper().parse_movie_info(HELIOS_HTML)
+
+        self.assertEqual(data, [{
+            'title': 'Oppenheimer',
+            'image_url': 'https://helios.pl/posters/oppenheimer.jpg',
+            'show_info': [{'hour': '17:45', 'booking_link': 'https://helios.pl/rez/10'}],
+            'movie_url': 'https://helios.pl/filmy/oppenheimer',
+        }])
+
+
+class TestParserBackend(TestCase):
+    """
+    Test class for the configurable parsing backend of the scrapers.
+    """
+    @override_settings(SCRAPER_HTML_PARSER='lxml')
+    def test_configured_parser(self):
+        """
+        Test case to check that the parser set in the settings is used.
+        """
+        self.assertEqual(get_html_parser(), 'lxml')
+        self.assertEqual(make_soup(HELIOS_HTML).builder.NAME, 'lxml')
+
+    @override_settings(SCRAPER_HTML_PARSER='not-installed')
+    def test_fallback_parser(self):
+        """
+        Test case to check that the pure Python parser is used when the configured one is not installed.
+        """
+        self.assertEqual(get_html_parser(), 'html.parser')
+
+    def test_only_film_list_is_built(self):
+        """
+        Test case to check that the tree is restricted to the film list of the page.
+        """
+        soup = make_soup(MULTIKINO_HTML, MultikinoScraper.PARSE_ONLY)
+
+        self.assertIsNone(soup.find('html'))
+        self.assertEqual(len(soup.find_all(class_='filmlist__item', recursive=False)), 3)
+
+
+class TestHeliosHttpBackend(TestCase):
+    """
+    Test class for the plain HTTP fetch backend of the HeliosScraper class.
+    """
+    @patch('scraper.scraper.WebDriverManager.get_chrome_driver')
+    @patch('scraper.scraper.http_session.get')
+    def test_page_is_parsed_without_browser(self, mock_get, mock_get_chrome_driver):
+        """
+        Test case to check that server-rendered markup is parsed without starting a browser.
+        """
+        mock_get.return_value.content = HELIOS_HTML.encode('utf-8')
+
+        data = HeliosScraper().get_movie_info('krakow', 0, 1)
+
+        self.assertEqual([item['title'] for item in data], ['Oppenheimer'])
+        mock_get_chrome_driver.assert_not_called()
+
+    @patch('scraper.scraper.WebDriverManager.get_chrome_driver')
+    @patch('scraper.scraper.http_session.get')
+    def test_fallback_to_selenium_when_markup_is_missing(self, mock_get, mock_get_chrome_driver):
+        """
+        Test case to check that the browser is used when the expected markup is missing.
+        """
+        mock_get.return_value.content = b'<html><body>Please enable JavaScript</body></html>'
+        mock_driver = MagicMock()
+        mock_driver.page_source = HELIOS_HTML
+        mock_get_chrome_driver.return_value.__enter__.return_value = mock_driver
+
+        data = HeliosScraper().get_movie_info('krakow', 0, 1)
+
+        self.assertEqual([item['title'] for item in data], ['Oppenheimer'])
+        mock_get_chrome_driver.assert_called_once()
+
+    @patch('scraper.scraper.WebDriverManager.get_chrome_driver')
+    @patch('scraper.scraper.http_session.get')
+    def test_fallback_to_selenium_on_http_error(self, mock_get, mock_get_chrome_driver):
+        """
+        Test case to check that the browser is used when the HTTP request fails.
+        """
+        mock_get.side_effect = requests.ConnectionError('Connection refused')
+        mock_get_chrome_driver.return_value.__enter__.return_value.page_source = HELIOS_HTML
+
+        data = HeliosScraper().get_movie_info('krakow', 0, 1)
+
+        self.assertEqual(len(data), 1)
+        mock_get_chrome_driver.assert_called_once()
+
+    @patch('scraper.scraper.WebDriverManager.get_chrome_driver')
+    @patch('scraper.scraper.http_session.get')
+    def test_metrics_cover_both_fetches(self, mock_get, mock_get_chrome_driver):
+        """
+        Test case to check that the pages loaded and the time of both fetches and parses are recorded.
+        """
+        mock_get.return_value.content = b'<html><body>Please enable JavaScript</body></html>'
+        mock_get_chrome_driver.return_value.__enter__.return_value.page_source = HELIOS_HTML
+        scraper = HeliosScraper()
+
+        scraper.get_movie_info('krakow', 0, 1)
+
+        self.assertEqual(scraper.metrics.counts, {'pages': 2})
+        self.assertEqual(set(scraper.metrics.durations), {'fetch', 'parse'})
+        self.assertEqual(scraper.metrics.error, '')
+
+    @patch('scraper.scraper.WebDriverManager.get_chrome_driver')
+    def test_metrics_record_recovered_error(self, mock_get_chrome_driver):
+        """
+        Test case to check that a browser error the scraper recovers from is recorded.
+        """
+        mock_get_chrome_driver.side_effect = WebDriverException('Chrome crashed')
+        scraper = MultikinoScraper()
+
+        self.assertEqual(scraper.get_movie_info('krakow', '01-06-2035'), [])
+        self.assertEqual(scraper.metrics.error, 'WebDriverException')
+        self.assertEqual(scraper.metrics.counts, {})
+
+    def test_create_http_session(self):
+        """
+        Test case to check that the session asks for compressed responses and retries transient errors.
+        """
+        session = create_http_session()
+
+        self.assertIn('gzip', session.headers['Accept-Encoding'])
+        self.assertEqual(session.get_adapter('https://www.helios.pl').max_retries.total, 2)
+
+
+class TestResourceBlocking(TestCase):
+    """
+    Test class for the blocking of unneeded resources in the scraping browser.
+    """
+    @staticmethod
+    def log_entry(method, **params):
+        """
+        Build a performance log entry of a network event.
+        """
+        return {'message': json.dumps({'message': {'method': method, 'params': params}})}
+
+    def test_blocked_urls_respect_allow_list(self):
+        """
+        Test case to check that the resource kinds allowed for a chain are not blocked.
+        """
+        self.assertIn('*.jpg*', MultikinoScraper().get_blocked_urls())
+        with override_settings(SCRAPER_ALLOWED_RESOURCES={'multikino': ['image']}):
+            self.assertNotIn('*.jpg*', MultikinoScraper().get_blocked_urls())
+            self.assertIn('*.woff*', MultikinoScraper().get_blocked_urls())
+            self.assertIn('*.jpg*', HeliosScraper().get_blocked_urls())
+        with override_settings(SCRAPER_BLOCK_RESOURCES=False):
+            self.assertEqual(MultikinoScraper().get_blocked_urls(), [])
+
+    @override_settings(SCRAPER_ALLOWED_RESOURCES={'helios': ['image', 'third_party']})
+    def test_allowed_kinds_are_not_sent_to_the_browser(self):
+        """
+        Test case to check that the kinds allowed for a chain are left out of the URLs blocked in the browser.
+        """
+        mock_driver = MagicMock()
+
+        HeliosScraper().load_page_source(mock_driver, 'https://www.helios.pl', (By.CLASS_NAME, 'seances-list'), 60)
+
+        blocked = [call.args[1]['urls'] for call in mock_driver.execute_cdp_cmd.call_args_list
+                   if call.args[0] == 'Network.setBlockedURLs']
+        self.assertEqual(len(blocked), 1)
+        self.assertIn('*.woff*', blocked[0])
+        self.assertNotIn('*.jpg*', blocked[0])
+        self.assertNotIn('*google-analytics.com*', blocked[0])
+
+    @patch('scraper.scraper.WebDriverManager.get_chrome_driver')
+    def test_page_load_blocks_resources_and_reports_usage(self, mock_get_chrome_driver):
+        """
+        Test case to check that resources are blocked before the page loads and the network usage is recorded.
+        """
+        mock_driver = MagicMock()
+        mock_driver.page_source = MULTIKINO_HTML
+        mock_driver.get_log.side_effect = [
+            [self.log_entry('Network.loadingFinished', encodedDataLength=999)],
+            [
+                self.log_entry('Network.loadingFinished', encodedDataLength=1000),
+                self.log_entry('Network.loadingFinished', encodedDataLength=24),
+                self.log_entry('Network.loadingFailed', blockedReason='inspector'),
+                self.log_entry('Network.loadingFailed', errorText='net::ERR_ABORTED'),
+                self.log_entry('Network.requestWillBeSent'),
+            ],
+        ]
+        mock_get_chrome_driver.return_value.__enter__.return_value = mock_driver
+        scraper = MultikinoScraper()
+
+        scraper.get_movie_info('krakow', '01-06-2023')
+
+        mock_driver.execute_cdp_cmd.assert_any_call('Network.setBlockedURLs', {'urls': scraper.get_blocked_urls()})
+        self.assertEqual(scraper.metrics.counts, {'pages': 1, 'transferred_bytes': 1024, 'blocked_requests': 1})
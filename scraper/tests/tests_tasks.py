@@ -1,9 +1,12 @@
 from datetime import datetime
 from unittest import TestCase
 from unittest.mock import patch, Mock
+from django.db import connection
+from django.test import TestCase as DatabaseTestCase
+from django.test.utils import CaptureQueriesContext
 from scraper.tasks import add_days, BaseScrapeStore
 from scraper.tasks import MultikinoScrapeStore, HeliosScrapeStore, scrape_and_store_multikino, scrape_and_store_helios,\
-    delete_past_shows
+    delete_past_shows, scrape_and_store_unit, finalize_scrape_run
 from scraper.scraper import MultikinoScraper, HeliosScraper
 from scraper.models import Cinema, Movie, Show
 
@@ -37,7 +40,7 @@ class TestBaseMovieScraper(TestCase):
                 pass
 
             def get_dates(self):
-                pass
+                """Return no dates."""
 
             def scrape_and_store_data(self):
                 pass
@@ -84,6 +87,27 @@ class TestMultikinoScrapeStore(TestCase):
             number=None
         )
 
+    def test_get_units(self):
+        """
+        Test case to check that there is one scrape unit per city and date.
+        """
+        units = MultikinoScrapeStore(["Kraków", "Kielce"]).get_units()
+        self.assertEqual(len(units), 2 * self.multikino.AMOUNT_OF_DAYS)
+        self.assertEqual(set(units[0].keys()), {'city', 'date'})
+
+    @patch('scraper.tasks.finalize_scrape_run')
+    @patch('scraper.tasks.chord')
+    def test_scrape_and_store_data_fans_out(self, mock_chord, mock_finalize):
+        """
+        Test case to check that scrape_and_store_data dispatches one task per unit in a chord.
+        """
+        self.multikino.scrape_and_store_data()
+
+        header = mock_chord.call_args[0][0]
+        self.assertEqual(len(header), self.multikino.AMOUNT_OF_DAYS)
+        self.assertEqual(header[0].args[0], 'multikino')
+        mock_chord.return_value.assert_called_once_with(mock_finalize.s.return_value)
+
 
 class TestHeliosScrapeStore(TestCase):
     """
@@ -125,6 +149,14 @@ class TestHeliosScrapeStore(TestCase):
             number=1
         )
 
+    def test_get_units(self):
+        """
+        Test case to check that there is one scrape unit per cinema and date.
+        """
+        units = HeliosScrapeStore({"1": "krakow", "2": "kielce"}).get_units()
+        self.assertEqual(len(units), 2 * self.helios.AMOUNT_OF_DAYS)
+        self.assertEqual(units[0], {'city': 'krakow', 'cinema_number': '1', 'date': units[0]['date'], 'day': 0})
+
 
 class TestCeleryTasks(TestCase):
     """
@@ -148,6 +180,198 @@ class TestCeleryTasks(TestCase):
         mock_scrape_and_store_data.assert_called_once()
 
 
+class TestScrapeUnitTasks(DatabaseTestCase):
+    """
+    Test class for the scrape unit task and the chord callback.
+    """
+    MOVIE_INFO = [{
+        'title': 'Movie Test',
+        'category': 'Action',
+        'description': 'Description Test',
+        'image_url': 'https://multikino.pl/poster.jpg',
+        'movie_url': 'https://multikino.pl/filmy/movie-test',
+        'show_info': [
+            {'hour': '12:00', 'booking_link': 'https://multikino.pl/rezerwacja/1'},
+            {'hour': '18:30', 'booking_link': 'https://multikino.pl/rezerwacja/2'},
+        ],
+    }]
+
+    @patch('scraper.tasks.MultikinoScraper')
+    def test_scrape_and_store_unit(self, mock_scraper):
+        """
+        Test case to check that a unit task stores the shows of its page and reports the counts.
+        """
+        mock_scraper.return_value.get_movie_info.return_value = self.MOVIE_INFO
+
+        result = scrape_and_store_unit('multikino', {'city': 'krakow', 'date': '2035-06-01'}, 'store-unit-run')
+
+        mock_scraper.return_value.get_movie_info.assert_called_once_with('krakow', '01-06-2035')
+        self.assertEqual(result, {
+            'city': 'krakow', 'date': '2035-06-01', 'films': 1, 'shows': 2, 'cache_hits': 0, 'cache_misses': 2
+        })
+        self.assertEqual(Show.objects.filter(cinema__city='krakow').count(), 2)
+
+    @patch('scraper.tasks.HeliosScraper')
+    def test_empty_page_creates_no_cinema(self, mock_scraper):
+        """
+        Test case to check that a page without films, also returned on scraping errors, writes nothing.
+        """
+        mock_scraper.return_value.get_movie_info.return_value = []
+        unit = {'city': 'krakow', 'cinema_number': '1', 'date': '2035-06-01', 'day': 0}
+
+        result = scrape_and_store_unit('helios', unit, 'empty-unit-run')
+
+        self.assertEqual((result['films'], result['shows']), (0, 0))
+        self.assertFalse(Cinema.objects.exists())
+
+    @patch('scraper.tasks.HeliosScraper')
+    def test_failing_unit_reports_error(self, mock_scraper):
+        """
+        Test case to check that a failing unit reports its error class instead of raising.
+        """
+        mock_scraper.return_value.get_movie_info.side_effect = ValueError('Broken page')
+        unit = {'city': 'krakow', 'cinema_number': '1', 'date': '2035-06-01', 'day': 0}
+
+        result = scrape_and_store_unit('helios', unit, 'failing-unit-run')
+
+        self.assertEqual(result['error'], 'ValueError')
+
+    @patch('scraper.tasks.write_listing_snapshots', return_value=4)
+    def test_finalize_scrape_run(self, mock_write_listing_snapshots):
+        """
+        Test case to check that the chord callback sums up the results of the units and writes the snapshots.
+        """
+        totals = finalize_scrape_run([
+            {'city': 'krakow', 'films': 3, 'shows': 10},
+            {'city': 'kielce', 'films': 2, 'shows': 5},
+            {'city': 'lodz', 'error': 'TimeoutException'},
+        ], 'multikino', 'run')
+
+        self.assertEqual(totals['units'], 3)
+        self.assertEqual(totals['failed_units'], 1)
+        self.assertEqual(totals['films'], 5)
+        self.assertEqual(totals['shows'], 15)
+        self.assertEqual(totals['snapshots'], 4)
+        mock_write_listing_snapshots.assert_called_once()
+
+
+class TestStoreMovieInfo(DatabaseTestCase):
+    """
+    Test class for the bulk ingest of a scraped page.
+    """
+
+    @staticmethod
+    def movie_info(title, links):
+        """
+        Build the scraped information of a movie playing at 12:00 for each booking link.
+        """
+        return {
+            'title': title,
+            'category': 'Action',
+            'description': 'Description Test',
+            'image_url': 'https://multikino.pl/poster.jpg',
+            'movie_url': f'https://multikino.pl/filmy/{title}',
+            'show_info': [{'hour': '12:00', 'booking_link': link} for link in links],
+        }
+
+    @patch('scraper.tasks.MultikinoScraper')
+    def setUp(self, _mock_scraper):
+        self.store = MultikinoScrapeStore()
+
+    def test_shows_are_upserted_on_booking_link(self):
+        """
+        Test case to check that existing shows are updated instead of duplicated.
+        """
+        cinema = Cinema.objects.create(name='multikino', city='krakow')
+        movie = Movie.objects.create(title='old', movie_url='https://multikino.pl/filmy/old')
+        Show.objects.create(cinema=cinema, movie=movie, date='2035-06-01', time='10:00', booking_link='link/1')
+
+        stored = self.store.store_movie_info([self.movie_info('new', ['link/1', 'link/2'])], '2035-06-01', 'krakow')
+
+        self.assertEqual(stored, 2)
+        self.assertEqual(Show.objects.count(), 2)
+        show = Show.objects.get(booking_link='link/1')
+        self.assertEqual(show.movie.title, 'new')
+        self.assertEqual(show.time.strftime('%H:%M'), '12:00')
+
+    def test_existing_movies_are_reused(self):
+        """
+        Test case to check that movies are only created once.
+        """
+        self.store.store_movie_info([self.movie_info('movie', ['link/1'])], '2035-06-01', 'krakow')
+        self.store.store_movie_info([self.movie_info('movie', ['link/2'])], '2035-06-02', 'krakow')
+
+        self.assertEqual(Movie.objects.count(), 1)
+        self.assertEqual(Cinema.objects.count(), 1)
+
+    def test_invalid_hours_and_duplicate_links_are_skipped(self):
+        """
+        Test case to check that shows with an invalid hour or a repeated booking link are stored once at most.
+        """
+        movie_info = self.movie_info('movie', ['link/1', 'link/1'])
+        movie_info['show_info'].append({'hour': 'soon', 'booking_link': 'link/2'})
+
+        stored = self.store.store_movie_info([movie_info], '2035-06-01', 'krakow')
+
+        self.assertEqual(stored, 1)
+        self.assertFalse(Show.objects.filter(booking_link='link/2').exists())
+
+    def test_query_count_does_not_depend_on_number_of_shows(self):
+        """
+        Test case to check that a page is stored with a constant number of queries.
+        """
+        with CaptureQueriesContext(connection) as small_page:
+            self.store.store_movie_info(
+                [self.movie_info('a', ['a/1']), self.movie_info('b', ['b/1'])], '2035-06-01', 'krakow')
+        with CaptureQueriesContext(connection) as big_page:
+            self.store.store_movie_info(
+                [self.movie_info(title, [f'{title}/{i}' for i in range(20)]) for title in 'cdefgh'],
+                '2035-06-01', 'kielce')
+
+        self.assertEqual(len(small_page), len(big_page))
+
+
+class TestConcurrentUnits(DatabaseTestCase):
+    """
+    Test class for the ingest of units storing the same cinema or movie in parallel.
+    """
+
+    @patch('scraper.tasks.MultikinoScraper')
+    def setUp(self, _mock_scraper):
+        self.store = MultikinoScrapeStore()
+        self.other_store = MultikinoScrapeStore()
+
+    def test_movie_stored_by_two_units_is_created_once(self):
+        """
+        Test case to check that a movie inserted by another unit after it was looked up is reused.
+        """
+        self.store.store_movie_info([TestStoreMovieInfo.movie_info('movie', ['link/1'])], '2035-06-01', 'krakow')
+        select_movies = Movie.objects.filter
+        lookups = []
+
+        def filter_movies(*args, **kwargs):
+            # The first lookup of the other unit runs before the first unit committed the movie
+            lookups.append(kwargs)
+            return Movie.objects.none() if len(lookups) == 1 else select_movies(*args, **kwargs)
+
+        with patch.object(Movie.objects, 'filter', side_effect=filter_movies):
+            self.other_store.store_movie_info(
+                [TestStoreMovieInfo.movie_info('movie', ['link/2'])], '2035-06-01', 'kielce')
+
+        self.assertEqual(Movie.objects.count(), 1)
+        self.assertEqual(set(Show.objects.values_list('movie', flat=True)), {Movie.objects.get().id})
+
+    def test_cinema_created_concurrently_is_reused(self):
+        """
+        Test case to check that a cinema inserted by another unit after it was looked up is reused.
+        """
+        cinema = Cinema.objects.create(name='multikino', city='krakow')
+
+        with patch('django.db.models.query.QuerySet.get', side_effect=[Cinema.DoesNotExist, cinema]):
+            self.assertEqual(self.store.create_cinema('krakow'), cinema)
+        self.assertEqual(Cinema.objects.count(), 1)
+
+
 class TestDeletePastShows(TestCase):
     """
     Test class for the delete_past_shows task.
@@ -165,10 +389,27 @@ class TestDeletePastShows(TestCase):
         self.future_show = Show.objects.create(
             cinema=self.cinema, movie=self.movie, date='2035-06-01', time='13:00:00', booking_link='www.test.com/2')
 
-    def test_delete_past_shows(self):
+    @patch('scraper.tasks.write_listing_snapshots')
+    def test_delete_past_shows(self, _mock_write_listing_snapshots):
         """
         Test case to check the delete_past_shows task.
         """
         delete_past_shows()
         self.assertFalse(Show.objects.filter(id=self.past_show.id).exists())
         self.assertTrue(Show.objects.filter(id=self.future_show.id).exists())
+
+
+class TestDeletePastShowsInvalidation(DatabaseTestCase):
+    """
+    Test class for the listing cache invalidation of the delete_past_shows task.
+    """
+
+    @patch('scraper.tasks.write_listing_snapshots')
+    @patch('scraper.tasks.bump_listing_version')
+    def test_delete_past_shows_invalidates_listings(self, mock_bump_listing_version, mock_write_listing_snapshots):
+        """
+        Test case to check that deleting past shows invalidates the cached listings and rewrites the snapshots.
+        """
+        delete_past_shows()
+        mock_bump_listing_version.assert_called_once()
+        mock_write_listing_snapshots.assert_called_once()
@@ -10,3 +10,9 @@ class UserApiConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'user_api'
+
+    def ready(self):
+        """
+        Connect the receivers dropping the cached tokens of changed users.
+        """
+        from . import authentication  # pylint: disable=import-outside-toplevel,unused-import
@@ -0,0 +1,83 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+# Seconds a token stays cached, bounding how long changes made outside the API take to be seen
+TOKEN_CACHE_TIMEOUT = 60
+
+
+def token_cache_key(key):
+    """
+    Build the cache key of a token, which does not reveal the token itself.
+
+    Args:
+        key (str): The token.
+
+    Returns:
+        str: The cache key.
+    """
+    return f'auth-token:{hashlib.sha256(key.encode("utf-8")).hexdigest()}'
+
+
+def invalidate_cached_token(user):
+    """
+    Drop the cached token of a user, so that the next request authenticates against the database.
+
+    Args:
+        user (AppUser): The user whose token is dropped.
+    """
+    for key in Token.objects.filter(user=user).values_list('key', flat=True):
+        cache.delete(token_cache_key(key))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_saved_user_token(instance, created, **_kwargs):
+    """
+    Drop the cached token of a changed user, e.g. deactivated or with a new password, once the change is committed.
+
+    Invalidating after the commit, a request in flight cannot cache the user as it was before the change.
+    """
+    if not created:
+        transaction.on_commit(lambda: invalidate_cached_token(instance))
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(instance, **_kwargs):
+    """
+    Drop a deleted token from the cache once the deletion is committed, on logout or with its user.
+    """
+    key = instance.key
+    transaction.on_commit(lambda: cache.delete(token_cache_key(key)))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication keeping the token and its user in the shared cache for TOKEN_CACHE_TIMEOUT seconds.
+
+    Only valid tokens of active users are cached, so invalid credentials are always checked against the database.
+    The password hash of the user is not cached, it is loaded from the database when it is needed. Cached tokens
+    are dropped whenever their user is saved and when they are deleted.
+    """
+    def authenticate_credentials(self, key):
+        """
+        Authenticate the token from the cache, or from the database on a cache miss.
+        """
+        cache_key = token_cache_key(key)
+        token = cache.get(cache_key)
+        if token is None:
+            model = self.get_model()
+            try:
+                token = model.objects.select_related('user').defer('user__password').get(key=key)
+            except model.DoesNotExist as error:
+                raise AuthenticationFailed(_('Invalid token.')) from error
+            if not token.user.is_active:
+                raise AuthenticationFailed(_('User inactive or deleted.'))
+            cache.set(cache_key, token, TOKEN_CACHE_TIMEOUT)
+        return token.user, token
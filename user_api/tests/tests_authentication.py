@@ -0,0 +1,121 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APITestCase
+from user_api.authentication import CachedTokenAuthentication, token_cache_key
+
+User = get_user_model()
+
+
+class CachedTokenTestCase(APITestCase):
+    """
+    Base test case for the cached token authentication.
+    """
+
+    def setUp(self):
+        """
+        Set up the test by creating a user with a token and an empty cache.
+        """
+        cache.clear()
+        self.user = User.objects.create_user(email='test@example.com', username='test', password='Test1234!',
+                                             is_active=True)
+        self.token = Token.objects.create(user=self.user)
+        self.authentication = CachedTokenAuthentication()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+
+class CachedTokenAuthenticationTestCase(CachedTokenTestCase):
+    """
+    Test case for the cached token authentication.
+    """
+
+    def test_token_is_cached(self):
+        """
+        Test that a token is read from the database once, then from the cache.
+        """
+        with self.assertNumQueries(1):
+            self.authentication.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            user, token = self.authentication.authenticate_credentials(self.token.key)
+        self.assertEqual(user, self.user)
+        self.assertEqual(token.key, self.token.key)
+
+    def test_cache_key_hides_token(self):
+        """
+        Test that the token does not appear in its cache key.
+        """
+        self.assertNotIn(self.token.key, token_cache_key(self.token.key))
+
+    def test_invalid_token_is_not_cached(self):
+        """
+        Test that invalid tokens and tokens of inactive users are rejected every time.
+        """
+        self.user.is_active = False
+        self.user.save()
+        for key in ('invalid', self.token.key):
+            for _ in range(2):
+                with self.assertRaises(AuthenticationFailed):
+                    self.authentication.authenticate_credentials(key)
+
+    def test_password_hash_is_not_cached(self):
+        """
+        Test that the cached user does not carry its password hash, which is loaded when it is needed.
+        """
+        self.authentication.authenticate_credentials(self.token.key)
+
+        user = cache.get(token_cache_key(self.token.key)).user
+        self.assertNotIn('password', user.__dict__)
+        self.assertTrue(user.check_password('Test1234!'))
+
+
+class CachedTokenInvalidationTestCase(CachedTokenTestCase):
+    """
+    Test case for the invalidation of cached tokens.
+    """
+
+    def test_logout_invalidates_cached_token(self):
+        """
+        Test that a cached token stops authenticating once the logout is committed.
+        """
+        self.assertEqual(self.client.get('/api-user/user/').status_code, 200)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertEqual(self.client.post('/api-user/logout/').status_code, 200)
+        # The token is still cached until the deletion is committed, so no request can cache it again
+        self.assertIsNotNone(cache.get(token_cache_key(self.token.key)))
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.client.get('/api-user/user/').status_code, 401)
+
+    def test_password_change_invalidates_cached_token(self):
+        """
+        Test that the user is reloaded from the database after a password change.
+        """
+        self.assertEqual(self.client.get('/api-user/user/').status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put('/api-user/change/', {'old_password': 'Test1234!',
+                                                             'new_password': 'NewTest1234!',
+                                                             'new_password2': 'NewTest1234!'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(cache.get(token_cache_key(self.token.key)))
+
+    def test_deactivation_invalidates_cached_token(self):
+        """
+        Test that a cached token stops authenticating once its user is deactivated, e.g. in the admin.
+        """
+        self.assertEqual(self.client.get('/api-user/user/').status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(self.client.get('/api-user/user/').status_code, 401)
+
+    def test_delete_invalidates_cached_token(self):
+        """
+        Test that a cached token stops authenticating once the account deletion is committed.
+        """
+        self.assertEqual(self.client.get('/api-user/user/').status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete('/api-user/delete/').status_code, 204)
+        self.assertEqual(self.client.get('/api-user/user/').status_code, 401)
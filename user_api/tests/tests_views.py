@@ -1,6 +1,9 @@
+from unittest.mock import patch
+from kombu.exceptions import OperationalError
 from rest_framework.test import APITestCase, APIClient
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import get_user_model
+from django.core import mail
 
 User = get_user_model()
 
@@ -29,6 +32,39 @@ class UserRegisterViewTestCase(APITestCase):
         self.assertEqual(response.data['email'], 'test@example.com')
         self.assertEqual(response.data['username'], 'test')
 
+    def test_user_register_view_queues_verification_email(self):
+        """
+        Test that the verification email is queued, not sent, once the registration is committed.
+        """
+        with patch('mailer.views.send_emails.delay') as delay, \
+                self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client.post('/api-user/register/',
+                                        {'email': 'test@example.com',
+                                         'username': 'test',
+                                         'password': 'Test1234!'})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(callbacks), 1)
+        (messages,), _ = delay.call_args
+        self.assertEqual(messages[0]['to'], ['test@example.com'])
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_user_register_view_succeeds_when_broker_is_down(self):
+        """
+        Test that the registration succeeds, and the failure is logged, when the email cannot be queued.
+        """
+        with patch('mailer.views.send_emails.delay', side_effect=OperationalError('Connection refused')), \
+                patch('mailer.views.logger.exception') as log_exception, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api-user/register/',
+                                        {'email': 'test@example.com',
+                                         'username': 'test',
+                                         'password': 'Test1234!'})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(User.objects.filter(email='test@example.com').exists())
+        log_exception.assert_called_once()
+
 
 class UserLoginViewTestCase(APITestCase):
     """
@@ -1,9 +1,10 @@
-from rest_framework.authentication import TokenAuthentication
+from django.db import transaction
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions, status
 
 from mailer.views import send_verification_email
+from .authentication import CachedTokenAuthentication
 from .serializers import UserRegisterSerializer, UserLoginSerializer, UserSerializer, UserChangePasswordSerializer
 from .models import AppUser, EmailVerification
 from .utils import generate_verification_url
@@ -25,11 +26,12 @@ class UserRegister(APIView):
         """
         serializer = UserRegisterSerializer(data=request.data)
         if serializer.is_valid():
-            user = serializer.save()
-            if not user.is_superuser:
-                token = EmailVerification.generate_token_for_user(user)
-                verification_url = generate_verification_url(token)
-                send_verification_email(user, verification_url)
+            with transaction.atomic():
+                user = serializer.save()
+                if not user.is_superuser:
+                    token = EmailVerification.generate_token_for_user(user)
+                    verification_url = generate_verification_url(token)
+                    send_verification_email(user, verification_url)
             return Response(UserSerializer(user).data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -39,7 +41,7 @@ class UserLogin(APIView):
     Class based view for user login.
     """
     permission_classes = (permissions.AllowAny,)
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
 
     def post(self, request):
         """
@@ -58,7 +60,7 @@ class UserLogout(APIView):
     Class based view for user logout.
     """
     permission_classes = (permissions.IsAuthenticated,)
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
 
     def post(self, request):
         """
@@ -73,7 +75,7 @@ class UserView(APIView):
     Class based view for retrieving user information.
     """
     permission_classes = (permissions.IsAuthenticated,)
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
 
     def get(self, request):
         """
@@ -88,7 +90,7 @@ class UserChangePasswordView(APIView):
     Class based view for password change.
     """
     permission_classes = (permissions.IsAuthenticated,)
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
 
     def put(self, request):
         """
@@ -107,7 +109,7 @@ class UserDeleteView(APIView):
     Class based view for user accounts delete.
     """
     permission_classes = (permissions.IsAuthenticated,)
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
 
     def delete(self, request):
         """